@@ -1,150 +1,51 @@
 from typing import Dict, List
+from agents.bonus_templates import BonusTemplateEngine, load_bonus_engine
+from agents.roi_model import ROIAssumptions, estimate_batch, summarize_company
 
 class BonusAgent:
-    def __init__(self):
-        self.internal_solutions = {
-            "report_automation": {
-                "name": "Automated Report Generator",
-                "description": "GenAI system for automated business report creation",
-                "value": "Reduce manual reporting time by 80%, ensure consistency",
-                "implementation": "LLM + data integration APIs"
-            },
-            "knowledge_search": {
-                "name": "AI-Powered Knowledge Base Search",
-                "description": "Intelligent search across company documents and databases",
-                "value": "Faster information retrieval, improved decision making",
-                "implementation": "Vector embeddings + semantic search"
-            },
-            "customer_chatbot": {
-                "name": "Customer-Facing AI Chatbot",
-                "description": "24/7 intelligent customer support and query resolution",
-                "value": "Reduced support costs, improved customer satisfaction",
-                "implementation": "Fine-tuned conversational AI model"
-            }
-        }
-        
-        self.customer_solutions = {
-            "personalization": {
-                "name": "AI Personalization Engine",
-                "description": "Real-time content and product personalization",
-                "value": "Increased engagement, higher conversion rates",
-                "implementation": "Recommendation algorithms + user behavior analysis"
-            },
-            "voice_assistant": {
-                "name": "Voice-Enabled Assistant",
-                "description": "Voice interface for product interaction and support",
-                "value": "Enhanced user experience, accessibility improvement",
-                "implementation": "Speech-to-text + NLU + response generation"
-            }
-        }
-    
+    def __init__(self, engine: BonusTemplateEngine = None):
+        # Per-industry solution bundles are compiled once; main passes the warm-start snapshot's engine
+        self.engine = engine or load_bonus_engine()
+        self.roi_assumptions = ROIAssumptions()
+        self.roi_samples = 1000
+        self.roi_seed = 0
+
     def generate_bonus_solutions(self, industry: str, use_cases: List[Dict]) -> Dict:
         """Generate internal and customer-facing GenAI solutions based on industry"""
         print(f"[DEBUG] Generating bonus solutions for: {industry}")
-        
+
         # Generate industry-specific internal solutions
         internal = self._generate_internal_solutions(industry, use_cases)
-        
+
         # Generate industry-specific customer solutions
         customer = self._generate_customer_solutions(industry, use_cases)
-        
+
         return {
             "internal_solutions": internal,
             "customer_solutions": customer,
-            "implementation_roadmap": self._create_industry_roadmap(industry),
-            "roi_estimates": self._estimate_industry_roi(industry)
+            "implementation_roadmap": self._create_industry_roadmap(industry, internal, customer, use_cases),
+            "roi_estimates": self._estimate_industry_roi(industry),
+            "roi_model": self._model_roi(use_cases)
         }
-    
+
     def _generate_internal_solutions(self, industry: str, use_cases: List[Dict]) -> List[Dict]:
         """Generate industry-specific internal solutions"""
-        industry_lower = industry.lower()
-        solutions = []
-        
-        if "healthcare" in industry_lower:
-            solutions.append({"name": "Clinical Data Analytics", "description": "AI-powered analysis of patient data and treatment outcomes", "value": "Improve treatment protocols, reduce costs by 25%", "implementation": "Medical data mining + predictive analytics"})
-            solutions.append({"name": "Staff Scheduling Optimizer", "description": "Intelligent scheduling for medical staff and resources", "value": "Optimize staff utilization, reduce overtime by 40%", "implementation": "ML scheduling algorithms + workforce analytics"})
-        
-        elif "finance" in industry_lower:
-            solutions.append({"name": "Risk Assessment Automation", "description": "Automated risk analysis and compliance monitoring", "value": "Reduce risk assessment time by 70%, improve accuracy", "implementation": "ML risk models + regulatory compliance APIs"})
-            solutions.append({"name": "Trading Algorithm Optimizer", "description": "AI-powered trading strategy optimization and backtesting", "value": "Improve trading performance by 30%, reduce losses", "implementation": "Reinforcement learning + market data analysis"})
-        
-        elif "retail" in industry_lower:
-            solutions.append({"name": "Demand Forecasting System", "description": "AI-powered inventory and demand prediction", "value": "Reduce inventory costs by 35%, prevent stockouts", "implementation": "Time series forecasting + sales analytics"})
-            solutions.append({"name": "Price Optimization Engine", "description": "Dynamic pricing based on market conditions and demand", "value": "Increase profit margins by 20%, stay competitive", "implementation": "ML pricing models + competitor analysis"})
-        
-        elif "automotive" in industry_lower or "tesla" in industry_lower:
-            solutions.append({"name": "Manufacturing Quality Control", "description": "AI-powered defect detection and quality assurance", "value": "Reduce defects by 80%, improve production efficiency", "implementation": "Computer vision + quality control systems"})
-            solutions.append({"name": "Supply Chain Optimizer", "description": "Intelligent supply chain management and logistics", "value": "Reduce supply chain costs by 30%, improve delivery times", "implementation": "ML optimization + IoT sensors"})
-        
-        else:
-            # Generic solutions
-            solutions.append({"name": f"{industry} Analytics Platform", "description": f"Comprehensive data analytics for {industry}", "value": "Improve decision making, reduce costs by 25%", "implementation": "Data pipeline + ML analytics"})
-            solutions.append({"name": f"{industry} Process Automation", "description": f"Workflow automation for {industry} operations", "value": "Reduce manual work by 60%, improve efficiency", "implementation": "RPA + AI workflow optimization"})
-        
-        return solutions[:3]
-    
+        return self.engine.internal_solutions(industry, limit=3)
+
     def _generate_customer_solutions(self, industry: str, use_cases: List[Dict]) -> List[Dict]:
         """Generate industry-specific customer solutions"""
-        solutions = []
-        
-        industry_lower = industry.lower()
-        
-        if "healthcare" in industry_lower:
-            solutions.extend([
-                {"name": "Patient Health Companion", "description": "AI-powered personal health monitoring and wellness guidance", "value": "Improve patient engagement, reduce hospital readmissions by 30%", "implementation": "Wearable integration + health analytics"},
-                {"name": "Symptom Checker & Triage", "description": "AI assistant for initial symptom assessment and care recommendations", "value": "Reduce unnecessary visits by 40%, improve care access", "implementation": "Medical knowledge base + diagnostic algorithms"}
-            ])
-        elif "finance" in industry_lower:
-            solutions.extend([
-                {"name": "Personal Wealth Manager", "description": "AI-driven investment advice and portfolio optimization", "value": "Improve investment returns by 25%, reduce fees", "implementation": "Portfolio optimization + market analysis"},
-                {"name": "Smart Expense Tracker", "description": "Intelligent spending analysis and budgeting assistant", "value": "Help customers save 20% more, improve financial health", "implementation": "Transaction categorization + spending insights"}
-            ])
-        elif "retail" in industry_lower:
-            solutions.extend([
-                {"name": "Visual Search & Discovery", "description": "AI-powered product search using images and preferences", "value": "Increase conversion by 50%, improve user experience", "implementation": "Computer vision + recommendation engine"},
-                {"name": "Virtual Try-On Experience", "description": "AR/AI-powered virtual fitting and product visualization", "value": "Reduce returns by 35%, increase customer confidence", "implementation": "AR technology + body measurement AI"}
-            ])
-        elif "automotive" in industry_lower or "tesla" in industry_lower:
-            solutions.extend([
-                {"name": "Intelligent Vehicle Assistant", "description": "AI-powered in-car assistant for navigation and vehicle control", "value": "Enhance driving experience, improve safety by 40%", "implementation": "Voice AI + vehicle integration"},
-                {"name": "Predictive Maintenance Alerts", "description": "AI-driven vehicle health monitoring and maintenance predictions", "value": "Reduce breakdowns by 60%, extend vehicle life", "implementation": "IoT sensors + predictive analytics"}
-            ])
-        else:
-            solutions.extend([
-                {"name": f"{industry} Smart Assistant", "description": f"Intelligent customer support and guidance for {industry}", "value": "24/7 support, improve satisfaction by 40%", "implementation": "Conversational AI + domain knowledge"},
-                {"name": f"{industry} Personalization Hub", "description": f"AI-driven personalized experiences for {industry} customers", "value": "Increase engagement by 35%, improve retention", "implementation": "ML personalization + behavior analysis"}
-            ])
-        
-        return solutions[:2]
-    
-    def _create_industry_roadmap(self, industry: str) -> List[Dict]:
-        """Create industry-specific implementation roadmap"""
-        return [
-            {"phase": "Phase 1 (0-3 months)", "focus": f"{industry} internal automation", "deliverables": "Report automation, Knowledge assistant"},
-            {"phase": "Phase 2 (3-6 months)", "focus": f"{industry} customer solutions", "deliverables": "Customer assistant, Personalization engine"},
-            {"phase": "Phase 3 (6-12 months)", "focus": f"{industry} advanced AI", "deliverables": "Industry-specific AI solutions, Advanced analytics"}
-        ]
-    
+        return self.engine.customer_solutions(industry, limit=2)
+
+    def _create_industry_roadmap(self, industry: str, internal: List[Dict] = None, customer: List[Dict] = None,
+                                 use_cases: List[Dict] = None) -> List[Dict]:
+        """Create implementation roadmap from the generated solutions and use cases"""
+        return self.engine.roadmap_for(industry, internal or [], customer or [], use_cases or [])
+
     def _estimate_industry_roi(self, industry: str) -> Dict:
         """Estimate industry-specific ROI"""
-        if "healthcare" in industry.lower():
-            return {
-                "cost_savings": "40-60% reduction in administrative costs",
-                "revenue_impact": "20-30% improvement in patient outcomes",
-                "efficiency_gains": "70-90% faster documentation and reporting",
-                "payback_period": "8-14 months for healthcare AI solutions"
-            }
-        elif "finance" in industry.lower():
-            return {
-                "cost_savings": "50-70% reduction in processing costs",
-                "revenue_impact": "25-35% increase in customer retention",
-                "efficiency_gains": "80-95% faster transaction processing",
-                "payback_period": "4-8 months for financial AI solutions"
-            }
-        else:
-            return {
-                "cost_savings": "30-50% reduction in operational costs",
-                "revenue_impact": "15-25% increase in customer engagement",
-                "efficiency_gains": "60-80% faster task completion",
-                "payback_period": "6-12 months for most solutions"
-            }
\ No newline at end of file
+        return self.engine.roi_for(industry)
+
+    def _model_roi(self, use_cases: List[Dict]) -> Dict:
+        """Monte Carlo ROI distribution from the use cases' stated value"""
+        return summarize_company(estimate_batch([use_cases], samples=self.roi_samples, seed=self.roi_seed,
+                                                assumptions=self.roi_assumptions))
@@ -0,0 +1,144 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from agents.usecase_kb import industry_tokens
+
+DEFAULT_TEMPLATES_PATH = os.path.join(os.path.dirname(__file__), "data", "bonus_templates.json")
+
+# A solution is stored as a tuple of (field, value) pairs so bundles stay immutable
+Solution = Tuple[Tuple[str, str], ...]
+
+
+class SolutionBundle(NamedTuple):
+    """Precomputed, immutable bonus content for one industry"""
+    key: Optional[str]
+    internal: Tuple[Solution, ...]
+    customer: Tuple[Solution, ...]
+    roi: Tuple[Tuple[str, str], ...]
+
+
+def _freeze(solution: Dict) -> Solution:
+    return tuple(solution.items())
+
+
+def _render(frozen: Tuple, industry: str) -> Dict:
+    return {name: value.replace("{industry}", industry) for name, value in frozen}
+
+
+class BonusTemplateEngine:
+    """Renders bonus solutions, roadmap and ROI from precompiled industry bundles"""
+
+    def __init__(self, version: str, source_hash: str, industry_index: Dict[str, str],
+                 bundles: Dict[Optional[str], SolutionBundle], shared_internal: Tuple[Solution, ...],
+                 shared_customer: Tuple[Solution, ...], roadmap: Tuple[Tuple[str, str, str], ...]):
+        self.version = version
+        self.source_hash = source_hash
+        self.industry_index = industry_index
+        self.bundles = bundles
+        self.shared_internal = shared_internal
+        self.shared_customer = shared_customer
+        self.roadmap = roadmap
+
+    @classmethod
+    def compile(cls, data: Dict, source_hash: str = "") -> "BonusTemplateEngine":
+        generic = data.get("generic", {})
+        generic_roi = tuple(generic.get("roi", {}).items())
+        industry_index = {}
+        bundles = {None: SolutionBundle(
+            None,
+            tuple(_freeze(s) for s in generic.get("internal", [])),
+            tuple(_freeze(s) for s in generic.get("customer", [])),
+            generic_roi,
+        )}
+        for key, spec in data.get("industries", {}).items():
+            for keyword in spec.get("keywords", [key]):
+                industry_index.setdefault(keyword.lower(), key)
+            bundles[key] = SolutionBundle(
+                key,
+                tuple(_freeze(s) for s in spec.get("internal", [])),
+                tuple(_freeze(s) for s in spec.get("customer", [])),
+                tuple(spec["roi"].items()) if "roi" in spec else generic_roi,
+            )
+        shared = data.get("shared", {})
+        roadmap = tuple((p["phase"], p["focus"], p.get("deliverables_from", "")) for p in data.get("roadmap", []))
+        return cls(str(data.get("version", "0")), source_hash, industry_index, bundles,
+                   tuple(_freeze(s) for s in shared.get("internal", [])),
+                   tuple(_freeze(s) for s in shared.get("customer", [])),
+                   roadmap)
+
+    def bundle_for(self, industry: str) -> SolutionBundle:
+        for token in industry_tokens(industry):
+            key = self.industry_index.get(token)
+            if key:
+                return self.bundles[key]
+        return self.bundles[None]
+
+    def internal_solutions(self, industry: str, limit: int = 3) -> List[Dict]:
+        return self._with_shared(self.bundle_for(industry).internal, self.shared_internal, industry, limit)
+
+    def customer_solutions(self, industry: str, limit: int = 2) -> List[Dict]:
+        return self._with_shared(self.bundle_for(industry).customer, self.shared_customer, industry, limit)
+
+    @staticmethod
+    def _with_shared(specific: Tuple, shared: Tuple, industry: str, limit: int) -> List[Dict]:
+        """Industry solutions first, topped up from the cross-industry pool"""
+        solutions = [_render(s, industry) for s in specific[:limit]]
+        names = {s["name"] for s in solutions}
+        for frozen in shared:
+            if len(solutions) >= limit:
+                break
+            solution = _render(frozen, industry)
+            if solution["name"] not in names:
+                names.add(solution["name"])
+                solutions.append(solution)
+        return solutions
+
+    def roadmap_for(self, industry: str, internal: List[Dict], customer: List[Dict], use_cases: List[Dict]) -> List[Dict]:
+        """Roadmap phases whose deliverables come from the generated solutions and use cases"""
+        sources = {
+            "internal": [s["name"] for s in internal],
+            "customer": [s["name"] for s in customer],
+            "use_cases": [uc["name"] for uc in use_cases],
+        }
+        planned = set()
+        roadmap = []
+        for phase, focus, source in self.roadmap:
+            names = [name for name in sources.get(source, []) if name not in planned][:3]
+            planned.update(names)
+            roadmap.append({
+                "phase": phase,
+                "focus": focus.replace("{industry}", industry),
+                "deliverables": ", ".join(names) if names else "Industry-specific AI solutions, Advanced analytics",
+            })
+        return roadmap
+
+    def roi_for(self, industry: str) -> Dict:
+        return _render(self.bundle_for(industry).roi, industry)
+
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def load_bonus_engine(path: str = None) -> BonusTemplateEngine:
+    """Bundles compiled once per process and template version.
+
+    Other worker processes get this engine from the warm-start snapshot (see warm_start).
+    """
+    path = path or os.getenv('BONUS_TEMPLATES_PATH') or DEFAULT_TEMPLATES_PATH
+    with open(path, 'rb') as f:
+        raw = f.read()
+    source_hash = hashlib.sha256(raw).hexdigest()
+
+    with _engines_lock:
+        engine = _engines.get(path)
+        if engine and engine.source_hash == source_hash:
+            return engine
+
+        engine = BonusTemplateEngine.compile(json.loads(raw), source_hash)
+        print(f"[DEBUG] Compiled bonus templates v{engine.version}")
+        _engines[path] = engine
+        return engine
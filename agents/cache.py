@@ -0,0 +1,111 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+
+
+class LRUCache:
+    """Thread-safe LRU cache with optional TTL and size bound.
+
+    ``get_or_compute`` collapses concurrent misses for the same key into a
+    single computation (single-flight), so duplicate queries arriving at the
+    same time only do the work once.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = None, max_bytes: int = None,
+                 sizeof: Callable[[Any], int] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof or (lambda value: 0)
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._inflight = {}
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            value = self._get_locked(key)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        with self._lock:
+            self._set_locked(key, value)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        while True:
+            with self._lock:
+                value = self._get_locked(key)
+                if value is not _MISSING:
+                    self.hits += 1
+                    return value
+                event = self._inflight.get(key)
+                if event is None:
+                    self.misses += 1
+                    event = self._inflight[key] = threading.Event()
+                    break
+            # Another thread is computing this key; wait and re-check
+            event.wait()
+
+        try:
+            value = compute()
+            with self._lock:
+                self._set_locked(key, value)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            event.set()
+
+    def invalidate(self, key: Hashable = None):
+        with self._lock:
+            if key is None:
+                self._data.clear()
+                self._bytes = 0
+            elif key in self._data:
+                self._bytes -= self._data.pop(key)[2]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0,
+            }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _get_locked(self, key):
+        item = self._data.get(key)
+        if item is None:
+            return _MISSING
+        value, stored_at, _ = item
+        if self.ttl is not None and time.time() - stored_at > self.ttl:
+            self._bytes -= self._data.pop(key)[2]
+            return _MISSING
+        self._data.move_to_end(key)
+        return value
+
+    def _set_locked(self, key, value):
+        size = self.sizeof(value)
+        if key in self._data:
+            self._bytes -= self._data.pop(key)[2]
+        self._data[key] = (value, time.time(), size)
+        self._bytes += size
+        while self._data and (len(self._data) > self.max_entries or
+                              (self.max_bytes is not None and self._bytes > self.max_bytes)):
+            _, (_, _, evicted_size) = self._data.popitem(last=False)
+            self._bytes -= evicted_size
+
+
+_MISSING = object()
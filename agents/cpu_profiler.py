@@ -0,0 +1,219 @@
+import contextlib
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+DEFAULT_PROFILE_DIR = os.path.join("reports", "profiles")
+
+# Leaf frames of threads parked on a lock, queue or socket poll; only used where
+# per-thread CPU clocks are unavailable
+_IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+    ("thread.py", "_worker"),
+}
+
+
+def _short_path(path: str) -> str:
+    if "site-packages" + os.sep in path:
+        return path.split("site-packages" + os.sep, 1)[1]
+    try:
+        relative = os.path.relpath(path)
+    except ValueError:
+        return path
+    if relative.startswith(".."):
+        return os.path.join(*path.split(os.sep)[-2:])
+    return relative
+
+
+def frame_label(code) -> str:
+    """Collapsed-stack frame name, e.g. ``_extract_company_info (agents/research_agent.py:120)``"""
+    return f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _idle(frame) -> bool:
+    return (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in _IDLE_FRAMES
+
+
+def _thread_cpu_time(ident: int) -> Optional[float]:
+    """CPU seconds used by a thread, or None where the platform has no per-thread clocks"""
+    try:
+        return time.clock_gettime(time.pthread_getcpuclockid(ident))
+    except (AttributeError, OSError):
+        return None
+
+
+class StageProfiler:
+    """Per-stage CPU profiles for the research pipeline, attached as a stage observer.
+
+    Two profilers run side by side, both accumulating over every run until
+    ``write`` is called, so a batch yields one profile per stage:
+
+    - cProfile on the thread running the stage, written as ``<stage>.pstats``
+      and a ``<stage>.txt`` table of the hottest functions;
+    - a sampler that walks every thread's stack each ``interval`` seconds
+      while a stage is active, written as ``<stage>.collapsed`` (one
+      ``frame;frame;frame count`` line per stack, the input format of
+      flamegraph.pl and speedscope). A thread is only sampled when its CPU
+      clock advanced since the previous sample, so threads sleeping on a
+      rate limiter, lock or socket do not show up as hot code.
+
+    While attached, the system's pipeline result cache is switched off
+    (unless ``keep_cache``), so repeated queries profile the stages rather
+    than cache lookups.
+    """
+
+    def __init__(self, output_dir: str = None, interval: float = 0.005, deterministic: bool = True,
+                 top: int = 25):
+        if output_dir is None:
+            output_dir = os.path.join(DEFAULT_PROFILE_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}")
+        self.output_dir = output_dir
+        self.interval = interval
+        self.deterministic = deterministic
+        self.top = top
+        self.profiles = {}
+        self.samples = {}
+        self.wall = {}
+        self._stage = None
+        self._stop = threading.Event()
+        self._sampler = None
+        self._result_cache = None
+
+    def attach(self, system, keep_cache: bool = False) -> "StageProfiler":
+        system.stage_observers.append(self.observe)
+        if not keep_cache and system.result_cache is not None:
+            self._result_cache, system.result_cache = system.result_cache, None
+            print("[INFO] Profiling: pipeline result cache off so every stage runs")
+        if self.interval and self._sampler is None:
+            self._stop.clear()
+            self._sampler = threading.Thread(target=self._sample, name="stage-sampler", daemon=True)
+            self._sampler.start()
+        return self
+
+    def detach(self, system):
+        if self.observe in system.stage_observers:
+            system.stage_observers.remove(self.observe)
+        if self._result_cache is not None:
+            system.result_cache, self._result_cache = self._result_cache, None
+        if self._sampler is not None:
+            self._stop.set()
+            self._sampler.join()
+            self._sampler = None
+
+    @contextlib.contextmanager
+    def observe(self, name: str):
+        profile = self.profiles.setdefault(name, cProfile.Profile()) if self.deterministic else None
+        self._stage = name
+        started = time.perf_counter()
+        if profile is not None:
+            profile.enable()
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+            self._stage = None
+            calls, seconds = self.wall.get(name, (0, 0.0))
+            self.wall[name] = (calls + 1, seconds + time.perf_counter() - started)
+
+    def _sample(self):
+        own = threading.get_ident()
+        cpu_seen = {}
+        while not self._stop.wait(self.interval):
+            stage = self._stage
+            if stage is None:
+                continue
+            counter = self.samples.setdefault(stage, Counter())
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                cpu = _thread_cpu_time(ident)
+                if cpu is None:
+                    if _idle(frame):
+                        continue
+                else:
+                    previous, cpu_seen[ident] = cpu_seen.get(ident), cpu
+                    if previous is None or cpu <= previous:
+                        continue
+                stack = []
+                while frame is not None:
+                    stack.append(frame_label(frame.f_code))
+                    frame = frame.f_back
+                counter[";".join(reversed(stack))] += 1
+
+    def write(self) -> Dict:
+        """Write per-stage collapsed stacks, pstats dumps and tables plus ``summary.json``"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        summary = {"output_dir": self.output_dir, "interval": self.interval, "stages": {}}
+        for stage, (calls, seconds) in self.wall.items():
+            info = {"calls": calls, "wall_seconds": round(seconds, 4)}
+
+            samples = self.samples.get(stage)
+            if samples:
+                with open(os.path.join(self.output_dir, f"{stage}.collapsed"), 'w', encoding='utf-8') as f:
+                    for stack, count in samples.most_common():
+                        f.write(f"{stack} {count}\n")
+                self_samples = Counter()
+                for stack, count in samples.items():
+                    self_samples[stack.rsplit(";", 1)[-1]] += count
+                info["samples"] = sum(samples.values())
+                info["top_self"] = self_samples.most_common(10)
+
+            profile = self.profiles.get(stage)
+            if profile is not None:
+                profile.dump_stats(os.path.join(self.output_dir, f"{stage}.pstats"))
+                stream = io.StringIO()
+                stats = pstats.Stats(profile, stream=stream)
+                stats.sort_stats("tottime").print_stats(self.top)
+                stats.sort_stats("cumulative").print_stats(self.top)
+                with open(os.path.join(self.output_dir, f"{stage}.txt"), 'w', encoding='utf-8') as f:
+                    f.write(stream.getvalue())
+                info["profiled_seconds"] = round(stats.total_tt, 4)
+
+            summary["stages"][stage] = info
+
+        with open(os.path.join(self.output_dir, "summary.json"), 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        return summary
+
+
+def format_summary(summary: Dict) -> str:
+    stages = summary["stages"]
+    lines = [f"{'stage':<12}{'calls':>7}{'wall s':>10}{'profiled s':>12}{'samples':>9}  hottest (self samples)"]
+    totals = Counter()
+    for stage, info in stages.items():
+        top_self = info.get("top_self") or []
+        hottest = f"{top_self[0][0]} ({top_self[0][1]})" if top_self else "-"
+        lines.append(f"{stage:<12}{info['calls']:>7}{info['wall_seconds']:>10.3f}"
+                     f"{info.get('profiled_seconds', 0):>12.3f}{info.get('samples', 0):>9}  {hottest}")
+        for label, count in top_self:
+            totals[f"{stage}: {label}"] += count
+    if totals:
+        lines.append("\nHottest functions across stages (self samples):")
+        lines.extend(f"  {count:>6}  {label}" for label, count in totals.most_common(10))
+    lines.append(f"\nProfiles written to {summary['output_dir']}")
+    return "\n".join(lines)
+
+
+def add_profile_arguments(parser):
+    parser.add_argument("--profile", action="store_true",
+                        help="Profile each pipeline stage (cProfile tables + sampled collapsed stacks)")
+    parser.add_argument("--profile-dir", help=f"Profile output directory (default {DEFAULT_PROFILE_DIR}/<timestamp>-<pid>)")
+    parser.add_argument("--profile-interval", type=float, default=5.0,
+                        help="Sampling interval in milliseconds (0 disables the sampler)")
+
+
+def profiler_from_args(args) -> StageProfiler:
+    """StageProfiler configured from ``add_profile_arguments`` flags; None without --profile"""
+    if not args.profile:
+        return None
+    return StageProfiler(output_dir=args.profile_dir, interval=args.profile_interval / 1000.0)
@@ -0,0 +1,257 @@
+import bisect
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, List
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Log-spaced bucket upper bounds from 5 ms to ~2 min
+BUCKET_BOUNDS = [0.005 * 1.25 ** i for i in range(46)]
+
+
+class BudgetExceeded(Exception):
+    """Raised when a request cannot start because the latency budget is spent"""
+
+
+class LatencyBudget:
+    """Wall-clock budget for one run, shared by every call made on its behalf"""
+
+    def __init__(self, seconds: float = None, deadline: float = None):
+        self.deadline = deadline if deadline is not None else time.monotonic() + seconds
+
+    @classmethod
+    def until(cls, deadline: float) -> "LatencyBudget":
+        return cls(deadline=deadline)
+
+    def remaining(self) -> float:
+        return max(0.0, self.deadline - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram; counts are halved periodically so percentiles track recent behavior"""
+
+    def __init__(self, window: int = 500):
+        self.window = window
+        self.counts = [0.0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        with self._lock:
+            self.counts[bisect.bisect_left(BUCKET_BOUNDS, seconds)] += 1
+            self.count += 1
+            if self.count >= 2 * self.window:
+                self.counts = [c / 2 for c in self.counts]
+                self.count /= 2
+
+    def percentile(self, p: float) -> float:
+        """Upper bound of the bucket holding the p-th percentile (0 when empty)"""
+        with self._lock:
+            target = self.count * p / 100.0
+            cumulative = 0.0
+            for index, count in enumerate(self.counts):
+                cumulative += count
+                if count and cumulative >= target:
+                    return BUCKET_BOUNDS[min(index, len(BUCKET_BOUNDS) - 1)]
+            return 0.0
+
+    def snapshot(self) -> Dict:
+        return {"count": int(self.count), "p50": self.percentile(50), "p95": self.percentile(95),
+                "p99": self.percentile(99)}
+
+
+class HTTPClient:
+    """Pooled HTTP client with per-provider latency tracking.
+
+    Timeouts adapt to each provider's observed p99 (times ``timeout_multiplier``,
+    never above the caller's timeout) once ``min_samples`` requests were seen.
+    With hedging enabled for a provider, a duplicate request is sent when the
+    first has not answered after the provider's p95, and the first response
+    wins. Every call is capped by the caller's ``LatencyBudget``. For
+    ``stream=True`` requests the latency and the timeout cover reading the
+    body, not just the headers.
+    """
+
+    def __init__(self, session: requests.Session = None, pool_maxsize: int = 16, hedge: List[str] = None,
+                 timeout_multiplier: float = 3.0, min_timeout: float = 1.0, min_samples: int = 20):
+        if session is None:
+            session = requests.Session()
+            session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize))
+        self.session = session
+        if hedge is None:
+            hedge = [name.strip() for name in os.getenv('HTTP_HEDGE', '').split(',') if name.strip()]
+        self.hedge = set(hedge)
+        self.timeout_multiplier = timeout_multiplier
+        self.min_timeout = min_timeout
+        self.min_samples = min_samples
+        self.histograms = {}
+        self.stats = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=pool_maxsize, thread_name_prefix="hedge")
+
+    def histogram(self, provider: str) -> LatencyHistogram:
+        with self._lock:
+            if provider not in self.histograms:
+                self.histograms[provider] = LatencyHistogram()
+                self.stats[provider] = {"requests": 0, "hedged": 0, "hedge_wins": 0, "timeouts": 0, "errors": 0}
+            return self.histograms[provider]
+
+    def timeout_for(self, provider: str, default: float, budget: LatencyBudget = None) -> float:
+        histogram = self.histogram(provider)
+        timeout = default
+        if histogram.count >= self.min_samples:
+            timeout = min(default, max(self.min_timeout, histogram.percentile(99) * self.timeout_multiplier))
+        if budget is not None:
+            timeout = min(timeout, budget.remaining())
+        return timeout
+
+    def request(self, provider: str, method: str, url: str, timeout: float = 10.0, budget: LatencyBudget = None,
+                hedge: bool = None, **kwargs) -> requests.Response:
+        """Send a request for ``provider``, hedging it if enabled and latency history allows"""
+        timeout = self.timeout_for(provider, timeout, budget)
+        if timeout <= 0:
+            raise BudgetExceeded(f"latency budget exhausted before {provider} request")
+
+        histogram = self.histogram(provider)
+        if hedge is None:
+            hedge = provider in self.hedge or "*" in self.hedge
+        hedge_after = histogram.percentile(95) if hedge and histogram.count >= self.min_samples else None
+        if hedge_after is None or hedge_after >= timeout:
+            return self._timed(provider, method, url, timeout, kwargs)
+
+        primary = self._executor.submit(self._timed, provider, method, url, timeout, kwargs)
+        done, _ = wait([primary], timeout=hedge_after)
+        if done:
+            return primary.result()
+
+        # The duplicate gets whatever is left of the original timeout
+        self._count(provider, "hedged")
+        backup = self._executor.submit(self._timed, provider, method, url, timeout - hedge_after, kwargs)
+        pending = {primary, backup}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is backup:
+                        self._count(provider, "hedge_wins")
+                    for loser in pending:
+                        loser.add_done_callback(_close_response)
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def for_provider(self, provider: str, budget: LatencyBudget = None) -> "ProviderSession":
+        return ProviderSession(self, provider, budget)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Latency percentiles and counters per provider"""
+        with self._lock:
+            providers = list(self.histograms)
+        return {name: dict(self.histograms[name].snapshot(), **self.stats[name]) for name in providers}
+
+    def _timed(self, provider: str, method: str, url: str, timeout: float, kwargs: Dict) -> requests.Response:
+        self._count(provider, "requests")
+        start = time.monotonic()
+        try:
+            response = self.session.request(method, url, timeout=timeout, **kwargs)
+        except requests.Timeout:
+            # Censored sample: the true latency was at least the timeout
+            self.histogram(provider).observe(timeout)
+            self._count(provider, "timeouts")
+            raise
+        except Exception:
+            self._count(provider, "errors")
+            raise
+        if kwargs.get("stream"):
+            self._time_body(provider, response, start, start + timeout)
+        else:
+            self.histogram(provider).observe(time.monotonic() - start)
+        return response
+
+    def _time_body(self, provider: str, response: requests.Response, start: float, deadline: float):
+        """Time a streamed response until its body is consumed or closed, failing reads past the deadline"""
+        observed = []
+
+        def observe(seconds: float):
+            if not observed:
+                observed.append(seconds)
+                self.histogram(provider).observe(seconds)
+
+        iter_content, close = response.iter_content, response.close
+
+        def timed_out():
+            observe(deadline - start)
+            self._count(provider, "timeouts")
+            close()
+            return requests.Timeout(f"{provider} response body not read within {deadline - start:.1f}s")
+
+        def timed_iter_content(chunk_size: int = 1, decode_unicode: bool = False):
+            chunks = iter_content(chunk_size, decode_unicode)
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise timed_out()
+                # Each read may only wait for what is left of the call's timeout
+                _set_read_timeout(response, remaining)
+                try:
+                    chunk = next(chunks)
+                except StopIteration:
+                    break
+                except requests.ConnectionError as e:
+                    # requests reports a read timeout while streaming as a ConnectionError
+                    if "timed out" in str(e).lower():
+                        raise timed_out() from e
+                    self._count(provider, "errors")
+                    raise
+                yield chunk
+            observe(time.monotonic() - start)
+
+        def timed_close():
+            # Readers may stop early (e.g. the Serper stream parser); the call ends when they let go
+            observe(time.monotonic() - start)
+            close()
+
+        response.iter_content = timed_iter_content
+        response.close = timed_close
+
+    def _count(self, provider: str, field: str):
+        self.histogram(provider)
+        with self._lock:
+            self.stats[provider][field] += 1
+
+
+def _set_read_timeout(response: requests.Response, seconds: float):
+    """Best effort: urllib3 hands the socket to http.client once headers are read"""
+    sock = getattr(getattr(response.raw, "connection", None), "sock", None)
+    if sock is None:
+        fp = getattr(getattr(response.raw, "_fp", None), "fp", None)
+        sock = getattr(getattr(fp, "raw", None), "_sock", None)
+    if sock is not None:
+        sock.settimeout(seconds)
+
+
+def _close_response(future):
+    if future.exception() is None:
+        future.result().close()
+
+
+class ProviderSession:
+    """requests-style get/post bound to one provider and latency budget"""
+
+    def __init__(self, client: HTTPClient, provider: str, budget: LatencyBudget = None):
+        self.client = client
+        self.provider = provider
+        self.budget = budget
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.client.request(self.provider, "GET", url, budget=self.budget, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.client.request(self.provider, "POST", url, budget=self.budget, **kwargs)
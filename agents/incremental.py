@@ -0,0 +1,166 @@
+import hashlib
+from datetime import datetime
+from typing import Callable, Dict, List
+
+# Research fields whose items are compared one by one in the delta report
+RESEARCH_LIST_FIELDS = ("company_offerings", "focus_areas", "competitors", "market_trends")
+
+
+def content_hash(result: Dict) -> str:
+    """Hash of what extractors read from a search result"""
+    text = f"{result.get('title', '')}\x1f{result.get('snippet', '')}"
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+
+
+def diff_sources(old: List[Dict], new: List[Dict], key: Callable[[Dict], str] = None) -> Dict:
+    """Search results added, removed and changed (same URL, new content) between two runs"""
+    key = key or (lambda result: result.get('link', ''))
+    old_by_url = {key(r): r for r in old}
+    new_by_url = {key(r): r for r in new}
+
+    def brief(result):
+        return {"url": result.get('link', ''), "title": result.get('title', '')}
+
+    return {
+        "added": [brief(r) for url, r in new_by_url.items() if url not in old_by_url],
+        "removed": [brief(r) for url, r in old_by_url.items() if url not in new_by_url],
+        "changed": [brief(r) for url, r in new_by_url.items()
+                    if url in old_by_url and content_hash(r) != content_hash(old_by_url[url])],
+        "unchanged": sum(1 for url, r in new_by_url.items()
+                         if url in old_by_url and content_hash(r) == content_hash(old_by_url[url])),
+    }
+
+
+def has_changes(diff: Dict) -> bool:
+    return any(diff.get(field) for field in ("added", "removed", "changed"))
+
+
+def case_fingerprint(use_case: Dict) -> str:
+    """Identity of a use case as far as resource search is concerned"""
+    return content_hash({"title": use_case.get('name', ''), "snippet": use_case.get('description', '')})
+
+
+def reusable_resources(previous_use_cases: List[Dict], previous_resources: Dict, use_cases: List[Dict]) -> Dict:
+    """Stored resources for use cases whose name and description did not change"""
+    if not previous_use_cases or not previous_resources:
+        return {}
+    old = {uc['name']: case_fingerprint(uc) for uc in previous_use_cases}
+    return {uc['name']: previous_resources[uc['name']] for uc in use_cases
+            if uc['name'] in previous_resources and old.get(uc['name']) == case_fingerprint(uc)}
+
+
+def _diff_items(old: List, new: List) -> Dict:
+    diff = {}
+    added = [item for item in new if item not in old]
+    removed = [item for item in old if item not in new]
+    if added:
+        diff["added"] = added
+    if removed:
+        diff["removed"] = removed
+    return diff
+
+
+def _diff_named(old: List[Dict], new: List[Dict]) -> Dict:
+    old_by_name = {item['name']: item for item in old}
+    new_by_name = {item['name']: item for item in new}
+    diff = _diff_items(list(old_by_name), list(new_by_name))
+    changed = [name for name, item in new_by_name.items() if name in old_by_name and item != old_by_name[name]]
+    if changed:
+        diff["changed"] = changed
+    return diff
+
+
+def _solutions(bonus: Dict) -> List[Dict]:
+    bonus = bonus or {}
+    return bonus.get('internal_solutions', []) + bonus.get('customer_solutions', [])
+
+
+def build_delta(query: str, previous: Dict, current: Dict, source_diff: Dict, stages: Dict,
+                provider_calls: int = 0, previous_at: float = None) -> Dict:
+    """Compact description of what changed between a stored run and a refreshed one"""
+    source_diff = source_diff or diff_sources([], [])
+    old_research, new_research = previous.get("research") or {}, current["research"]
+    research = {}
+    for field in RESEARCH_LIST_FIELDS:
+        diff = _diff_items(old_research.get(field) or [], new_research.get(field) or [])
+        if diff:
+            research[field] = diff
+    for field in ("industry", "market_size"):
+        if old_research.get(field) != new_research.get(field):
+            research[field] = {"old": old_research.get(field), "new": new_research.get(field)}
+
+    old_resources = previous.get("resources") or {}
+    resources = {}
+    for case, case_resources in current["resources"].items():
+        diff = _diff_items([r['url'] for r in old_resources.get(case, [])], [r['url'] for r in case_resources])
+        if diff:
+            resources[case] = diff
+
+    delta = {
+        "query": query,
+        "since": previous_at,
+        "sources": source_diff,
+        "research": research,
+        "use_cases": _diff_named(previous.get("use_cases") or [], current["use_cases"]),
+        "resources": resources,
+        "bonus": _diff_named(_solutions(previous.get("bonus")), _solutions(current["bonus"])),
+        "recomputed": [name for name, s in stages.items() if s["status"] == "complete"],
+        "reused": [name for name, s in stages.items() if s["status"] == "cached"],
+        "provider_calls": provider_calls,
+    }
+    delta["changed"] = bool(has_changes(source_diff) or research or delta["use_cases"] or resources or delta["bonus"])
+    return delta
+
+
+def format_delta(delta: Dict) -> str:
+    """Markdown "what changed" report"""
+    since = datetime.fromtimestamp(delta["since"]).strftime('%Y-%m-%d %H:%M') if delta.get("since") else "unknown"
+    sources = delta["sources"]
+    lines = [
+        f"# 🔄 What Changed: {delta['query']}",
+        "",
+        f"**Compared with run from:** {since}  ",
+        f"**Search results:** {len(sources['added'])} new, {len(sources['removed'])} dropped, "
+        f"{len(sources['changed'])} updated, {sources['unchanged']} unchanged  ",
+        f"**Recomputed:** {', '.join(delta['recomputed']) or 'nothing'}  ",
+        f"**Reused:** {', '.join(delta['reused']) or 'nothing'}  ",
+        f"**Provider calls:** {delta['provider_calls']}",
+        "",
+    ]
+    if not delta["changed"]:
+        lines.append("No changes since the previous run.")
+        return "\n".join(lines) + "\n"
+
+    if has_changes(sources):
+        lines.append("## Search Results")
+        lines.extend(f"- ➕ [{s['title']}]({s['url']})" for s in sources['added'])
+        lines.extend(f"- ✏️ [{s['title']}]({s['url']})" for s in sources['changed'])
+        lines.extend(f"- ➖ [{s['title']}]({s['url']})" for s in sources['removed'])
+        lines.append("")
+
+    if delta["research"]:
+        lines.append("## Research")
+        for field, diff in delta["research"].items():
+            label = field.replace('_', ' ').capitalize()
+            if "old" in diff:
+                lines.append(f"- {label}: {diff['old']} → {diff['new']}")
+            else:
+                lines.extend(f"- {label}: ➕ {item}" for item in diff.get("added", []))
+                lines.extend(f"- {label}: ➖ {item}" for item in diff.get("removed", []))
+        lines.append("")
+
+    for title, diff in (("Use Cases", delta["use_cases"]), ("Bonus Solutions", delta["bonus"])):
+        if diff:
+            lines.append(f"## {title}")
+            lines.extend(f"- ➕ {name}" for name in diff.get("added", []))
+            lines.extend(f"- ✏️ {name}" for name in diff.get("changed", []))
+            lines.extend(f"- ➖ {name}" for name in diff.get("removed", []))
+            lines.append("")
+
+    if delta["resources"]:
+        lines.append("## Resources")
+        for case, diff in delta["resources"].items():
+            lines.extend(f"- {case}: ➕ {url}" for url in diff.get("added", []))
+            lines.extend(f"- {case}: ➖ {url}" for url in diff.get("removed", []))
+        lines.append("")
+    return "\n".join(lines)
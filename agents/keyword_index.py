@@ -0,0 +1,156 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from agents.usecase_kb import UseCaseKnowledgeBase, load_knowledge_base
+from agents.usecase_scoring import tokenize
+
+DEFAULT_INDEX_DIR = os.path.join("reports", "cache", "keywords")
+INDEX_FORMAT = 2
+NAME_WEIGHT = 2.0  # a term in the use-case name counts twice as much as one in the description
+
+
+def corpus_documents(kb: UseCaseKnowledgeBase) -> List[str]:
+    """One document (name + description) per use-case template in the catalog"""
+    tables = list(kb.base.values()) + list(kb.genai.values()) + [kb.focus.values(), kb.trend.values()]
+    documents = []
+    for templates in tables:
+        for template in templates:
+            fields = dict(template.fields)
+            text = f"{fields.get('name', '')} {fields.get('description', '')}"
+            documents.append(text.replace("{industry}", " "))
+    return documents
+
+
+class KeywordIndex:
+    """Corpus-level vocabulary with IDF weights for picking discriminative search terms.
+
+    The IDF vector is saved as ``idf.npy`` and memory-mapped on load, so every
+    process shares one read-only copy; ``vocab.json`` maps terms to rows.
+    """
+
+    def __init__(self, vocab: Dict[str, int], idf: np.ndarray, corpus_hash: str = ""):
+        self.vocab = vocab
+        self.idf = idf
+        self.corpus_hash = corpus_hash
+        self.terms = sorted(vocab, key=vocab.get)
+        # Unseen terms are rarer than anything in the corpus
+        self.unseen_idf = float(idf.max()) if len(idf) else 1.0
+
+    @classmethod
+    def build(cls, documents: Sequence[str], corpus_hash: str = "") -> "KeywordIndex":
+        vocab = {}
+        df = []
+        for document in documents:
+            # First-occurrence order keeps term ids identical across builds (set order is hash-seeded)
+            for token in dict.fromkeys(tokenize(document)):
+                index = vocab.setdefault(token, len(vocab))
+                if index == len(df):
+                    df.append(0)
+                df[index] += 1
+        df = np.array(df, dtype=np.float32)
+        idf = np.log((1.0 + len(documents)) / (1.0 + df)) + 1.0
+        return cls(vocab, idf.astype(np.float32), corpus_hash)
+
+    def save(self, root: str):
+        os.makedirs(root, exist_ok=True)
+        tmp_suffix = f".{os.getpid()}.tmp"
+        with open(os.path.join(root, "idf.npy" + tmp_suffix), 'wb') as f:
+            np.save(f, self.idf)
+        with open(os.path.join(root, "vocab.json" + tmp_suffix), 'w', encoding='utf-8') as f:
+            json.dump({"format": INDEX_FORMAT, "corpus_hash": self.corpus_hash, "vocab": self.vocab}, f)
+        # idf first, so a vocab with a matching hash always has its idf on disk
+        os.replace(os.path.join(root, "idf.npy" + tmp_suffix), os.path.join(root, "idf.npy"))
+        os.replace(os.path.join(root, "vocab.json" + tmp_suffix), os.path.join(root, "vocab.json"))
+
+    @classmethod
+    def load(cls, root: str, corpus_hash: str) -> "KeywordIndex":
+        """Memory-map a saved index; None if missing or built from another corpus"""
+        try:
+            with open(os.path.join(root, "vocab.json"), encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get("format") != INDEX_FORMAT or meta.get("corpus_hash") != corpus_hash:
+                return None
+            idf = np.load(os.path.join(root, "idf.npy"), mmap_mode='r')
+        except (OSError, ValueError):
+            return None
+        if len(idf) != len(meta["vocab"]):
+            return None
+        return cls(meta["vocab"], idf, corpus_hash)
+
+    def extract_batch(self, items: Sequence[Tuple[str, str]], k: int = 3) -> List[List[str]]:
+        """Top-k TF-IDF terms for every (name, description) pair in one vectorized pass"""
+        rows, term_ids, weights = [], [], []
+        local = {}  # batch-local ids for terms outside the corpus vocabulary
+        extra_terms = []
+        for row, (name, description) in enumerate(items):
+            for tokens, weight in ((tokenize(name), NAME_WEIGHT), (tokenize(description), 1.0)):
+                for token in tokens:
+                    index = self.vocab.get(token)
+                    if index is None:
+                        index = local.get(token)
+                        if index is None:
+                            index = local[token] = len(self.vocab) + len(local)
+                            extra_terms.append(token)
+                    rows.append(row)
+                    term_ids.append(index)
+                    weights.append(weight)
+        keywords = [[] for _ in items]
+        if not rows:
+            return keywords
+
+        rows = np.array(rows, dtype=np.int64)
+        term_ids = np.array(term_ids, dtype=np.int64)
+        idf = np.concatenate([np.asarray(self.idf, dtype=np.float32),
+                              np.full(len(local), self.unseen_idf, dtype=np.float32)])
+
+        # Sum term frequencies per (row, term), then weight by IDF
+        width = len(idf)
+        pairs, inverse = np.unique(rows * width + term_ids, return_inverse=True)
+        tf = np.bincount(inverse, weights=np.array(weights, dtype=np.float32))
+        pair_rows, pair_terms = pairs // width, pairs % width
+        scores = tf * idf[pair_terms]
+
+        # Order by row, then score descending (term id breaks ties), and keep the first k per row
+        order = np.lexsort((pair_terms, -scores, pair_rows))
+        pair_rows, pair_terms = pair_rows[order], pair_terms[order]
+        starts = np.searchsorted(pair_rows, pair_rows, side='left')
+        keep = (np.arange(len(pair_rows)) - starts) < k
+
+        terms = self.terms + extra_terms if extra_terms else self.terms
+        for row, term in zip(pair_rows[keep].tolist(), pair_terms[keep].tolist()):
+            keywords[row].append(terms[term])
+        return keywords
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def load_keyword_index(kb: UseCaseKnowledgeBase = None, root: str = None) -> KeywordIndex:
+    """Memory-map the IDF index for the catalog, rebuilding it when the corpus changed"""
+    kb = kb or load_knowledge_base()
+    root = root or os.getenv('KEYWORD_INDEX_DIR') or DEFAULT_INDEX_DIR
+    documents = corpus_documents(kb)
+    corpus_hash = hashlib.sha256("\n".join(documents).encode('utf-8')).hexdigest()
+
+    with _indexes_lock:
+        index = _indexes.get(root)
+        if index and index.corpus_hash == corpus_hash:
+            return index
+
+        index = KeywordIndex.load(root, corpus_hash)
+        if index is None:
+            index = KeywordIndex.build(documents, corpus_hash)
+            try:
+                index.save(root)
+                index = KeywordIndex.load(root, corpus_hash) or index
+            except OSError as e:
+                print(f"[WARN] Could not write keyword index: {e}")
+            print(f"[DEBUG] Built keyword index over {len(documents)} use cases ({len(index.vocab)} terms)")
+        _indexes[root] = index
+        return index
@@ -0,0 +1,339 @@
+import contextlib
+import heapq
+import itertools
+import random
+import sys
+import threading
+import time
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from agents.tenant_scheduler import AdmissionRejected, TenantScheduler
+
+DEFAULT_QUERIES = [
+    "Tesla Motors", "Apple", "Amazon", "Microsoft", "Google", "Netflix", "Healthcare Industry",
+    "Financial Services", "Retail Industry", "JPMorgan Chase", "Walmart", "Pfizer", "Nike",
+    "Ford Motor Company", "Starbucks", "Manufacturing Industry", "Siemens", "UnitedHealth Group",
+    "Target", "Goldman Sachs", "Education Technology", "Shopify", "Moderna", "General Electric",
+    "Logistics Industry", "FedEx", "Spotify", "Insurance Industry", "Allianz", "Energy Sector",
+]
+
+# A step is saturated when it falls short of any of these
+MIN_THROUGHPUT_RATIO = 0.9  # completed / offered requests per second
+MAX_FAILED_RATIO = 0.01     # rejected, failed or unfinished / submitted
+
+
+def zipf_cum_weights(n: int, s: float) -> List[float]:
+    """Cumulative Zipf weights: the k-th most popular query is drawn with weight 1/k^s"""
+    return list(itertools.accumulate(1.0 / (k ** s) for k in range(1, n + 1)))
+
+
+def percentiles(values: Sequence[float]) -> Dict:
+    if not len(values):
+        return {}
+    values = np.asarray(values, dtype=np.float64)
+    p50, p90, p95, p99 = np.percentile(values, [50, 90, 95, 99])
+    return {"count": len(values), "mean": round(float(values.mean()), 4), "p50": round(float(p50), 4),
+            "p90": round(float(p90), 4), "p95": round(float(p95), 4), "p99": round(float(p99), 4),
+            "max": round(float(values.max()), 4)}
+
+
+class StageTimer:
+    """Stage observer collecting wall time per pipeline stage"""
+
+    def __init__(self):
+        self.samples = {}
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def observe(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.samples.setdefault(name, []).append(elapsed)
+
+    def take(self) -> Dict[str, List[float]]:
+        with self._lock:
+            samples, self.samples = self.samples, {}
+        return samples
+
+
+class LoadGenerator:
+    """Drives a TenantScheduler with simulated Streamlit and API users.
+
+    Sessions arrive as a Poisson process at ``rate`` per second. Each one
+    is a UI user (interactive priority, tenant ``ui``) with probability
+    ``ui_share``, otherwise an API client (batch priority, tenant ``api``).
+    A session issues a geometric number of requests (mean
+    ``requests_per_session``), separated by exponential think times, and
+    picks each query from a Zipf distribution over ``queries``.
+    """
+
+    def __init__(self, scheduler: TenantScheduler, queries: Sequence[str] = None, zipf_s: float = 1.1,
+                 ui_share: float = 0.5, requests_per_session: float = 3.0, think_seconds: float = 5.0,
+                 render: bool = False, seed: int = None):
+        self.scheduler = scheduler
+        self.system = scheduler.system
+        self.queries = list(queries or DEFAULT_QUERIES)
+        self.cum_weights = zipf_cum_weights(len(self.queries), zipf_s)
+        self.zipf_s = zipf_s
+        self.ui_share = ui_share
+        self.requests_per_session = max(1.0, requests_per_session)
+        self.think_seconds = think_seconds
+        self.render = render
+        self.rng = random.Random(seed)
+        self.timer = StageTimer()
+        self.system.stage_observers.append(self.timer.observe)
+
+    def ramp(self, rates: Sequence[float], duration: float, drain: float, slo: float,
+             keep_going: bool = False) -> Dict:
+        """Run one step per arrival rate; stops after the first saturated step unless ``keep_going``"""
+        steps = []
+        for rate in rates:
+            # stderr, so progress shows while the pipeline's own output is silenced
+            print(f"[INFO] Load step: {rate:g} sessions/s for {duration:g}s", file=sys.stderr)
+            step = self.run_step(rate, duration, drain, slo)
+            steps.append(step)
+            if step["saturated"] and not keep_going:
+                break
+        sustainable = [s for s in steps if not s["saturated"]]
+        saturated = [s for s in steps if s["saturated"]]
+        best = max(sustainable, key=lambda s: s["throughput"]) if sustainable else None
+        return {
+            "config": {
+                "rates": list(rates), "duration": duration, "drain": drain, "slo_p95_seconds": slo,
+                "zipf_s": self.zipf_s, "queries": len(self.queries), "ui_share": self.ui_share,
+                "requests_per_session": self.requests_per_session, "think_seconds": self.think_seconds,
+                "render": self.render, "workers": self.scheduler.workers,
+                "reserved_interactive": self.scheduler.reserved_interactive,
+            },
+            "steps": steps,
+            "summary": {
+                "max_sustainable_rate": best["rate"] if best else None,
+                "max_sustainable_throughput": best["throughput"] if best else None,
+                "max_sustainable_sessions": best["sessions"]["peak_active"] if best else None,
+                "saturation_rate": saturated[0]["rate"] if saturated else None,
+                "saturation_reasons": saturated[0]["saturation_reasons"] if saturated else [],
+            },
+        }
+
+    def run_step(self, rate: float, duration: float, drain: float, slo: float) -> Dict:
+        """Offer load for ``duration`` seconds, then wait up to ``drain`` seconds for sessions to finish"""
+        self.timer.take()
+        research_before = self.system.research_agent.cache.stats()
+        cond = threading.Condition()
+        events = []
+        seq = itertools.count()
+        requests = []
+        state = {"active": 0, "outstanding": 0, "closed": False}
+        samples = []
+
+        start = time.monotonic()
+        arrival = start
+        while True:
+            arrival += self.rng.expovariate(rate)
+            if arrival >= start + duration:
+                break
+            kind = "ui" if self.rng.random() < self.ui_share else "api"
+            heapq.heappush(events, (arrival, next(seq), {"kind": kind, "remaining": self._session_length(),
+                                                         "started": False}))
+
+        def schedule_next(session):
+            # Caller holds cond
+            session["remaining"] -= 1
+            if session["remaining"] > 0:
+                think = self.rng.expovariate(1.0 / self.think_seconds) if self.think_seconds > 0 else 0.0
+                heapq.heappush(events, (time.monotonic() + think, next(seq), session))
+            else:
+                state["active"] -= 1
+            cond.notify()
+
+        def done(request, session, future):
+            finished = time.monotonic()
+            with cond:
+                if state["closed"]:
+                    # Past the hard stop: the request stays unfinished
+                    return
+                state["outstanding"] -= 1
+                if future.cancelled():
+                    request["outcome"] = "unfinished"
+                elif future.exception() is not None:
+                    request["outcome"] = "failed"
+                    request["latency"] = finished - request["submitted"]
+                else:
+                    result = future.result()
+                    request["outcome"] = "completed"
+                    request["latency"] = finished - request["submitted"]
+                    request["service"] = result["completeness"]["elapsed_seconds"]
+                    request["stages"] = {name: s["status"] for name, s in result["completeness"]["stages"].items()}
+                request["finished"] = finished
+                schedule_next(session)
+
+        stop_sampling = threading.Event()
+
+        def sample():
+            while not stop_sampling.wait(0.25):
+                snapshot = self.scheduler.snapshot()
+                with cond:
+                    active = state["active"]
+                samples.append((sum(snapshot["queued"].values()), sum(snapshot["running"].values()), active))
+
+        sampler = threading.Thread(target=sample, name="load-sampler", daemon=True)
+        sampler.start()
+
+        hard_stop = start + duration + drain
+        pending = []
+        with cond:
+            while True:
+                now = time.monotonic()
+                if now >= hard_stop or (not events and state["outstanding"] == 0):
+                    state["closed"] = True
+                    break
+                if not events or events[0][0] > now:
+                    cond.wait(min(events[0][0] if events else hard_stop, hard_stop) - now)
+                    continue
+                _, _, session = heapq.heappop(events)
+                if not session["started"]:
+                    session["started"] = True
+                    state["active"] += 1
+                request = {"kind": session["kind"], "query": self._pick_query(), "submitted": now}
+                requests.append(request)
+                try:
+                    future = self.scheduler.submit(
+                        request["query"], tenant=session["kind"],
+                        priority="interactive" if session["kind"] == "ui" else "batch", render=self.render)
+                except AdmissionRejected:
+                    request["outcome"] = "rejected"
+                    schedule_next(session)
+                    continue
+                state["outstanding"] += 1
+                pending.append(future)
+                # The callback takes cond, so register it without holding the lock
+                cond.release()
+                try:
+                    future.add_done_callback(lambda f, r=request, s=session: done(r, s, f))
+                finally:
+                    cond.acquire()
+
+        # Queued work past the hard stop would spill into the next step; running jobs are not waited for
+        for future in pending:
+            future.cancel()
+        stop_sampling.set()
+        sampler.join()
+        return self._summarize(rate, requests, samples, slo, research_before)
+
+    def _session_length(self) -> int:
+        n = 1
+        while self.rng.random() > 1.0 / self.requests_per_session:
+            n += 1
+        return n
+
+    def _pick_query(self) -> str:
+        return self.rng.choices(self.queries, cum_weights=self.cum_weights)[0]
+
+    def _summarize(self, rate: float, requests: List[Dict], samples: List, slo: float,
+                   research_before: Dict) -> Dict:
+        outcomes = {"completed": 0, "failed": 0, "rejected": 0, "unfinished": 0}
+        for request in requests:
+            outcomes[request.get("outcome", "unfinished")] += 1
+        completed = [r for r in requests if r.get("outcome") == "completed"]
+        # Both rates over their own span (follow-up requests keep arriving while the step drains);
+        # the completion span is the submission span shifted by latency unless work piles up
+        submitted = [r["submitted"] for r in requests]
+        finished = [r["finished"] for r in completed]
+        offered = len(submitted) / max(max(submitted) - min(submitted), 1.0) if submitted else 0.0
+        throughput = len(finished) / max(max(finished) - min(finished), 1.0) if finished else 0.0
+
+        latency = {kind: percentiles([r["latency"] for r in completed if r["kind"] == kind]) for kind in ("ui", "api")}
+        latency["all"] = percentiles([r["latency"] for r in completed])
+        queue_wait = percentiles([max(0.0, r["latency"] - r["service"]) for r in completed])
+
+        statuses = {}
+        for request in completed:
+            for stage, status in request["stages"].items():
+                counts = statuses.setdefault(stage, {})
+                counts[status] = counts.get(status, 0) + 1
+        stage_hits = {stage: round(counts.get("cached", 0) / sum(counts.values()), 4)
+                      for stage, counts in statuses.items()}
+        research_after = self.system.research_agent.cache.stats()
+        hits = research_after["hits"] - research_before["hits"]
+        lookups = hits + research_after["misses"] - research_before["misses"]
+
+        workers = self.scheduler.workers
+        queued = [q for q, _, _ in samples] or [0]
+        busy = [b for _, b, _ in samples] or [0]
+        active = [a for _, _, a in samples] or [0]
+
+        reasons = []
+        if offered and throughput < MIN_THROUGHPUT_RATIO * offered:
+            reasons.append(f"throughput {throughput:.2f}/s below {MIN_THROUGHPUT_RATIO:.0%} of offered {offered:.2f}/s")
+        p95 = latency["all"].get("p95")
+        if p95 is not None and p95 > slo:
+            reasons.append(f"p95 latency {p95:.2f}s above SLO {slo:g}s")
+        failed = len(requests) - len(completed)
+        if requests and failed / len(requests) > MAX_FAILED_RATIO:
+            reasons.append(f"{failed} of {len(requests)} requests rejected, failed or unfinished")
+
+        return {
+            "rate": rate,
+            "requests": len(requests),
+            "outcomes": outcomes,
+            "offered_rps": round(offered, 3),
+            "throughput": round(throughput, 3),
+            "latency": latency,
+            "queue_wait": queue_wait,
+            "stages": {stage: percentiles(values) for stage, values in self.timer.take().items()},
+            "cache": {
+                "stage_hit_ratio": stage_hits,
+                "stage_statuses": statuses,
+                "research_lru_hit_ratio": round(hits / lookups, 4) if lookups else None,
+            },
+            "scheduler": {
+                "utilization": round(float(np.mean(busy)) / workers, 3),
+                "queue_depth_mean": round(float(np.mean(queued)), 2),
+                "queue_depth_max": int(max(queued)),
+            },
+            "sessions": {"mean_active": round(float(np.mean(active)), 1), "peak_active": int(max(active))},
+            "saturated": bool(reasons),
+            "saturation_reasons": reasons,
+        }
+
+
+def format_report(report: Dict) -> str:
+    lines = [f"{'rate/s':>7} {'offered':>8} {'thruput':>8} {'p50':>7} {'p95':>7} {'p99':>7} "
+             f"{'util':>5} {'queue':>6} {'users':>6} {'hit%':>5} {'rej':>4}  status"]
+    for step in report["steps"]:
+        latency = step["latency"]["all"]
+        hits = step["cache"]["stage_hit_ratio"]
+        hit = sum(hits.values()) / len(hits) if hits else 0.0
+        lines.append(
+            f"{step['rate']:>7g} {step['offered_rps']:>8.2f} {step['throughput']:>8.2f} "
+            f"{latency.get('p50', 0):>7.2f} {latency.get('p95', 0):>7.2f} {latency.get('p99', 0):>7.2f} "
+            f"{step['scheduler']['utilization']:>5.0%} {step['scheduler']['queue_depth_mean']:>6.1f} "
+            f"{step['sessions']['peak_active']:>6} {hit:>5.0%} {step['outcomes']['rejected']:>4}  "
+            f"{'SATURATED: ' + '; '.join(step['saturation_reasons']) if step['saturated'] else 'ok'}")
+
+    last = report["steps"][-1] if report["steps"] else None
+    if last and last["stages"]:
+        lines.append("")
+        lines.append(f"Stage latency at {last['rate']:g} sessions/s (p50 / p95 seconds):")
+        for stage, stats in last["stages"].items():
+            lines.append(f"  {stage:<10} {stats['p50']:.3f} / {stats['p95']:.3f}")
+
+    summary = report["summary"]
+    lines.append("")
+    if summary["max_sustainable_rate"] is not None:
+        lines.append(f"Sustainable: {summary['max_sustainable_rate']:g} sessions/s "
+                     f"({summary['max_sustainable_throughput']:.2f} requests/s, "
+                     f"{summary['max_sustainable_sessions']} concurrent users)")
+    else:
+        lines.append("Sustainable: none of the tested rates")
+    if summary["saturation_rate"] is not None:
+        lines.append(f"Saturated at: {summary['saturation_rate']:g} sessions/s")
+    else:
+        lines.append("Saturated at: not reached")
+    return "\n".join(lines)
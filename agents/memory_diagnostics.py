@@ -0,0 +1,171 @@
+import contextlib
+import gc
+import os
+import random
+import tempfile
+import tracemalloc
+from typing import Dict, List, Sequence
+
+# Traces from the diagnostics machinery itself are not interesting
+_IGNORED = (tracemalloc.__file__, __file__, "<frozen importlib._bootstrap>", "<unknown>")
+
+
+def rss_bytes() -> int:
+    """Current resident set size (0 where /proc is unavailable)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _filtered(snapshot: tracemalloc.Snapshot) -> tracemalloc.Snapshot:
+    return snapshot.filter_traces([tracemalloc.Filter(False, name) for name in _IGNORED])
+
+
+def _top_sites(new: tracemalloc.Snapshot, old: tracemalloc.Snapshot, limit: int) -> List[Dict]:
+    sites = []
+    for stat in _filtered(new).compare_to(_filtered(old), "lineno")[:limit]:
+        if stat.size_diff <= 0:
+            break
+        frame = stat.traceback[0]
+        sites.append({"site": f"{frame.filename}:{frame.lineno}", "size_diff": stat.size_diff,
+                      "count_diff": stat.count_diff})
+    return sites
+
+
+def offline_system(store_root: str = None, use_cache: bool = False, provider_latency: float = 0.0,
+                   research_latency: float = 0.0, seed: int = None):
+    """Research system wired to offline stand-ins: fallback research and network-free providers.
+
+    ``research_latency`` and ``provider_latency`` simulate API response times;
+    ``seed`` makes the simulated latencies reproducible.
+    """
+    from main import MultiAgentResearchSystem
+    from agents.report_agent import ReportAgent
+    from agents.report_store import ReportStore
+    from agents.research_agent import OfflineResearchAgent
+    from agents.resource_providers import OfflineProvider, discover_providers
+
+    # Stand-ins are injected, so no online agents (HTTP pools, executors) are built and discarded
+    rng = random.Random(seed)
+    research_agent = OfflineResearchAgent(research_latency, random.Random(rng.random()))
+    provider_rng = random.Random(rng.random())
+    system = MultiAgentResearchSystem(
+        research_agent=research_agent,
+        providers=[OfflineProvider(p, provider_latency, provider_rng) for p in discover_providers()],
+        report_agent=ReportAgent(store=ReportStore(root=store_root or tempfile.mkdtemp(prefix="memcheck-"))),
+    )
+    if not use_cache:
+        system.result_cache = None
+    return system
+
+
+class MemoryDiagnostics:
+    """Tracks allocations per pipeline stage and retained memory across repeated runs.
+
+    The first run is a warm-up (imports, compiled templates, caches); growth
+    is judged on the runs after it. A leak is suspected when retained memory
+    grows by more than ``growth_threshold`` bytes per run on average and rises
+    in most runs. Per-stage allocation sites need two snapshots per stage,
+    so they are opt-in (``stage_sites``).
+    """
+
+    def __init__(self, system, top: int = 10, frames: int = 1, growth_threshold: int = 64 * 1024,
+                 stage_sites: bool = False):
+        self.system = system
+        self.top = top
+        self.frames = frames
+        self.growth_threshold = growth_threshold
+        self.stage_sites = stage_sites
+        self.stages = {}
+
+    @contextlib.contextmanager
+    def observe(self, name: str):
+        """Stage observer: net and peak traced memory, plus top allocation sites"""
+        before = _filtered(tracemalloc.take_snapshot()) if self.stage_sites else None
+        start, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            stats = self.stages.setdefault(name, {"calls": 0, "net_bytes": 0, "max_peak_bytes": 0, "sites": {}})
+            stats["calls"] += 1
+            stats["net_bytes"] += current - start
+            stats["max_peak_bytes"] = max(stats["max_peak_bytes"], peak - start)
+            if before is not None:
+                for site in _top_sites(tracemalloc.take_snapshot(), before, self.top):
+                    stats["sites"][site["site"]] = stats["sites"].get(site["site"], 0) + site["size_diff"]
+
+    def run(self, queries: Sequence[str], runs: int = 10) -> Dict:
+        """Run every query ``runs`` times (plus one warm-up) and report memory behavior"""
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start(self.frames)
+        self.system.stage_observers.append(self.observe)
+        retained, rss = [], []
+        try:
+            baseline = None
+            for index in range(runs + 1):
+                for query in queries:
+                    self.system.run_research(query)
+                gc.collect()
+                if index == 0:
+                    # Warm-up: only steady-state runs count towards stage stats and growth
+                    self.stages = {}
+                    baseline = tracemalloc.take_snapshot()
+                retained.append(tracemalloc.get_traced_memory()[0])
+                rss.append(rss_bytes())
+            growth_sites = _top_sites(tracemalloc.take_snapshot(), baseline, self.top)
+        finally:
+            self.system.stage_observers.remove(self.observe)
+            if started_tracing:
+                tracemalloc.stop()
+
+        deltas = [b - a for a, b in zip(retained[:-1], retained[1:])]
+        growth = sum(deltas) / len(deltas) if deltas else 0.0
+        rising = sum(1 for d in deltas if d > 0)
+        return {
+            "runs": runs,
+            "queries": list(queries),
+            "retained_bytes": retained,
+            "rss_bytes": rss,
+            "growth_bytes_per_run": round(growth),
+            "leak_suspected": bool(deltas) and growth > self.growth_threshold and rising >= 0.75 * len(deltas),
+            "stages": {
+                name: {
+                    "calls": s["calls"],
+                    "avg_net_bytes": round(s["net_bytes"] / s["calls"]),
+                    "max_peak_bytes": s["max_peak_bytes"],
+                    "top_sites": sorted(s["sites"].items(), key=lambda item: -item[1])[:self.top],
+                }
+                for name, s in self.stages.items()
+            },
+            "top_growth_sites": growth_sites,
+        }
+
+
+def format_report(report: Dict) -> str:
+    def kb(n):
+        return f"{n / 1024:,.1f} KiB"
+
+    lines = [f"Memory diagnostics: {report['runs']} runs x {len(report['queries'])} queries", "",
+             f"{'stage':<12}{'calls':>7}{'avg net':>16}{'max peak':>16}"]
+    for name, s in report["stages"].items():
+        lines.append(f"{name:<12}{s['calls']:>7}{kb(s['avg_net_bytes']):>16}{kb(s['max_peak_bytes']):>16}")
+    for name, s in report["stages"].items():
+        if s["top_sites"]:
+            lines.append(f"\nTop allocation sites in {name}:")
+            lines.extend(f"  {kb(size):>12}  {site}" for site, size in s["top_sites"])
+    lines.append("\nRetained after each run: " + ", ".join(kb(n) for n in report["retained_bytes"]))
+    if any(report["rss_bytes"]):
+        lines.append("RSS after each run: " + ", ".join(kb(n) for n in report["rss_bytes"]))
+    lines.append(f"Average growth per run: {kb(report['growth_bytes_per_run'])}")
+    if report["top_growth_sites"]:
+        lines.append("\nSites retaining more memory than after warm-up:")
+        lines.extend(f"  {kb(s['size_diff']):>12}  {s['count_diff']:>+7} blocks  {s['site']}"
+                     for s in report["top_growth_sites"])
+    lines.append("\n[WARN] Memory grows across runs - possible leak" if report["leak_suspected"]
+                 else "\n[OK] No sustained growth across runs")
+    return "\n".join(lines)
@@ -0,0 +1,78 @@
+import re
+from typing import Dict, List, Optional
+
+# Trailing tokens that do not change which company or industry is meant
+LEGAL_SUFFIXES = {
+    "inc", "incorporated", "corp", "corporation", "co", "company", "ltd", "limited",
+    "llc", "plc", "gmbh", "ag", "sa", "nv", "holdings", "group",
+}
+DESCRIPTOR_SUFFIXES = {"industry", "sector"}
+
+DEFAULT_COMPANY_INDUSTRIES = {
+    "tesla": "Automotive/Electric Vehicles",
+    "apple": "Technology/Consumer Electronics",
+    "amazon": "E-commerce/Cloud Computing",
+    "google": "Technology/Internet Services",
+    "microsoft": "Technology/Software",
+    "netflix": "Media/Streaming Services",
+}
+
+DEFAULT_ALIASES = {
+    "tesla motors": "tesla",
+    "alphabet": "google",
+    "amazon com": "amazon",
+    "amazon web services": "amazon",
+    "aws": "amazon",
+    "apple computer": "apple",
+    "msft": "microsoft",
+}
+
+
+class QueryNormalizer:
+    """Canonicalize company/industry queries so near-duplicates share a key"""
+
+    def __init__(self, company_industries: Dict[str, str] = None, aliases: Dict[str, str] = None):
+        self.company_industries = dict(DEFAULT_COMPANY_INDUSTRIES)
+        self.aliases = dict(DEFAULT_ALIASES)
+        if company_industries:
+            self.company_industries.update(company_industries)
+        if aliases:
+            for alias, canonical in aliases.items():
+                self.register_alias(alias, canonical)
+
+    def register_company(self, name: str, industry: str, aliases: List[str] = None):
+        key = self._clean(name)
+        self.company_industries[key] = industry
+        for alias in aliases or []:
+            self.register_alias(alias, key)
+
+    def register_alias(self, alias: str, canonical: str):
+        self.aliases[self._clean(alias)] = self._clean(canonical)
+
+    def normalize(self, query: str) -> str:
+        """Return the canonical cache key for a query"""
+        text = self._clean(query)
+        if text in self.aliases:
+            return self.aliases[text]
+
+        tokens = text.split()
+        while len(tokens) > 1 and (tokens[-1] in LEGAL_SUFFIXES or tokens[-1] in DESCRIPTOR_SUFFIXES):
+            tokens.pop()
+        text = " ".join(tokens)
+        return self.aliases.get(text, text)
+
+    def industry_for(self, query: str) -> Optional[str]:
+        """Known industry for a company query, if any"""
+        canonical = self.normalize(query)
+        if canonical in self.company_industries:
+            return self.company_industries[canonical]
+        for company, industry in self.company_industries.items():
+            if company in canonical:
+                return industry
+        return None
+
+    @staticmethod
+    def _clean(text: str) -> str:
+        text = text.casefold().replace("&", " and ")
+        text = re.sub(r"[^\w\s-]", " ", text)
+        return " ".join(text.split())
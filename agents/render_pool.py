@@ -0,0 +1,123 @@
+import json
+import multiprocessing
+import os
+import threading
+import time
+import zlib
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from typing import Dict
+
+from agents.report_agent import ReportAgent
+from agents.report_store import ReportStore
+
+# Pipeline outputs a report is rendered from
+RECORD_FIELDS = ("research_data", "use_cases", "resources", "bonus_solutions")
+
+
+def encode_record(query: str, result: Dict, meta: Dict = None) -> bytes:
+    """Compact, compressed JSON record of everything a renderer needs"""
+    record = {"query": query, "meta": meta or {}}
+    record.update((field, result[field]) for field in RECORD_FIELDS)
+    return zlib.compress(json.dumps(record, separators=(",", ":"), ensure_ascii=False).encode('utf-8'), 1)
+
+
+def decode_record(blob: bytes) -> Dict:
+    return json.loads(zlib.decompress(blob).decode('utf-8'))
+
+
+# Per-process renderer state, set up once by the pool initializer
+_renderer = {}
+
+
+def _init_renderer(store_root: str, export_pdf: bool, results_root: str):
+    _renderer["agent"] = ReportAgent(store=ReportStore(store_root))
+    _renderer["export_pdf"] = export_pdf
+    _renderer["results_root"] = results_root
+
+
+def render_record(blob: bytes) -> Dict:
+    """Render Markdown/PDF for one record; writes the task result when the record names a task"""
+    record = decode_record(blob)
+    agent = _renderer["agent"]
+    query = record["query"]
+    report = agent.generate_report(query, *(record[field] for field in RECORD_FIELDS))
+    files = {"markdown": None, "pdf": None}
+    # Save failures are recorded in the task result, as on the inline path, instead of failing the task
+    try:
+        files["markdown"] = agent.save_report(report, query=query)
+    except Exception as e:
+        print(f"   [WARN] Markdown save error: {e}")
+        files["markdown"] = "report_save_failed.md"
+    if _renderer["export_pdf"]:
+        try:
+            files["pdf"] = agent.export_pdf(report, query=query)
+        except Exception as e:
+            print(f"   [WARN] PDF export error: {e}")
+            files["pdf_error"] = str(e)
+
+    meta = record["meta"]
+    if meta.get("task_id") and _renderer["results_root"]:
+        from agents.work_queue import FileResultStore
+        result = dict(meta)
+        result.update((field, record[field]) for field in RECORD_FIELDS)
+        result.update(report=report, files=files)
+        FileResultStore(_renderer["results_root"]).write(meta["task_id"], result)
+    return {"files": files, "record_bytes": len(blob)}
+
+
+class RenderPool:
+    """Renders reports on separate processes, fed with compact serialized records.
+
+    At most ``max_pending`` records are queued or rendering at once; ``submit``
+    blocks beyond that, so producers slow down when renderers fall behind.
+    """
+
+    def __init__(self, processes: int = None, max_pending: int = None, store_root: str = None,
+                 export_pdf: bool = True, results_root: str = None):
+        self.processes = processes or os.cpu_count() or 1
+        self.max_pending = max_pending or 2 * self.processes
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        # spawn: workers must not inherit the parent's HTTP and executor threads
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_renderer,
+            initargs=(store_root, export_pdf, results_root),
+        )
+        self._pending = set()
+        self._lock = threading.Lock()
+        self.stats = {"submitted": 0, "rendered": 0, "failed": 0, "blocked_seconds": 0.0, "record_bytes": 0}
+
+    def submit(self, query: str, result: Dict, meta: Dict = None) -> Future:
+        blob = encode_record(query, result, meta)
+        started = time.monotonic()
+        self._slots.acquire()
+        blocked = time.monotonic() - started
+        try:
+            future = self._executor.submit(render_record, blob)
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._pending.add(future)
+            self.stats["submitted"] += 1
+            self.stats["blocked_seconds"] += blocked
+            self.stats["record_bytes"] += len(blob)
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future: Future):
+        with self._lock:
+            self._pending.discard(future)
+            self.stats["failed" if future.exception() else "rendered"] += 1
+        self._slots.release()
+
+    def drain(self):
+        """Wait for every submitted render to finish"""
+        with self._lock:
+            pending = list(self._pending)
+        wait(pending)
+
+    def close(self):
+        self.drain()
+        self._executor.shutdown(wait=True)
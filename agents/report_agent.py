@@ -1,12 +1,44 @@
+import io
 import os
 from datetime import datetime
-from typing import Dict, List
+from typing import Callable, Dict, List, Tuple
+from agents.cache import LRUCache
+from agents.report_store import ReportStore
+
+# Research fields shown in the report's research section
+REPORT_RESEARCH_FIELDS = ("industry", "market_size", "company_offerings", "focus_areas", "competitors", "market_trends")
 
 class ReportAgent:
+    def __init__(self, store: ReportStore = None, artifact_cache_mb: float = None):
+        self.store = store or ReportStore()
+        # Rendered artifacts (e.g. PDF bytes) keyed by (report digest, format), bounded by size
+        if artifact_cache_mb is None:
+            artifact_cache_mb = float(os.getenv('REPORT_ARTIFACT_CACHE_MB', '64'))
+        self.artifacts = LRUCache(max_entries=1024, max_bytes=int(artifact_cache_mb * (1 << 20)), sizeof=len)
+    
     def generate_report(self, query: str, research_data: Dict, use_cases: List[Dict], resources: Dict, bonus_solutions: Dict = None) -> str:
         """Generate final markdown report"""
-        
-        report = f"""# 🤖 AI/GenAI Market Research Report
+        sections = self.sections(research_data, use_cases, resources, bonus_solutions)
+        return self.assemble(query, [render() for _, _, render in sections])
+    
+    def sections(self, research_data: Dict, use_cases: List[Dict], resources: Dict,
+                 bonus_solutions: Dict = None) -> List[Tuple[str, object, Callable[[], str]]]:
+        """(name, inputs, render) for each report section in order; a section's text depends only on its inputs"""
+        total_resources = sum(len(r) for r in resources.values())
+        bonus_count = len(bonus_solutions.get('internal_solutions', [])) + len(bonus_solutions.get('customer_solutions', [])) if bonus_solutions else 0
+        summary = [research_data.get('industry', 'target industry'), len(use_cases), total_resources, bonus_count]
+        return [
+            ("research", {field: research_data.get(field) for field in REPORT_RESEARCH_FIELDS},
+             lambda: self._research_section(research_data)),
+            ("use_cases", use_cases, lambda: self._use_case_section(use_cases)),
+            ("resources", resources, lambda: self._resource_section(resources)),
+            ("bonus", bonus_solutions, lambda: self._bonus_section(bonus_solutions)),
+            ("summary", summary, lambda: self._summary_section(*summary)),
+        ]
+    
+    def assemble(self, query: str, sections: List[str]) -> str:
+        """Report header followed by the rendered sections"""
+        return f"""# 🤖 AI/GenAI Market Research Report
 
 **Query:** {query}  
 **Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}  
@@ -14,7 +46,10 @@ class ReportAgent:
 
 ---
 
-## 📊 Agent 1: Industry/Company Research
+""" + "".join(sections)
+    
+    def _research_section(self, research_data: Dict) -> str:
+        return f"""## 📊 Agent 1: Industry/Company Research
 
 ### Industry Classification
 **Industry:** {research_data.get('industry', 'N/A')}  
@@ -35,67 +70,73 @@ class ReportAgent:
 
 ---
 
-## 💡 Agent 2: AI/GenAI Use Case Proposals
+"""
+    
+    def _use_case_section(self, use_cases: List[Dict]) -> str:
+        section = """## 💡 Agent 2: AI/GenAI Use Case Proposals
 
 """
-        
         for i, use_case in enumerate(use_cases, 1):
-            report += f"""### {i}. {use_case['name']}
+            section += f"""### {i}. {use_case['name']}
 
 **Description:** {use_case['description']}  
 **Business Value:** {use_case['value']}  
 **Industry Alignment:** Supported by current AI adoption trends
 
 """
-        
-        report += f"""---
+        return section
+    
+    def _resource_section(self, resources: Dict) -> str:
+        section = """---
 
 ## 📚 Agent 3: Datasets & Resource Assets
 
 """
-        
         for use_case_name, case_resources in resources.items():
             if case_resources:
-                report += f"""### Resources for {use_case_name}
+                section += f"""### Resources for {use_case_name}
 
 """
                 for resource in case_resources:
-                    report += f"- **[{resource['name']}]({resource['url']})** - {resource['type']}  \n  *{resource.get('description', 'No description available')}*\n\n"
-        
-        if bonus_solutions:
-            report += f"""---
+                    section += f"- **[{resource['name']}]({resource['url']})** - {resource['type']}  \n  *{resource.get('description', 'No description available')}*\n\n"
+        return section
+    
+    def _bonus_section(self, bonus_solutions: Dict) -> str:
+        if not bonus_solutions:
+            return ""
+        section = """---
 
 ## ✨ Agent 4: Bonus GenAI Solutions
 
 ### Internal-Facing Solutions
 
 """
-            for solution in bonus_solutions.get('internal_solutions', []):
-                report += f"""#### {solution['name']}
+        for solution in bonus_solutions.get('internal_solutions', []):
+            section += f"""#### {solution['name']}
 **Description:** {solution['description']}  
 **Business Value:** {solution['value']}  
 **Implementation:** {solution['implementation']}
 
 """
-            
-            report += f"""### Customer-Facing Solutions
+        
+        section += """### Customer-Facing Solutions
 
 """
-            for solution in bonus_solutions.get('customer_solutions', []):
-                report += f"""#### {solution['name']}
+        for solution in bonus_solutions.get('customer_solutions', []):
+            section += f"""#### {solution['name']}
 **Description:** {solution['description']}  
 **Business Value:** {solution['value']}  
 **Implementation:** {solution['implementation']}
 
 """
-            
-            report += f"""### Implementation Roadmap
+        
+        section += """### Implementation Roadmap
 
 """
-            for phase in bonus_solutions.get('implementation_roadmap', []):
-                report += f"- **{phase['phase']}:** {phase['focus']} - {phase['deliverables']}\n"
-            
-            report += f"""\n### ROI Estimates
+        for phase in bonus_solutions.get('implementation_roadmap', []):
+            section += f"- **{phase['phase']}:** {phase['focus']} - {phase['deliverables']}\n"
+        
+        section += f"""\n### ROI Estimates
 
 - **Cost Savings:** {bonus_solutions.get('roi_estimates', {}).get('cost_savings', 'TBD')}  
 - **Revenue Impact:** {bonus_solutions.get('roi_estimates', {}).get('revenue_impact', 'TBD')}  
@@ -103,17 +144,24 @@ class ReportAgent:
 - **Payback Period:** {bonus_solutions.get('roi_estimates', {}).get('payback_period', 'TBD')}
 
 """
-        
-        total_resources = sum(len(r) for r in resources.values())
-        bonus_count = len(bonus_solutions.get('internal_solutions', [])) + len(bonus_solutions.get('customer_solutions', [])) if bonus_solutions else 0
-        
-        report += f"""---
+        roi_model = bonus_solutions.get('roi_model')
+        if roi_model:
+            section += f"""**Modeled ROI (P10 / P50 / P90):**  
+- Cost savings: {self._format_range(roi_model['cost_savings_pct'], '%')} of operating costs  
+- Revenue impact: {self._format_range(roi_model['revenue_impact_pct'], '%')} of revenue  
+- Payback: {self._format_range(roi_model['payback_months'], ' months')}
+
+"""
+        return section
+    
+    def _summary_section(self, industry: str, use_case_count: int, total_resources: int, bonus_count: int) -> str:
+        return f"""---
 
 ## 📈 Executive Summary
 
 ### Key Findings
-- **Industry Analysis:** Comprehensive research of {research_data.get('industry', 'target industry')}
-- **Use Cases Identified:** {len(use_cases)} AI/GenAI implementation opportunities
+- **Industry Analysis:** Comprehensive research of {industry}
+- **Use Cases Identified:** {use_case_count} AI/GenAI implementation opportunities
 - **Resources Mapped:** {total_resources} datasets, models, and repositories
 - **Bonus Solutions:** {bonus_count} additional GenAI opportunities identified
 
@@ -135,19 +183,19 @@ class ReportAgent:
 *🤖 Report generated by Multi-Agent AI Research System*  
 *Agents: Research → Use Case → Resource → Bonus Solutions*
 """
-        
-        return report
+    
+    def _format_range(self, values: List, unit: str) -> str:
+        return " / ".join("n/a" if v is None else f"{v:g}{unit}" for v in values)
     
     def _format_list(self, items: List[str]) -> str:
         if not items:
             return "- Information available via detailed research\n"
         return "\n".join([f"- {item}" for item in items]) + "\n"
     
-    def save_report(self, report: str, filename: str = None) -> str:
-        """Save report to file"""
+    def save_report(self, report: str, filename: str = None, query: str = None) -> str:
+        """Save report to file, deduplicated through the report store"""
         if not filename:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"ai_research_report_{timestamp}.md"
+            return self.store.put(report, query)
         
         filepath = os.path.join("reports", filename)
         os.makedirs("reports", exist_ok=True)
@@ -157,39 +205,59 @@ class ReportAgent:
             
         return filepath
     
-    def export_pdf(self, report: str, filename: str = None) -> str:
+    def export_pdf(self, report: str, filename: str = None, query: str = None) -> str:
         """Export report as PDF"""
         try:
-            from reportlab.lib.pagesizes import letter
-            from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-            from reportlab.lib.styles import getSampleStyleSheet
-            
-            if not filename:
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                filename = f"ai_research_report_{timestamp}.pdf"
-            
-            filepath = os.path.join("reports", filename)
-            os.makedirs("reports", exist_ok=True)
-            
-            doc = SimpleDocTemplate(filepath, pagesize=letter)
-            styles = getSampleStyleSheet()
-            story = []
-            
-            # Convert markdown to simple text for PDF
-            lines = report.split('\n')
-            for line in lines:
-                if line.startswith('# '):
-                    story.append(Paragraph(line[2:], styles['Title']))
-                elif line.startswith('## '):
-                    story.append(Paragraph(line[3:], styles['Heading1']))
-                elif line.startswith('### '):
-                    story.append(Paragraph(line[4:], styles['Heading2']))
-                elif line.strip():
-                    story.append(Paragraph(line, styles['Normal']))
-                story.append(Spacer(1, 6))
-            
-            doc.build(story)
-            return filepath
-            
+            import reportlab  # noqa: F401
         except ImportError:
-            return "PDF export requires reportlab package"
\ No newline at end of file
+            return "PDF export requires reportlab package"
+        
+        if not filename:
+            # Eager exports are written straight to the store; only pdf_bytes() fills the in-memory cache
+            digest = self.store.digest(report)
+            data = self.artifacts.get((digest, "pdf"))
+            if data is None:
+                data = self._load_or_render_pdf(report, digest)
+            return self.store.put_bytes(report, "pdf", data, query)
+        
+        filepath = os.path.join("reports", filename)
+        os.makedirs("reports", exist_ok=True)
+        self._render_pdf(report, filepath)
+        return filepath
+    
+    def pdf_bytes(self, report: str) -> bytes:
+        """PDF of a report, rendered on first request and then served from memory"""
+        digest = self.store.digest(report)
+        return self.artifacts.get_or_compute((digest, "pdf"), lambda: self._load_or_render_pdf(report, digest))
+    
+    def _load_or_render_pdf(self, report: str, digest: str) -> bytes:
+        if self.store.has_blob(digest, "pdf"):
+            with open(self.store.blob_path(digest, "pdf"), 'rb') as f:
+                return f.read()
+        buffer = io.BytesIO()
+        self._render_pdf(report, buffer)
+        return buffer.getvalue()
+    
+    def _render_pdf(self, report: str, filepath):
+        from reportlab.lib.pagesizes import letter
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+        from reportlab.lib.styles import getSampleStyleSheet
+        
+        doc = SimpleDocTemplate(filepath, pagesize=letter)
+        styles = getSampleStyleSheet()
+        story = []
+        
+        # Convert markdown to simple text for PDF
+        lines = report.split('\n')
+        for line in lines:
+            if line.startswith('# '):
+                story.append(Paragraph(line[2:], styles['Title']))
+            elif line.startswith('## '):
+                story.append(Paragraph(line[3:], styles['Heading1']))
+            elif line.startswith('### '):
+                story.append(Paragraph(line[4:], styles['Heading2']))
+            elif line.strip():
+                story.append(Paragraph(line, styles['Normal']))
+            story.append(Spacer(1, 6))
+        
+        doc.build(story)
@@ -0,0 +1,243 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from agents.report_store import ReportStore
+
+DEFAULT_ARCHIVE_DIR = os.path.join("reports", "archive")
+CHUNK_PREFIX = "chunk-"
+CHUNK_SUFFIX = ".gz"
+
+
+class ReportArchive:
+    """Append-only compressed archive of historical reports.
+
+    Every artifact is written as its own gzip member at the end of a chunk
+    file (``chunk-000001.gz``, ...); chunks roll over at ``chunk_bytes``. An
+    append-only ``index.jsonl`` records (query, created, format, digest) and
+    where the member lives (chunk, offset, length), so one report is read by
+    seeking to its member and decompressing just that. Concatenated members
+    are still a valid gzip stream, so ``zcat chunk-000001.gz`` works too.
+    Identical artifacts are stored once. Intended for a single writer.
+    """
+
+    def __init__(self, root: str = None, chunk_bytes: int = None, level: int = 6):
+        self.root = root or os.getenv('REPORT_ARCHIVE_DIR') or DEFAULT_ARCHIVE_DIR
+        if chunk_bytes is None:
+            chunk_bytes = int(float(os.getenv('REPORT_ARCHIVE_CHUNK_MB', '64')) * (1 << 20))
+        self.chunk_bytes = chunk_bytes
+        self.level = level
+        self.index_path = os.path.join(self.root, "index.jsonl")
+        self._lock = threading.Lock()
+        self._entries = None
+        self._locations = {}
+        self._latest = {}
+        # Offset just past the last well-formed index line
+        self._index_end = 0
+
+    def chunk_path(self, chunk: int) -> str:
+        return os.path.join(self.root, f"{CHUNK_PREFIX}{chunk:06d}{CHUNK_SUFFIX}")
+
+    def add(self, data: bytes, fmt: str, digest: str = None, query: str = "", created: float = None,
+            source: str = None) -> Dict:
+        """Archive one artifact and return its index entry"""
+        digest = digest or hashlib.sha256(data).hexdigest()
+        with self._lock:
+            self._load_index()
+            location = self._locations.get((digest, fmt))
+            if location is None:
+                location = self._append(gzip.compress(data, compresslevel=self.level), len(data))
+            entry = dict(location, query=query, created=created or time.time(), format=fmt, digest=digest)
+            if source:
+                entry["source"] = source
+            os.makedirs(self.root, exist_ok=True)
+            with open(self.index_path, 'ab') as f:
+                # Drop a torn line left by a crash so the new entry starts on its own line
+                if f.tell() > self._index_end:
+                    f.truncate(self._index_end)
+                f.write((json.dumps(entry) + "\n").encode('utf-8'))
+                f.flush()
+                # Callers (compact) delete the original once this returns
+                os.fsync(f.fileno())
+                self._index_end = f.tell()
+            self._add_entry(entry)
+            return entry
+
+    def read(self, entry: Dict) -> bytes:
+        """Decompress one archived artifact without touching the rest of its chunk"""
+        with open(self.chunk_path(entry['chunk']), 'rb') as f:
+            f.seek(entry['offset'])
+            member = f.read(entry['length'])
+        return gzip.decompress(member)
+
+    def get(self, digest: str, fmt: str = "md") -> Optional[bytes]:
+        """Artifact by digest (a unique prefix is enough)"""
+        entry = self.lookup(digest, fmt)
+        return self.read(entry) if entry else None
+
+    def lookup(self, digest: str, fmt: str = "md") -> Optional[Dict]:
+        with self._lock:
+            self._load_index()
+            matches = {key: loc for key, loc in self._locations.items()
+                       if key[1] == fmt and key[0].startswith(digest)}
+        if len(matches) != 1:
+            return None
+        (full_digest, _), location = matches.popitem()
+        return dict(location, digest=full_digest, format=fmt)
+
+    def latest(self, query: str, fmt: str = "md") -> Optional[Dict]:
+        """Most recently created archived entry for a query (case-insensitive exact match) and format"""
+        with self._lock:
+            self._load_index()
+            return self._latest.get((query.strip().lower(), fmt))
+
+    def find(self, query: str = None, fmt: str = None, since: float = None, until: float = None) -> List[Dict]:
+        """Index entries matching a query (case-insensitive substring), format and time range"""
+        needle = query.strip().lower() if query else None
+        return [e for e in self.entries()
+                if (needle is None or needle in e['query'].lower())
+                and (fmt is None or e['format'] == fmt)
+                and (since is None or e['created'] >= since)
+                and (until is None or e['created'] <= until)]
+
+    def entries(self) -> List[Dict]:
+        with self._lock:
+            self._load_index()
+            return list(self._entries)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            self._load_index()
+            locations = list(self._locations.values())
+            entries = len(self._entries)
+        chunks = sorted({loc['chunk'] for loc in locations})
+        raw = sum(loc['size'] for loc in locations)
+        stored = sum(loc['length'] for loc in locations)
+        return {"entries": entries, "artifacts": len(locations), "chunks": len(chunks),
+                "raw_bytes": raw, "stored_bytes": stored, "ratio": round(raw / stored, 2) if stored else None}
+
+    def verify(self) -> List[str]:
+        """Decompress every artifact; returns a description of each unreadable one"""
+        errors = []
+        with self._lock:
+            self._load_index()
+            locations = dict(self._locations)
+        for (digest, fmt), location in locations.items():
+            try:
+                if len(self.read(location)) != location['size']:
+                    errors.append(f"{digest[:12]}.{fmt}: size mismatch")
+            except (OSError, EOFError, gzip.BadGzipFile) as e:
+                errors.append(f"{digest[:12]}.{fmt}: {e}")
+        return errors
+
+    def _append(self, member: bytes, size: int) -> Dict:
+        os.makedirs(self.root, exist_ok=True)
+        chunk = max((loc['chunk'] for loc in self._locations.values()), default=1)
+        path = self.chunk_path(chunk)
+        used = os.path.getsize(path) if os.path.exists(path) else 0
+        if used and used + len(member) > self.chunk_bytes:
+            chunk += 1
+            path = self.chunk_path(chunk)
+        with open(path, 'ab') as f:
+            f.seek(0, os.SEEK_END)
+            offset = f.tell()
+            f.write(member)
+            f.flush()
+            # The member must be on disk before the index points at it (callers delete the original)
+            os.fsync(f.fileno())
+        return {"chunk": chunk, "offset": offset, "length": len(member), "size": size}
+
+    def _load_index(self):
+        if self._entries is not None:
+            return
+        self._entries = []
+        self._locations = {}
+        self._latest = {}
+        self._index_end = 0
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, 'rb') as f:
+            offset = 0
+            for line in f:
+                offset += len(line)
+                try:
+                    entry = json.loads(line) if line.strip() else None
+                except ValueError:
+                    # Only a crash mid-append produces this, so it can only be the final line
+                    print(f"[WARN] Ignoring torn line at the end of {self.index_path}")
+                    break
+                if not line.endswith(b"\n"):
+                    break
+                if entry is not None:
+                    self._add_entry(entry)
+                self._index_end = offset
+
+    def _add_entry(self, entry: Dict):
+        self._entries.append(entry)
+        self._locations.setdefault((entry['digest'], entry['format']), {
+            key: entry[key] for key in ("chunk", "offset", "length", "size")})
+        # Compaction archives old reports in any order, so keep the newest by creation time
+        key = (entry['query'].strip().lower(), entry['format'])
+        latest = self._latest.get(key)
+        if latest is None or entry['created'] >= latest['created']:
+            self._latest[key] = entry
+
+
+def compact(store: ReportStore, archive: ReportArchive, older_than_days: float = 30, loose_dir: str = None,
+            dry_run: bool = False, now: float = None) -> Dict:
+    """Move store entries older than ``older_than_days`` (and loose report files) into the archive.
+
+    Archived entries leave the store index and their blobs are deleted once
+    no remaining entry references them. Loose ``*.md``/``*.pdf`` files
+    directly under ``loose_dir`` (reports written with an explicit filename)
+    are archived with their modification time and removed.
+    """
+    cutoff = (now or time.time()) - older_than_days * 86400
+    old = [e for e in store.entries() if e['created'] < cutoff]
+    summary = {"archived_entries": 0, "archived_files": 0, "missing_blobs": 0, "bytes_in": 0}
+
+    archived = []
+    for entry in old:
+        path = store.blob_path(entry['digest'], entry['format'])
+        if not os.path.exists(path):
+            summary["missing_blobs"] += 1
+            archived.append(entry)
+            continue
+        with open(path, 'rb') as f:
+            data = f.read()
+        summary["bytes_in"] += len(data)
+        if not dry_run:
+            archive.add(data, entry['format'], entry['digest'], entry['query'], entry['created'])
+        archived.append(entry)
+        summary["archived_entries"] += 1
+
+    if not dry_run and archived:
+        store.evict(archived)
+
+    if loose_dir and os.path.isdir(loose_dir):
+        for name in sorted(os.listdir(loose_dir)):
+            path = os.path.join(loose_dir, name)
+            fmt = name.rsplit('.', 1)[-1].lower() if '.' in name else ""
+            if fmt not in ("md", "pdf") or not os.path.isfile(path) or os.path.getmtime(path) >= cutoff:
+                continue
+            with open(path, 'rb') as f:
+                data = f.read()
+            summary["bytes_in"] += len(data)
+            summary["archived_files"] += 1
+            if dry_run:
+                continue
+            if fmt == "md":
+                text = data.decode('utf-8', errors='replace')
+                digest, query = ReportStore.digest(text), ReportStore.query_of(text)
+            else:
+                digest, query = None, os.path.splitext(name)[0]
+            archive.add(data, fmt, digest, query, os.path.getmtime(path), source=path)
+            os.remove(path)
+
+    print(f"[INFO] Archived {summary['archived_entries']} store entries and {summary['archived_files']} loose files"
+          f"{' (dry run)' if dry_run else ''}")
+    return summary
@@ -0,0 +1,257 @@
+import contextlib
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of one process are serialized
+    fcntl = None
+
+# Lines that change on every run without changing the report itself
+VOLATILE_PATTERNS = [
+    re.compile(r'^\*\*Generated:\*\*.*$', re.MULTILINE),
+]
+QUERY_PATTERN = re.compile(r'^\*\*Query:\*\*\s*(.+?)\s*$', re.MULTILINE)
+# Blobs younger than this are never swept: a writer may have stored one but not yet indexed it
+BLOB_GRACE_SECONDS = 300
+
+
+class ReportStore:
+    """Content-addressed storage for generated reports.
+
+    Each unique report body (ignoring volatile fields such as the
+    ``Generated:`` timestamp) is written once under ``blobs/``. A small
+    append-only ``index.jsonl`` maps (query, time, format) to the blob digest.
+    Appends and index rewrites hold an exclusive lock on ``index.lock``, so
+    several processes (batch workers, render pool, archive compaction) can
+    share one root.
+    """
+
+    def __init__(self, root: str = None, max_age_days: float = None, keep_per_query: int = None):
+        self.root = root or os.path.join("reports", "store")
+        self.blob_dir = os.path.join(self.root, "blobs")
+        self.index_path = os.path.join(self.root, "index.jsonl")
+        self.lock_path = os.path.join(self.root, "index.lock")
+        if max_age_days is None and os.getenv('REPORT_RETENTION_DAYS'):
+            max_age_days = float(os.getenv('REPORT_RETENTION_DAYS'))
+        if keep_per_query is None and os.getenv('REPORT_KEEP_PER_QUERY'):
+            keep_per_query = int(os.getenv('REPORT_KEEP_PER_QUERY'))
+        self.max_age_days = max_age_days
+        self.keep_per_query = keep_per_query
+        self._lock = threading.Lock()
+        self._entries = None
+        self._latest = {}
+        # (mtime_ns, size) of index.jsonl when it was last read; another change means another writer
+        self._signature = None
+
+    @staticmethod
+    def normalize(report: str) -> str:
+        """Strip volatile fields so identical reports hash identically"""
+        for pattern in VOLATILE_PATTERNS:
+            report = pattern.sub('', report)
+        return report
+
+    @classmethod
+    def digest(cls, report: str) -> str:
+        return hashlib.sha256(cls.normalize(report).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def query_of(report: str) -> str:
+        match = QUERY_PATTERN.search(report)
+        return match.group(1) if match else ""
+
+    def blob_path(self, digest: str, fmt: str) -> str:
+        return os.path.join(self.blob_dir, digest[:2], f"{digest}.{fmt}")
+
+    def has_blob(self, digest: str, fmt: str) -> bool:
+        return os.path.exists(self.blob_path(digest, fmt))
+
+    def put(self, report: str, query: str = None) -> str:
+        """Store a markdown report, returning the blob path"""
+        digest = self.digest(report)
+        path = self.blob_path(digest, "md")
+        if not os.path.exists(path):
+            self._write_blob(path, report.encode('utf-8'))
+        else:
+            self._touch(path)
+            print(f"[DEBUG] Report unchanged, reusing blob {digest[:12]}")
+        self._record(query if query is not None else self.query_of(report), digest, "md")
+        return path
+
+    def put_bytes(self, report: str, fmt: str, data: bytes, query: str = None) -> str:
+        """Store already-rendered artifact bytes of a report, returning the blob path"""
+        digest = self.digest(report)
+        path = self.blob_path(digest, fmt)
+        if not os.path.exists(path):
+            self._write_blob(path, data)
+        else:
+            self._touch(path)
+        self._record(query if query is not None else self.query_of(report), digest, fmt)
+        return path
+
+    def latest(self, query: str, fmt: str = "md") -> Optional[Dict]:
+        """Most recent index entry for a query and format"""
+        with self._lock:
+            self._load_index()
+            return self._latest.get((query.strip().lower(), fmt))
+
+    def entries(self) -> List[Dict]:
+        with self._lock:
+            self._load_index()
+            return list(self._entries)
+
+    def gc(self, now: float = None) -> Dict:
+        """Apply the retention policy and delete unreferenced blobs"""
+        now = now or time.time()
+
+        def policy(entries):
+            kept = []
+            per_query = {}
+            for entry in reversed(entries):
+                if self.max_age_days is not None and now - entry['created'] > self.max_age_days * 86400:
+                    continue
+                key = (entry['query'].strip().lower(), entry['format'])
+                per_query[key] = per_query.get(key, 0) + 1
+                if self.keep_per_query is not None and per_query[key] > self.keep_per_query:
+                    continue
+                kept.append(entry)
+            kept.reverse()
+            return kept
+
+        removed = self._retain(policy)
+        print(f"[DEBUG] Report GC removed {removed['removed_entries']} index entries, {removed['removed_blobs']} blobs")
+        return removed
+
+    def evict(self, entries: List[Dict]) -> Dict:
+        """Drop entries from the index and delete blobs nothing references any more"""
+        drop = {(e['query'], e['created'], e['format'], e['digest']) for e in entries}
+        return self._retain(lambda current: [e for e in current
+                                             if (e['query'], e['created'], e['format'], e['digest']) not in drop])
+
+    def _retain(self, select: Callable[[List[Dict]], List[Dict]]) -> Dict:
+        """Rewrite the index to ``select(entries)`` and sweep unreferenced blobs.
+
+        Runs under the cross-process lock on the index as it is on disk now,
+        so entries other processes appended since this one last read it are
+        kept. In-flight ``*.tmp`` files and recently written blobs are left alone.
+        """
+        with self._locked():
+            self._load_index(force=True)
+            snapshot_at = time.time()
+            kept = select(list(self._entries))
+            removed_entries = len(self._entries) - len(kept)
+            self._rewrite_index(kept)
+
+            referenced = {(e['digest'], e['format']) for e in kept}
+            removed_blobs = 0
+            if os.path.isdir(self.blob_dir):
+                for shard in os.listdir(self.blob_dir):
+                    shard_dir = os.path.join(self.blob_dir, shard)
+                    for name in os.listdir(shard_dir):
+                        if name.endswith('.tmp'):
+                            continue
+                        digest, _, fmt = name.partition('.')
+                        path = os.path.join(shard_dir, name)
+                        if (digest, fmt) in referenced:
+                            continue
+                        try:
+                            if os.path.getmtime(path) > snapshot_at - BLOB_GRACE_SECONDS:
+                                continue
+                            os.remove(path)
+                            removed_blobs += 1
+                        except FileNotFoundError:
+                            pass
+                    # Shard directories stay: a writer may have just created one for its tmp file
+        return {"removed_entries": removed_entries, "removed_blobs": removed_blobs}
+
+    @contextlib.contextmanager
+    def _locked(self):
+        """Exclusive access to the index for this thread and process"""
+        with self._lock:
+            os.makedirs(self.root, exist_ok=True)
+            with open(self.lock_path, 'a') as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    @staticmethod
+    def _touch(path: str):
+        """Mark a reused blob as recently written so a concurrent sweep keeps it"""
+        with contextlib.suppress(OSError):
+            os.utime(path)
+
+    def _write_blob(self, path: str, data: bytes):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _record(self, query: str, digest: str, fmt: str):
+        entry = {
+            "query": query,
+            "created": time.time(),
+            "format": fmt,
+            "digest": digest,
+            "path": self.blob_path(digest, fmt),
+        }
+        # Under the file lock: an append racing a rewrite would land in the replaced file
+        with self._locked():
+            self._load_index()
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + "\n")
+            self._add_entry(entry)
+            self._signature = self._stat_index()
+
+    def _stat_index(self):
+        try:
+            st = os.stat(self.index_path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _load_index(self, force: bool = False):
+        """(Re)read the index when it is not loaded yet or another process changed it"""
+        signature = self._stat_index()
+        if self._entries is not None and not force and signature == self._signature:
+            return
+        self._entries = []
+        self._latest = {}
+        self._signature = signature
+        if signature is not None:
+            with open(self.index_path, encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        try:
+                            self._add_entry(json.loads(line))
+                        except ValueError:
+                            print(f"[WARN] Skipping malformed report index line in {self.index_path}")
+
+    def _add_entry(self, entry: Dict):
+        self._entries.append(entry)
+        self._latest[(entry['query'].strip().lower(), entry['format'])] = entry
+
+    def _rewrite_index(self, entries: List[Dict]):
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = f"{self.index_path}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.index_path)
+        self._signature = self._stat_index()
+        self._entries = []
+        self._latest = {}
+        for entry in entries:
+            self._add_entry(entry)
@@ -1,48 +1,206 @@
-import requests
 import os
-from typing import Dict, List
+import copy
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+from urllib.parse import urlsplit
+from agents.cache import LRUCache
+from agents.http_client import HTTPClient, LatencyBudget
+from agents.incremental import diff_sources, has_changes
+from agents.query_normalizer import QueryNormalizer
+from agents.serper_stream import DEFAULT_FIELD_LIMITS, parse_serper_stream
+
+# Sub-queries issued concurrently per research request; results are fused by URL
+DEFAULT_SUBQUERIES = {
+    "overview": "{query} industry trends market analysis AI use cases 2024",
+    "competitors": "{query} competitors market leaders comparison",
+    "market_size": "{query} market size billion growth forecast",
+    "trends": "{query} industry trends 2024 2025 future",
+    "offerings": "{query} products services offerings platform",
+    "ai_adoption": "{query} AI machine learning adoption use cases",
+}
 
 class ResearchAgent:
-    def __init__(self):
+    def __init__(self, normalizer: QueryNormalizer = None, cache_size: int = 512, cache_ttl: float = None,
+                 subqueries: Dict[str, str] = None, result_window: int = 30, results_per_query: int = 10,
+                 streaming: bool = None):
         self.serper_key = os.getenv('SERPER_API_KEY')
+        self.subqueries = subqueries or self._subqueries_from_env()
+        self.result_window = result_window
+        self.results_per_query = results_per_query
+        self.streaming = os.getenv('SERPER_STREAMING', '1') != '0' if streaming is None else streaming
+        self.field_limits = dict(DEFAULT_FIELD_LIMITS, organic=results_per_query)
+        self.http = HTTPClient(pool_maxsize=16)
+        self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="serper")
+        self.normalizer = normalizer or QueryNormalizer()
+        if cache_ttl is None and os.getenv('RESEARCH_CACHE_TTL'):
+            cache_ttl = float(os.getenv('RESEARCH_CACHE_TTL'))
+        self.cache = LRUCache(max_entries=cache_size, ttl=cache_ttl)
         
-    def research_company_industry(self, query: str) -> Dict:
-        """Research company or industry using web search"""
+    def research_company_industry(self, query: str, budget: LatencyBudget = None) -> Dict:
+        """Research company or industry, reusing results for equivalent queries"""
+        key = self.normalizer.normalize(query)
+        print(f"[DEBUG] Canonical query: {key}")
+        research_data = self.cache.get_or_compute(key, lambda: self._research(query, budget))
+        if research_data.get("degraded"):
+            # Partial results (e.g. cut short by the latency budget) are served but not reused
+            self.cache.invalidate(key)
+        return copy.deepcopy(research_data)
+    
+    def _research(self, query: str, budget: LatencyBudget = None) -> Dict:
         try:
             if self.serper_key and self.serper_key.strip():
-                return self._search_serper(query)
+                return self._search_serper(query, budget)
             else:
                 return self._fallback_research(query)
         except Exception as e:
             print(f"Research API error: {e}")
             return self._fallback_research(query)
     
-    def _search_serper(self, query: str) -> Dict:
+    @staticmethod
+    def _subqueries_from_env() -> Dict[str, str]:
+        """Select sub-queries by name, e.g. SERPER_SUBQUERIES=overview,competitors"""
+        names = os.getenv('SERPER_SUBQUERIES')
+        if not names:
+            return dict(DEFAULT_SUBQUERIES)
+        selected = {name.strip(): DEFAULT_SUBQUERIES[name.strip()] for name in names.split(',') if name.strip() in DEFAULT_SUBQUERIES}
+        return selected or dict(DEFAULT_SUBQUERIES)
+    
+    def _search_serper(self, query: str, budget: LatencyBudget = None) -> Dict:
+        try:
+            data, failed, total = self._fetch_search(query, budget)
+            research_data = self._extract(query, data)
+            if failed:
+                research_data["degraded"] = f"{failed} of {total} search sub-queries failed"
+            return research_data
+        except Exception as e:
+            print(f"[ERROR] Serper API failed: {e}")
+            return dict(self._fallback_research(query), degraded=f"search unavailable, using fallback research ({e})")
+    
+    def refresh_research(self, query: str, previous: Dict = None, budget: LatencyBudget = None) -> Tuple[Dict, Dict]:
+        """Fetch fresh search results and diff them against a stored run's by URL and content hash.
+        
+        Returns (research_data, diff). When no result in the extractors' window
+        was added, dropped or edited, ``previous`` is returned as is and the
+        extractors are skipped.
+        """
+        previous_results = (previous or {}).get("search_results", [])
+        if not (self.serper_key and self.serper_key.strip()):
+            # Fallback research only depends on the query
+            research_data = copy.deepcopy(previous) if previous else self._fallback_research(query)
+            return research_data, diff_sources(previous_results, previous_results)
+        
+        try:
+            data, failed, total = self._fetch_search(query, budget)
+        except Exception as e:
+            print(f"[ERROR] Serper API failed: {e}")
+            if previous:
+                return dict(copy.deepcopy(previous), degraded=f"search unavailable, kept previous research ({e})"), \
+                    diff_sources(previous_results, previous_results)
+            return dict(self._fallback_research(query), degraded=f"search unavailable, using fallback research ({e})"), \
+                diff_sources([], [])
+        
+        window = [{"title": r.get('title', ''), "snippet": r.get('snippet', ''), "link": r.get('link', '')}
+                  for r in data['organic'][:self.result_window]]
+        diff = diff_sources(previous_results, window, key=lambda r: self._url_key(r.get('link', '')))
+        if previous and not failed and not has_changes(diff):
+            print(f"[DEBUG] Search results unchanged ({diff['unchanged']}); skipping extractors")
+            research_data = copy.deepcopy(previous)
+        else:
+            research_data = self._extract(query, data)
+            if failed:
+                research_data["degraded"] = f"{failed} of {total} search sub-queries failed"
+        if not research_data.get("degraded"):
+            self.cache.set(self.normalizer.normalize(query), copy.deepcopy(research_data))
+        return research_data, diff
+    
+    def _fetch_search(self, query: str, budget: LatencyBudget = None) -> Tuple[Dict, int, int]:
+        """Fused organic results of all sub-queries, plus (failed, total) sub-query counts"""
+        print(f"[DEBUG] Calling Serper API for: {query} ({len(self.subqueries)} sub-queries)")
+        futures = {
+            name: self._executor.submit(self._serper_request, template.format(query=query), budget)
+            for name, template in self.subqueries.items()
+        }
+        
+        responses = {}
+        for name, future in futures.items():
+            try:
+                responses[name] = future.result()
+            except Exception as e:
+                print(f"[WARN] Serper sub-query '{name}' failed: {e}")
+        
+        if not responses:
+            raise Exception("all Serper sub-queries failed")
+        
+        data = self._fuse_results(responses)
+        print(f"[DEBUG] Serper API response received: {len(data['organic'])} unique results")
+        return data, len(futures) - len(responses), len(futures)
+    
+    def _extract(self, query: str, data: Dict) -> Dict:
+        return {
+            "industry": self._extract_industry(query),
+            "company_offerings": self._extract_company_offerings(query, data),
+            "focus_areas": self._extract_focus_areas(data),
+            "competitors": self._extract_competitors(data),
+            "market_trends": self._extract_market_trends(data),
+            "market_size": self._extract_market_size(data),
+            "search_results": [
+                {"title": r.get('title', ''), "snippet": r.get('snippet', ''), "link": r.get('link', '')}
+                for r in data['organic'][:self.result_window]
+            ]
+        }
+    
+    def _serper_request(self, q: str, budget: LatencyBudget = None) -> Dict:
         url = "https://google.serper.dev/search"
-        payload = {"q": f"{query} industry trends market analysis AI use cases 2024"}
         headers = {
             "X-API-KEY": self.serper_key,
             "Content-Type": "application/json"
         }
+        payload = {"q": q, "num": self.results_per_query}
         
-        try:
-            print(f"[DEBUG] Calling Serper API for: {query}")
-            response = requests.post(url, json=payload, headers=headers, timeout=15)
+        if not self.streaming:
+            response = self.http.request("serper", "POST", url, timeout=15, budget=budget, json=payload, headers=headers)
             response.raise_for_status()
-            data = response.json()
-            print(f"[DEBUG] Serper API response received: {len(data.get('organic', []))} results")
-            
-            return {
-                "industry": self._extract_industry(query),
-                "company_offerings": self._extract_company_offerings(query, data),
-                "focus_areas": self._extract_focus_areas(data),
-                "competitors": self._extract_competitors(data),
-                "market_trends": self._extract_market_trends(data),
-                "market_size": self._extract_market_size(data)
-            }
-        except Exception as e:
-            print(f"[ERROR] Serper API failed: {e}")
-            return self._fallback_research(query)
+            return response.json()
+        
+        # Decode only the fields the extractors use and stop once organic is full
+        with self.http.request("serper", "POST", url, timeout=15, budget=budget, json=payload, headers=headers,
+                               stream=True) as response:
+            response.raise_for_status()
+            data, bytes_read = parse_serper_stream(response.iter_content(chunk_size=16384), self.field_limits)
+        print(f"[DEBUG] Serper stream for '{q}': read {bytes_read} bytes")
+        return data
+    
+    def _fuse_results(self, responses: Dict[str, Dict]) -> Dict:
+        """Interleave organic results from all sub-queries, deduplicated by URL"""
+        fused = []
+        seen = set()
+        lists = [
+            [dict(result, subquery=name) for result in data.get('organic', [])]
+            for name, data in responses.items()
+        ]
+        
+        for rank in range(max((len(results) for results in lists), default=0)):
+            for results in lists:
+                if rank >= len(results):
+                    continue
+                result = results[rank]
+                key = self._url_key(result.get('link', ''))
+                if key and key in seen:
+                    continue
+                seen.add(key)
+                fused.append(result)
+        
+        return {"organic": fused}
+    
+    @staticmethod
+    def _url_key(url: str) -> str:
+        parts = urlsplit(url.strip())
+        host = parts.netloc.lower()
+        if host.startswith("www."):
+            host = host[4:]
+        return f"{host}{parts.path.rstrip('/')}" + (f"?{parts.query}" if parts.query else "")
     
     def _fallback_research(self, query: str) -> Dict:
         """Industry-specific fallback research data"""
@@ -101,18 +259,9 @@ class ResearchAgent:
             return query.title()
         else:
             # Try to detect company and map to industry
-            company_industry_map = {
-                "tesla": "Automotive/Electric Vehicles",
-                "apple": "Technology/Consumer Electronics",
-                "amazon": "E-commerce/Cloud Computing",
-                "google": "Technology/Internet Services",
-                "microsoft": "Technology/Software",
-                "netflix": "Media/Streaming Services"
-            }
-            
-            for company, industry in company_industry_map.items():
-                if company in query.lower():
-                    return industry
+            industry = self.normalizer.industry_for(query)
+            if industry:
+                return industry
             
             return f"{query.title()} Industry"
     
@@ -122,7 +271,7 @@ class ResearchAgent:
         if 'organic' in data and data['organic']:
             print(f"[DEBUG] Extracting focus areas from {len(data['organic'])} results")
             
-            for result in data['organic'][:8]:
+            for result in data['organic'][:self.result_window]:
                 snippet = result.get('snippet', '').lower()
                 title = result.get('title', '').lower()
                 text = snippet + ' ' + title
@@ -157,7 +306,7 @@ class ResearchAgent:
         competitors = set()
         
         if 'organic' in data and data['organic']:
-            for result in data['organic'][:6]:
+            for result in data['organic'][:self.result_window]:
                 title = result.get('title', '')
                 snippet = result.get('snippet', '')
                 text = (title + ' ' + snippet).lower()
@@ -183,7 +332,9 @@ class ResearchAgent:
     def _extract_market_size(self, data: Dict) -> str:
         # Try to extract market size from search results
         if 'organic' in data:
-            for result in data['organic'][:3]:
+            # Prefer results from the market size sub-query
+            window = data['organic'][:self.result_window]
+            for result in sorted(window, key=lambda r: r.get('subquery') != 'market_size'):
                 snippet = result.get('snippet', '').lower()
                 if 'billion' in snippet or 'market size' in snippet:
                     return f"Market insights available - {snippet[:100]}..."
@@ -209,7 +360,7 @@ class ResearchAgent:
         else:
             # Extract from search results for other industries
             if 'organic' in data:
-                for result in data['organic'][:5]:
+                for result in data['organic'][:self.result_window]:
                     snippet = result.get('snippet', '').lower()
                     title = result.get('title', '').lower()
                     text = snippet + ' ' + title
@@ -245,7 +396,7 @@ class ResearchAgent:
         trends = set()
         
         if 'organic' in data and data['organic']:
-            for result in data['organic'][:8]:
+            for result in data['organic'][:self.result_window]:
                 snippet = result.get('snippet', '').lower()
                 title = result.get('title', '').lower()
                 text = snippet + ' ' + title
@@ -277,4 +428,25 @@ class ResearchAgent:
         if not result_trends:
             result_trends = ["AI integration", "Digital transformation", "Sustainability focus"]
         
-        return result_trends
\ No newline at end of file
+        return result_trends
+
+
+class OfflineResearchAgent(ResearchAgent):
+    """Stand-in that answers from fallback research after a simulated search delay (no network).
+
+    ``latency`` (seconds) simulates the fused Serper sub-queries: each
+    uncached research call sleeps for 0.5x-1.5x of it, capped by the run's
+    latency budget. Pass a seeded ``rng`` for reproducible latencies.
+    """
+
+    def __init__(self, latency: float = 0.0, rng: random.Random = None, **kwargs):
+        super().__init__(**kwargs)
+        self.serper_key = None
+        self.latency = latency
+        self.rng = rng or random.Random()
+
+    def _research(self, query: str, budget: LatencyBudget = None) -> Dict:
+        if self.latency:
+            delay = self.latency * self.rng.uniform(0.5, 1.5)
+            time.sleep(min(delay, budget.remaining()) if budget is not None else delay)
+        return self._fallback_research(query)
@@ -1,258 +1,50 @@
-import requests
 import os
+import time
 from typing import Dict, List
+from agents.keyword_index import KeywordIndex, load_keyword_index
+from agents.resource_providers import ProviderScheduler, ResourceProvider, discover_providers
 
 class ResourceAgent:
-    def __init__(self):
-        self.kaggle_key = os.getenv('KAGGLE_KEY')
-        self.github_token = os.getenv('GITHUB_TOKEN')
-        self.hf_token = os.getenv('HUGGINGFACE_API_KEY')
+    def __init__(self, keyword_index: KeywordIndex = None, providers: List[ResourceProvider] = None):
+        self.keyword_index = keyword_index or load_keyword_index()
+        # Providers come from the built-ins plus entry-point plugins (RESOURCE_PROVIDERS selects/orders them)
+        self.providers = providers if providers is not None else discover_providers()
+        self.scheduler = ProviderScheduler(self.providers, max_workers=int(os.getenv('RESOURCE_WORKERS', '8')))
+        self.deadline_seconds = float(os.getenv('RESOURCE_DEADLINE_SECONDS', '20'))
+        
+    def find_resources(self, use_cases: List[Dict], deadline: float = None, report: Dict = None,
+                       reuse: Dict[str, List[Dict]] = None, quota=None) -> Dict:
+        """Find datasets and resources for use cases.
+        
+        All providers are queried concurrently for all use cases; ``deadline``
+        (a time.monotonic() value) bounds the whole search. ``report`` is
+        filled with the number of provider calls and how many were cut short.
+        Use cases named in ``reuse`` keep those resources and are not searched.
+        ``quota`` limits provider calls to a caller's share (see ProviderScheduler.run).
+        """
+        if deadline is None:
+            deadline = time.monotonic() + self.deadline_seconds
+        reuse = reuse or {}
+        to_search = [uc for uc in use_cases if uc['name'] not in reuse]
+        if reuse:
+            print(f"[DEBUG] Reusing resources for {len(use_cases) - len(to_search)} unchanged use cases")
+        
+        # Discriminative keywords for every use case in one pass
+        keywords = self.keyword_index.extract_batch([(uc['name'], uc['description']) for uc in to_search], k=3)
+        queries = {}
+        for use_case, case_keywords in zip(to_search, keywords):
+            queries[use_case['name']] = " ".join(case_keywords[:3]) or "machine learning"  # Use top 3 keywords
+            print(f"[DEBUG] Searching resources for: {use_case['name']} ({queries[use_case['name']]})")
+        
+        results = self.scheduler.run(queries, deadline, report, quota=quota)
         
-    def find_resources(self, use_cases: List[Dict]) -> Dict:
-        """Find datasets and resources for use cases"""
         resources = {}
-        
         for use_case in use_cases:
             case_name = use_case['name']
-            resources[case_name] = self._search_resources(case_name, use_case['description'])
-            
+            if case_name in reuse:
+                resources[case_name] = reuse[case_name]
+                continue
+            case_resources = results[case_name]
+            print(f"[DEBUG] Found {len(case_resources)} resources for {case_name}")
+            resources[case_name] = case_resources[:4]  # Limit to 4 resources per use case
         return resources
-    
-    def _search_resources(self, use_case: str, description: str) -> List[Dict]:
-        """Search for relevant datasets and resources based on actual use case"""
-        print(f"[DEBUG] Searching resources for: {use_case}")
-        resources = []
-        
-        # Extract keywords from use case and description
-        keywords = self._extract_keywords(use_case, description)
-        search_query = " ".join(keywords[:3])  # Use top 3 keywords
-        
-        # Try Kaggle search with specific keywords
-        kaggle_results = self._search_kaggle(search_query)
-        resources.extend(kaggle_results)
-        
-        # Try GitHub search with specific keywords
-        github_results = self._search_github(search_query)
-        resources.extend(github_results)
-        
-        # Add HuggingFace models with specific keywords
-        hf_results = self._search_huggingface(search_query)
-        resources.extend(hf_results)
-        
-        print(f"[DEBUG] Found {len(resources)} resources for {use_case}")
-        return resources[:4]  # Limit to 4 resources per use case
-    
-    def _search_kaggle(self, query: str) -> List[Dict]:
-        """Search Kaggle datasets using API"""
-        try:
-            if not self.kaggle_key:
-                raise Exception("KAGGLE_KEY required for dataset search")
-            
-            # Use Kaggle API search
-            url = "https://www.kaggle.com/api/v1/datasets/list"
-            headers = {
-                "Authorization": f"Bearer {self.kaggle_key}"
-            }
-            params = {
-                "search": query.replace(' ', '+'),
-                "sortBy": "hottest",
-                "size": 3
-            }
-            
-            response = requests.get(url, headers=headers, params=params, timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                resources = []
-                
-                for dataset in data[:2]:
-                    resources.append({
-                        "name": dataset.get('title', 'Kaggle Dataset'),
-                        "type": "Kaggle Dataset",
-                        "url": f"https://www.kaggle.com/datasets/{dataset.get('ref', '')}",
-                        "description": dataset.get('subtitle', 'Dataset from Kaggle')[:100]
-                    })
-                
-                return resources if resources else self._fallback_kaggle(query)
-            else:
-                raise Exception("Kaggle API failed - check KAGGLE_KEY")
-                
-        except Exception as e:
-            print(f"Kaggle API error: {e}")
-            return []
-    
-    def _search_github(self, query: str) -> List[Dict]:
-        """Search GitHub repositories"""
-        try:
-            url = "https://api.github.com/search/repositories"
-            params = {
-                "q": f"{query.replace(' ', '+')}+machine+learning", 
-                "sort": "stars", 
-                "per_page": 2
-            }
-            
-            headers = {}
-            if self.github_token and self.github_token.strip():
-                headers["Authorization"] = f"Bearer {self.github_token}"
-            
-            response = requests.get(url, params=params, headers=headers, timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                resources = []
-                
-                for repo in data.get('items', [])[:2]:
-                    resources.append({
-                        "name": repo['name'],
-                        "type": "GitHub Repository", 
-                        "url": repo['html_url'],
-                        "description": repo.get('description', 'Machine learning repository')[:100]
-                    })
-                return resources
-            else:
-                print(f"GitHub API error: {response.status_code}")
-                return []
-                
-        except Exception as e:
-            print(f"GitHub search error: {e}")
-            return []
-    
-    def _search_huggingface(self, query: str) -> List[Dict]:
-        """Search HuggingFace models using API"""
-        try:
-            url = "https://huggingface.co/api/models"
-            params = {
-                "search": query.replace(' ', '+'),
-                "sort": "downloads",
-                "direction": -1,
-                "limit": 3
-            }
-            
-            headers = {}
-            if hasattr(self, 'hf_token') and self.hf_token:
-                headers["Authorization"] = f"Bearer {self.hf_token}"
-            
-            response = requests.get(url, params=params, headers=headers, timeout=10)
-            
-            if response.status_code == 200:
-                models = response.json()
-                resources = []
-                
-                for model in models[:2]:
-                    model_id = model.get('modelId', '')
-                    resources.append({
-                        "name": model_id,
-                        "type": "HuggingFace Model",
-                        "url": f"https://huggingface.co/{model_id}",
-                        "description": f"Downloads: {model.get('downloads', 0)}, Task: {', '.join(model.get('pipeline_tag', ['general']) if isinstance(model.get('pipeline_tag'), list) else [model.get('pipeline_tag', 'general')])}"
-                    })
-                
-                return resources if resources else self._fallback_huggingface(query)
-            else:
-                return self._fallback_huggingface(query)
-                
-        except Exception as e:
-            print(f"HuggingFace API error: {e}")
-            return self._fallback_huggingface(query)
-    
-    def _fallback_huggingface(self, query: str) -> List[Dict]:
-        """Fallback HuggingFace models"""
-        model_map = {
-            "predictive": {
-                "model": "facebook/prophet",
-                "desc": "Time series forecasting model"
-            },
-            "recommendation": {
-                "model": "sentence-transformers/all-MiniLM-L6-v2",
-                "desc": "Sentence embeddings for recommendations"
-            },
-            "image": {
-                "model": "google/vit-base-patch16-224",
-                "desc": "Vision transformer for image classification"
-            },
-            "text": {
-                "model": "distilbert-base-uncased",
-                "desc": "Lightweight BERT for text processing"
-            },
-            "chatbot": {
-                "model": "microsoft/DialoGPT-medium",
-                "desc": "Conversational AI model"
-            },
-            "generation": {
-                "model": "gpt2",
-                "desc": "Text generation model"
-            }
-        }
-        
-        # Find best match
-        for key, data in model_map.items():
-            if key in query.lower():
-                return [{
-                    "name": data["model"],
-                    "type": "HuggingFace Model",
-                    "url": f"https://huggingface.co/{data['model']}",
-                    "description": data["desc"]
-                }]
-        
-        # Default model
-        return [{
-            "name": "bert-base-uncased", 
-            "type": "HuggingFace Model",
-            "url": "https://huggingface.co/bert-base-uncased",
-            "description": "General purpose language model for various NLP tasks"
-        }]
-    
-    def _extract_keywords(self, use_case: str, description: str) -> List[str]:
-        """Extract industry-specific keywords from use case and description"""
-        text = (use_case + " " + description).lower()
-        keywords = []
-        
-        # Industry-specific keywords
-        if "healthcare" in text or "medical" in text or "patient" in text or "clinical" in text:
-            keywords.extend(["medical", "healthcare", "patient", "clinical"])
-        elif "finance" in text or "banking" in text or "trading" in text or "investment" in text:
-            keywords.extend(["finance", "banking", "trading", "investment"])
-        elif "retail" in text or "shopping" in text or "ecommerce" in text or "inventory" in text:
-            keywords.extend(["retail", "ecommerce", "shopping", "inventory"])
-        elif "automotive" in text or "vehicle" in text or "tesla" in text or "manufacturing" in text:
-            keywords.extend(["automotive", "vehicle", "manufacturing", "tesla"])
-        
-        # Task-specific keywords
-        if "predictive" in text or "forecasting" in text:
-            keywords.append("forecasting")
-        if "recommendation" in text or "personalization" in text:
-            keywords.append("recommendation")
-        if "automation" in text:
-            keywords.append("automation")
-        if "optimization" in text:
-            keywords.append("optimization")
-        if "analytics" in text or "data" in text:
-            keywords.append("analytics")
-        
-        return keywords[:4] if keywords else ["machine learning"]
-    
-    def _fallback_kaggle(self, query: str) -> List[Dict]:
-        # Industry-specific dataset suggestions
-        if "healthcare" in query.lower() or "medical" in query.lower():
-            return [{"name": "Medical Dataset Collection", "type": "Kaggle Dataset", "url": "https://www.kaggle.com/search?q=medical+healthcare+dataset", "description": "Healthcare and medical datasets for AI research"}]
-        elif "finance" in query.lower() or "banking" in query.lower() or "financial" in query.lower():
-            return [{"name": "Financial Data Collection", "type": "Kaggle Dataset", "url": "https://www.kaggle.com/search?q=finance+banking+dataset", "description": "Financial and banking datasets for analysis"}]
-        elif "retail" in query.lower() or "ecommerce" in query.lower():
-            return [{"name": "Retail Analytics Dataset", "type": "Kaggle Dataset", "url": "https://www.kaggle.com/search?q=retail+ecommerce+sales", "description": "Retail and e-commerce datasets"}]
-        elif "automotive" in query.lower() or "tesla" in query.lower():
-            return [{"name": "Automotive Industry Data", "type": "Kaggle Dataset", "url": "https://www.kaggle.com/search?q=automotive+vehicle+dataset", "description": "Automotive and vehicle datasets"}]
-        else:
-            return [{"name": f"{query.title()} Dataset", "type": "Kaggle Dataset", "url": f"https://www.kaggle.com/search?q={query.replace(' ', '+')}", "description": f"Search results for {query} datasets"}]
-    
-    def _fallback_github(self, query: str) -> List[Dict]:
-        # Industry-specific repository suggestions
-        if "healthcare" in query.lower() or "medical" in query.lower():
-            return [{"name": "Medical AI Repository", "type": "GitHub Repository", "url": "https://github.com/search?q=medical+healthcare+ai+machine+learning", "description": "Healthcare AI and medical ML repositories"}]
-        elif "finance" in query.lower() or "banking" in query.lower() or "financial" in query.lower():
-            return [{"name": "Financial ML Repository", "type": "GitHub Repository", "url": "https://github.com/search?q=finance+banking+machine+learning", "description": "Financial ML and banking AI repositories"}]
-        elif "retail" in query.lower() or "ecommerce" in query.lower():
-            return [{"name": "Retail AI Repository", "type": "GitHub Repository", "url": "https://github.com/search?q=retail+ecommerce+recommendation+ml", "description": "Retail AI and e-commerce ML repositories"}]
-        elif "automotive" in query.lower() or "tesla" in query.lower():
-            return [{"name": "Automotive AI Repository", "type": "GitHub Repository", "url": "https://github.com/search?q=automotive+vehicle+ai+autonomous", "description": "Automotive AI and autonomous vehicle repositories"}]
-        else:
-            return [{"name": f"{query.title()} Repository", "type": "GitHub Repository", "url": f"https://github.com/search?q={query.replace(' ', '+')}+machine+learning", "description": f"Search results for {query} repositories"}]
\ No newline at end of file
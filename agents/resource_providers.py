@@ -0,0 +1,413 @@
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from importlib import metadata
+from typing import Dict, List, Optional, Sequence
+
+from agents.http_client import HTTPClient, LatencyBudget, ProviderSession
+
+ENTRY_POINT_GROUP = "market_research.resource_providers"
+RESOURCE_FIELDS = ("name", "type", "url", "description")
+DEFAULT_PROVIDERS = ("kaggle", "github", "huggingface")
+
+
+def validate_resource(item: Dict, default_type: str) -> Optional[Dict]:
+    """Coerce a provider result into the resource schema; None if it has no name or URL"""
+    if not item.get("name") or not item.get("url"):
+        return None
+    return {
+        "name": str(item["name"]),
+        "type": str(item.get("type") or default_type),
+        "url": str(item["url"]),
+        "description": str(item.get("description") or "")[:100],
+    }
+
+
+class TokenBucket:
+    """Thread-safe rate limiter: ``rate`` calls per second with bursts of ``burst``"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> float:
+        """Take a token if one is available (returns 0), else the seconds until one is (nothing taken)"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def refund(self):
+        """Return a token taken by try_acquire that ended up unused"""
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + 1)
+
+    def set_rate(self, rate: float, burst: int):
+        """Change the limits, keeping tokens already earned (up to the new burst)"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self.rate = rate
+            self.burst = burst
+
+
+class ResourceProvider:
+    """Base class for resource sources.
+
+    Subclasses set the declared limits and implement ``search``; results
+    must follow ``RESOURCE_FIELDS``. ``session`` offers requests-style
+    ``get``/``post`` that record latency and respect the run's budget. ``fallback`` is used when the source is
+    unavailable, rate limited or out of time, and must not do network I/O.
+    """
+
+    name = "provider"
+    resource_type = "Resource"
+    rate_limit = 1.0      # calls per second
+    burst = 2
+    timeout = 10.0        # seconds per call
+    cost = 0.0            # relative cost per call
+    max_results = 2
+    fallback_on_error = True
+
+    def search(self, query: str, session: ProviderSession, timeout: float) -> List[Dict]:
+        raise NotImplementedError
+
+    def fallback(self, query: str) -> List[Dict]:
+        return []
+
+
+class KaggleProvider(ResourceProvider):
+    name = "kaggle"
+    resource_type = "Kaggle Dataset"
+    timeout = 10.0
+    cost = 1.0
+    fallback_on_error = False
+
+    def __init__(self):
+        self.kaggle_key = os.getenv('KAGGLE_KEY')
+
+    def search(self, query: str, session: ProviderSession, timeout: float) -> List[Dict]:
+        """Search Kaggle datasets using API"""
+        if not self.kaggle_key:
+            raise Exception("KAGGLE_KEY required for dataset search")
+
+        response = session.get(
+            "https://www.kaggle.com/api/v1/datasets/list",
+            headers={"Authorization": f"Bearer {self.kaggle_key}"},
+            params={"search": query.replace(' ', '+'), "sortBy": "hottest", "size": 3},
+            timeout=timeout,
+        )
+        if response.status_code != 200:
+            raise Exception("Kaggle API failed - check KAGGLE_KEY")
+
+        resources = [{
+            "name": dataset.get('title', 'Kaggle Dataset'),
+            "url": f"https://www.kaggle.com/datasets/{dataset.get('ref', '')}",
+            "description": dataset.get('subtitle', 'Dataset from Kaggle'),
+        } for dataset in response.json()[:self.max_results]]
+        return resources or self.fallback(query)
+
+    def fallback(self, query: str) -> List[Dict]:
+        # Industry-specific dataset suggestions
+        if "healthcare" in query.lower() or "medical" in query.lower():
+            return [{"name": "Medical Dataset Collection", "type": "Kaggle Dataset", "url": "https://www.kaggle.com/search?q=medical+healthcare+dataset", "description": "Healthcare and medical datasets for AI research"}]
+        elif "finance" in query.lower() or "banking" in query.lower() or "financial" in query.lower():
+            return [{"name": "Financial Data Collection", "type": "Kaggle Dataset", "url": "https://www.kaggle.com/search?q=finance+banking+dataset", "description": "Financial and banking datasets for analysis"}]
+        elif "retail" in query.lower() or "ecommerce" in query.lower():
+            return [{"name": "Retail Analytics Dataset", "type": "Kaggle Dataset", "url": "https://www.kaggle.com/search?q=retail+ecommerce+sales", "description": "Retail and e-commerce datasets"}]
+        elif "automotive" in query.lower() or "tesla" in query.lower():
+            return [{"name": "Automotive Industry Data", "type": "Kaggle Dataset", "url": "https://www.kaggle.com/search?q=automotive+vehicle+dataset", "description": "Automotive and vehicle datasets"}]
+        else:
+            return [{"name": f"{query.title()} Dataset", "type": "Kaggle Dataset", "url": f"https://www.kaggle.com/search?q={query.replace(' ', '+')}", "description": f"Search results for {query} datasets"}]
+
+
+class GitHubProvider(ResourceProvider):
+    name = "github"
+    resource_type = "GitHub Repository"
+    # Unauthenticated search allows 10 requests per minute
+    rate_limit = 10 / 60
+    burst = 5
+    timeout = 10.0
+    cost = 0.5
+
+    def __init__(self):
+        self.github_token = os.getenv('GITHUB_TOKEN')
+        if self.github_token and self.github_token.strip():
+            self.rate_limit = 30 / 60
+
+    def search(self, query: str, session: ProviderSession, timeout: float) -> List[Dict]:
+        """Search GitHub repositories"""
+        headers = {}
+        if self.github_token and self.github_token.strip():
+            headers["Authorization"] = f"Bearer {self.github_token}"
+
+        response = session.get(
+            "https://api.github.com/search/repositories",
+            params={"q": f"{query.replace(' ', '+')}+machine+learning", "sort": "stars", "per_page": 2},
+            headers=headers,
+            timeout=timeout,
+        )
+        if response.status_code != 200:
+            print(f"GitHub API error: {response.status_code}")
+            return []
+
+        return [{
+            "name": repo['name'],
+            "url": repo['html_url'],
+            "description": repo.get('description') or 'Machine learning repository',
+        } for repo in response.json().get('items', [])[:self.max_results]]
+
+
+class HuggingFaceProvider(ResourceProvider):
+    name = "huggingface"
+    resource_type = "HuggingFace Model"
+    rate_limit = 5.0
+    burst = 5
+    timeout = 10.0
+    cost = 0.2
+
+    MODEL_MAP = {
+        "predictive": ("facebook/prophet", "Time series forecasting model"),
+        "recommendation": ("sentence-transformers/all-MiniLM-L6-v2", "Sentence embeddings for recommendations"),
+        "image": ("google/vit-base-patch16-224", "Vision transformer for image classification"),
+        "text": ("distilbert-base-uncased", "Lightweight BERT for text processing"),
+        "chatbot": ("microsoft/DialoGPT-medium", "Conversational AI model"),
+        "generation": ("gpt2", "Text generation model"),
+    }
+
+    def __init__(self):
+        self.hf_token = os.getenv('HUGGINGFACE_API_KEY')
+
+    def search(self, query: str, session: ProviderSession, timeout: float) -> List[Dict]:
+        """Search HuggingFace models using API"""
+        headers = {}
+        if self.hf_token:
+            headers["Authorization"] = f"Bearer {self.hf_token}"
+
+        response = session.get(
+            "https://huggingface.co/api/models",
+            params={"search": query.replace(' ', '+'), "sort": "downloads", "direction": -1, "limit": 3},
+            headers=headers,
+            timeout=timeout,
+        )
+        if response.status_code != 200:
+            return self.fallback(query)
+
+        resources = []
+        for model in response.json()[:self.max_results]:
+            model_id = model.get('modelId', '')
+            tag = model.get('pipeline_tag') or 'general'
+            tags = tag if isinstance(tag, list) else [tag]
+            resources.append({
+                "name": model_id,
+                "url": f"https://huggingface.co/{model_id}",
+                "description": f"Downloads: {model.get('downloads', 0)}, Task: {', '.join(tags)}",
+            })
+        return resources or self.fallback(query)
+
+    def fallback(self, query: str) -> List[Dict]:
+        """Fallback HuggingFace models"""
+        for key, (model, description) in self.MODEL_MAP.items():
+            if key in query.lower():
+                return [{"name": model, "type": self.resource_type,
+                         "url": f"https://huggingface.co/{model}", "description": description}]
+        return [{
+            "name": "bert-base-uncased",
+            "type": self.resource_type,
+            "url": "https://huggingface.co/bert-base-uncased",
+            "description": "General purpose language model for various NLP tasks",
+        }]
+
+
+class OfflineProvider(ResourceProvider):
+    """Stand-in that answers every search from another provider's fallback (no network).
+
+    ``latency`` (seconds) simulates API response time: each call sleeps for
+    0.5x-1.5x of it, capped by the call's timeout. Pass a seeded ``rng`` for
+    reproducible latencies.
+    """
+
+    rate_limit = 1000.0
+    burst = 1000
+
+    def __init__(self, provider: ResourceProvider, latency: float = 0.0, rng: random.Random = None):
+        self.provider = provider
+        self.name = provider.name
+        self.resource_type = provider.resource_type
+        self.latency = latency
+        self.rng = rng or random.Random()
+
+    def search(self, query: str, session: ProviderSession, timeout: float) -> List[Dict]:
+        if self.latency:
+            time.sleep(min(self.latency * self.rng.uniform(0.5, 1.5), timeout))
+        return self.provider.fallback(query)
+
+    def fallback(self, query: str) -> List[Dict]:
+        return self.provider.fallback(query)
+
+
+BUILTIN_PROVIDERS = {
+    "kaggle": KaggleProvider,
+    "github": GitHubProvider,
+    "huggingface": HuggingFaceProvider,
+}
+
+
+def _entry_points(group: str):
+    entry_points = metadata.entry_points()
+    if hasattr(entry_points, "select"):
+        return entry_points.select(group=group)
+    return entry_points.get(group, [])
+
+
+def discover_providers(names: Sequence[str] = None) -> List[ResourceProvider]:
+    """Built-in providers plus any registered under the entry point group.
+
+    ``names`` (or ``RESOURCE_PROVIDERS``, comma-separated) selects and orders
+    providers; by default the built-ins run first, then plugins.
+    """
+    factories = dict(BUILTIN_PROVIDERS)
+    for entry_point in _entry_points(ENTRY_POINT_GROUP):
+        try:
+            factories[entry_point.name] = entry_point.load()
+        except Exception as e:
+            print(f"[WARN] Could not load resource provider '{entry_point.name}': {e}")
+
+    if names is None and os.getenv('RESOURCE_PROVIDERS'):
+        names = [n.strip() for n in os.getenv('RESOURCE_PROVIDERS').split(",") if n.strip()]
+    if names is None:
+        names = list(DEFAULT_PROVIDERS) + [n for n in factories if n not in DEFAULT_PROVIDERS]
+
+    providers = []
+    for name in names:
+        if name not in factories:
+            print(f"[WARN] Unknown resource provider: {name}")
+            continue
+        provider = factories[name]()
+        provider.name = name
+        providers.append(provider)
+    return providers
+
+
+class ProviderScheduler:
+    """Runs every provider for every query concurrently within a global deadline.
+
+    Each provider has its own token bucket and per-call timeout; calls that
+    cannot start or finish before the deadline (or would exceed the cost
+    budget) are answered from the provider's fallback instead. Tokens are
+    taken by the calling thread before a call is handed to the executor, so
+    pool threads never sleep on a rate limit, and no token is spent on a call
+    that could not start before the deadline.
+    """
+
+    def __init__(self, providers: List[ResourceProvider], max_workers: int = 8, cost_budget: float = None):
+        self.providers = providers
+        self.cost_budget = cost_budget
+        self.buckets = {p.name: TokenBucket(p.rate_limit, p.burst) for p in providers}
+        self.http = HTTPClient(pool_maxsize=max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="provider")
+        self._lock = threading.Lock()
+        self.stats = {p.name: {"calls": 0, "fallbacks": 0, "errors": 0, "cost": 0.0} for p in providers}
+
+    def run(self, queries: Dict[str, str], deadline: float, report: Dict = None,
+            quota=None) -> Dict[str, List[Dict]]:
+        """Results per key, merged in provider order (``deadline`` is a time.monotonic() value).
+
+        ``report`` receives ``calls`` and ``cut_short`` (calls answered from a
+        fallback because of the deadline, cost budget or quota). ``quota``, when
+        given, is a second limiter (``try_acquire(provider)``/``refund(provider)``)
+        that must grant a token before each call.
+        """
+        run_state = {"cost": 0.0, "cut_short": 0}
+        outcomes = {}
+        pending = deque((key, index, provider, query) for key, query in queries.items()
+                        for index, provider in enumerate(self.providers))
+
+        # Dispatch calls as their tokens become available; waiting happens here, not in the pool
+        while pending:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            waiting, soonest = deque(), None
+            for key, index, provider, query in pending:
+                if self.cost_budget is not None and run_state["cost"] + provider.cost > self.cost_budget:
+                    outcomes[(key, index)] = None
+                    continue
+                wait_for = self._take_token(provider, quota)
+                if wait_for == 0:
+                    run_state["cost"] += provider.cost
+                    outcomes[(key, index)] = self._executor.submit(self._call, provider, query, deadline)
+                elif now + wait_for > deadline:
+                    outcomes[(key, index)] = None
+                else:
+                    waiting.append((key, index, provider, query))
+                    soonest = wait_for if soonest is None else min(soonest, wait_for)
+            pending = waiting
+            if pending:
+                time.sleep(min(soonest, max(0.0, deadline - now)))
+        for key, index, _, _ in pending:
+            outcomes[(key, index)] = None
+
+        futures = [f for f in outcomes.values() if f is not None]
+        wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+        for future in futures:
+            # Calls still queued at the deadline must not run into the next request's time
+            future.cancel()
+
+        merged = {key: [] for key in queries}
+        for (key, index), future in outcomes.items():
+            provider = self.providers[index]
+            items = None
+            if future is not None and future.done() and not future.cancelled() and future.exception() is None:
+                items = future.result()
+            if items is None:
+                # No token in time, over budget, started too late, or still running at the deadline
+                self._count(provider, "fallbacks")
+                run_state["cut_short"] += 1
+                items = provider.fallback(queries[key])
+            merged[key].extend(r for r in (validate_resource(i, provider.resource_type) for i in items) if r)
+        if report is not None:
+            report.update(calls=len(outcomes), cut_short=run_state["cut_short"], cost=run_state["cost"])
+        return merged
+
+    def _take_token(self, provider: ResourceProvider, quota=None) -> float:
+        """0 when both the caller's quota and the provider's bucket granted a token, else seconds to wait"""
+        if quota is not None:
+            wait_for = quota.try_acquire(provider)
+            if wait_for:
+                return wait_for
+        wait_for = self.buckets[provider.name].try_acquire()
+        if wait_for and quota is not None:
+            quota.refund(provider)
+        return wait_for
+
+    def _call(self, provider: ResourceProvider, query: str, deadline: float) -> Optional[List[Dict]]:
+        """Run one provider call; None if it could not start before the deadline"""
+        budget = LatencyBudget.until(deadline)
+        timeout = self.http.timeout_for(provider.name, provider.timeout, budget)
+        if timeout <= 0:
+            return None
+        self._count(provider, "calls", provider.cost)
+        try:
+            return provider.search(query, self.http.for_provider(provider.name, budget), timeout)
+        except Exception as e:
+            print(f"{provider.name} search error: {e}")
+            self._count(provider, "errors")
+            return provider.fallback(query) if provider.fallback_on_error else []
+
+    def _count(self, provider: ResourceProvider, field: str, cost: float = 0.0):
+        with self._lock:
+            stats = self.stats[provider.name]
+            stats[field] += 1
+            stats["cost"] += cost
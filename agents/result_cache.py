@@ -0,0 +1,146 @@
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+from agents.cache import LRUCache
+
+# Bump when the shape of cached stage outputs changes
+PIPELINE_CACHE_VERSION = "1"
+DAY = 24 * 3600
+
+# Maximum age in seconds before a stage is recomputed
+DEFAULT_FRESHNESS = {
+    "research": 7 * DAY,
+    "use_cases": 30 * DAY,
+    "resources": 1 * DAY,
+    "bonus": 30 * DAY,
+    "report": 30 * DAY,
+}
+# Maximum age of a stage whose output was degraded (e.g. provider calls cut short by the deadline)
+DEFAULT_DEGRADED_FRESHNESS = 15 * 60
+
+
+def fingerprint(value) -> str:
+    """Stable hash of a stage's inputs"""
+    return hashlib.sha1(json.dumps(value, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+class FreshnessPolicy:
+    """Decides per stage whether a cached output can be reused"""
+
+    def __init__(self, max_age: Dict[str, float] = None, degraded_max_age: float = DEFAULT_DEGRADED_FRESHNESS):
+        self.max_age = dict(DEFAULT_FRESHNESS, **(max_age or {}))
+        self.degraded_max_age = degraded_max_age
+
+    @classmethod
+    def from_env(cls) -> "FreshnessPolicy":
+        """Parse PIPELINE_FRESHNESS, e.g. 'resources=1,use_cases=30' (days), and
+        PIPELINE_DEGRADED_FRESHNESS (seconds)"""
+        overrides = {}
+        for item in (os.getenv('PIPELINE_FRESHNESS') or "").split(","):
+            if "=" in item:
+                stage, days = item.split("=", 1)
+                overrides[stage.strip()] = float(days) * DAY
+        degraded = os.getenv('PIPELINE_DEGRADED_FRESHNESS')
+        return cls(overrides, float(degraded) if degraded else DEFAULT_DEGRADED_FRESHNESS)
+
+    def is_fresh(self, stage: str, created_at: float, now: float = None, degraded: bool = False) -> bool:
+        max_age = self.max_age.get(stage)
+        if degraded:
+            max_age = self.degraded_max_age if max_age is None else min(max_age, self.degraded_max_age)
+        if max_age is None:
+            return True
+        return (now or time.time()) - created_at <= max_age
+
+
+class PipelineResultCache:
+    """Cross-run cache of the full run_research bundle, reusable stage by stage.
+
+    Entries are keyed on the normalized query plus agent/rule versions and
+    persisted as JSON under ``reports/cache/pipeline/``. Each stage records
+    when it was produced and a fingerprint of its inputs; a stage is reused
+    only while it is fresh under the policy and its inputs are unchanged.
+    Degraded stage outputs are kept too, but only for the policy's short
+    ``degraded_max_age``, so a repeat run soon after reuses them while a later
+    one tries for the full result again.
+    """
+
+    def __init__(self, root: str = None, policy: FreshnessPolicy = None, memory_entries: int = 256):
+        self.root = root or os.getenv('PIPELINE_CACHE_DIR') or os.path.join("reports", "cache", "pipeline")
+        self.policy = policy or FreshnessPolicy.from_env()
+        self.memory = LRUCache(max_entries=memory_entries)
+        self.stats = {"reused": 0, "refreshed": 0}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_for(normalized_query: str, versions: Sequence[Tuple[str, str]]) -> str:
+        parts = [PIPELINE_CACHE_VERSION, normalized_query] + [f"{name}={value}" for name, value in versions]
+        return hashlib.sha256("\x1f".join(parts).encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.json")
+
+    def load(self, key: str) -> Dict:
+        """Cached stages for a key (empty when nothing was stored yet)"""
+        entry = self.memory.get(key)
+        if entry is None:
+            try:
+                with open(self._path(key), encoding='utf-8') as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                entry = {"stages": {}}
+            self.memory.set(key, entry)
+        # Callers update stages in place, so hand out a private copy
+        return copy.deepcopy(entry)
+
+    def save(self, key: str, entry: Dict):
+        self.memory.set(key, copy.deepcopy(entry))
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+    def stage(self, entry: Dict, stage: str, inputs, compute: Callable[[], Tuple[object, Optional[str]]],
+              refresh: bool = False) -> Tuple[object, bool, Optional[str]]:
+        """Return (output, reused, why it is degraded or None); recompute when stale, inputs
+        changed or refresh is forced. ``compute`` returns (output, why it is degraded or None)."""
+        input_hash = fingerprint(inputs)
+        cached = entry["stages"].get(stage)
+        if (not refresh and cached and cached["inputs"] == input_hash
+                and self.policy.is_fresh(stage, cached["created_at"], degraded=bool(cached.get("degraded")))):
+            with self._lock:
+                self.stats["reused"] += 1
+            return cached["output"], True, cached.get("degraded")
+
+        output, degraded = compute()
+        entry["stages"][stage] = {"created_at": time.time(), "inputs": input_hash, "output": output}
+        if degraded:
+            entry["stages"][stage]["degraded"] = degraded
+        with self._lock:
+            self.stats["refreshed"] += 1
+        return output, False, degraded
+
+    def peek(self, entry: Dict, stage: str):
+        """Cached output of a stage regardless of age or inputs (None if absent)"""
+        cached = entry["stages"].get(stage)
+        return cached["output"] if cached else None
+
+    def freshness(self, entry: Dict) -> Dict[str, float]:
+        """Age in seconds of each cached stage"""
+        now = time.time()
+        return {stage: round(now - cached["created_at"], 1) for stage, cached in entry["stages"].items()}
+
+    def invalidate(self, key: str = None):
+        self.memory.invalidate(key)
+        if key is not None:
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
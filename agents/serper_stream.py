@@ -0,0 +1,194 @@
+import codecs
+import json
+import re
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+# Fields the research extractors read and how many items to keep (None = whole value)
+DEFAULT_FIELD_LIMITS = {
+    "organic": 10,
+}
+# Keys kept per list item; everything else is dropped right after decoding
+DEFAULT_KEEP_KEYS = {
+    "organic": ("title", "snippet", "link", "date"),
+}
+
+_STRUCTURAL = re.compile(r'["{}\[\]]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+_PRIMITIVE = re.compile(r'-?[0-9][0-9.eE+\-]*|true|false|null')
+
+
+class StreamParseError(ValueError):
+    pass
+
+
+class _JsonStream:
+    """Pull-based reader over an iterator of byte chunks.
+
+    Consumed text is discarded whenever more input is read, so memory is
+    bounded by the chunk size plus the largest value that is captured.
+    """
+
+    def __init__(self, chunks: Iterable[bytes], max_value_bytes: int):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self.max_value_bytes = max_value_bytes
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self.bytes_read = 0
+
+    def fill(self) -> bool:
+        if self.eof:
+            return False
+        for chunk in self._chunks:
+            if not chunk:
+                continue
+            self.bytes_read += len(chunk)
+            text = self._decoder.decode(chunk)
+            self.buf = self.buf[self.pos:] + text
+            self.pos = 0
+            return True
+        self.buf = self.buf[self.pos:] + self._decoder.decode(b'', final=True)
+        self.pos = 0
+        self.eof = True
+        return False
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise StreamParseError(f"expected {char!r} at offset {self.bytes_read}")
+        self.pos += 1
+
+    def read_value(self, capture: bool = True):
+        """Decode (or skip) the next JSON value"""
+        first = self.peek()
+        if not first:
+            raise StreamParseError("unexpected end of stream")
+        if first == '"' or first in '{[':
+            end = self._scan_composite(capture)
+        else:
+            end = self._scan_primitive()
+        text = self.buf[self.pos:end]
+        self.pos = end
+        return json.loads(text) if capture else None
+
+    def _scan_primitive(self) -> int:
+        while True:
+            match = _PRIMITIVE.match(self.buf, self.pos)
+            if match and (match.end() < len(self.buf) or self.eof):
+                return match.end()
+            if not self.fill():
+                if match:
+                    return match.end()
+                raise StreamParseError("invalid JSON literal")
+
+    def _scan_composite(self, capture: bool) -> int:
+        depth = 0
+        in_string = False
+        i = self.pos
+        while True:
+            pattern = _STRING_SPECIAL if in_string else _STRUCTURAL
+            match = pattern.search(self.buf, i)
+            if match is None or (in_string and match.group() == '\\' and match.end() >= len(self.buf)):
+                # Need more input; when skipping, drop everything scanned so far
+                offset = (match.start() if match else len(self.buf)) - self.pos
+                if not capture:
+                    self.pos += offset
+                    offset = 0
+                elif len(self.buf) - self.pos > self.max_value_bytes:
+                    raise StreamParseError("value exceeds max_value_bytes")
+                if not self.fill():
+                    raise StreamParseError("unexpected end of stream")
+                i = self.pos + offset
+                continue
+
+            char = match.group()
+            i = match.end()
+            if in_string:
+                if char == '\\':
+                    i += 1
+                    continue
+                in_string = False
+                if depth == 0:
+                    return i
+            elif char == '"':
+                in_string = True
+            elif char in '{[':
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return i
+
+    def read_key(self) -> str:
+        if self.peek() != '"':
+            raise StreamParseError(f"expected object key at offset {self.bytes_read}")
+        return self.read_value()
+
+
+def parse_serper_stream(chunks: Iterable[bytes], field_limits: Dict[str, Optional[int]] = None,
+                        keep_keys: Dict[str, Sequence[str]] = None, stop_after: Sequence[str] = ("organic",),
+                        max_value_bytes: int = 1 << 20) -> Tuple[Dict, int]:
+    """Incrementally decode only the requested fields of a Serper response.
+
+    List fields are decoded item by item and truncated to their limit; all
+    other fields are skipped without being decoded. Parsing stops as soon as
+    every field in ``stop_after`` is complete, leaving the rest unread.
+    Returns the decoded fields and the number of bytes read from the stream.
+    """
+    field_limits = DEFAULT_FIELD_LIMITS if field_limits is None else field_limits
+    keep_keys = DEFAULT_KEEP_KEYS if keep_keys is None else keep_keys
+    pending = {name for name in stop_after if name in field_limits}
+    stream = _JsonStream(chunks, max_value_bytes)
+    data = {}
+
+    stream.expect('{')
+    while pending:
+        if stream.peek() in ('}', ''):
+            break
+        key = stream.read_key()
+        stream.expect(':')
+
+        if key not in field_limits:
+            stream.read_value(capture=False)
+        elif stream.peek() == '[':
+            # Only abandon the rest of the stream if this is the last field we wait for
+            data[key], truncated = _read_list(stream, field_limits[key], keep_keys.get(key), stop=pending == {key})
+            if truncated:
+                break
+        else:
+            data[key] = stream.read_value()
+        pending.discard(key)
+
+        if stream.peek() == ',':
+            stream.pos += 1
+
+    return data, stream.bytes_read
+
+
+def _read_list(stream: _JsonStream, limit: Optional[int], keep: Optional[Sequence[str]], stop: bool = False):
+    """Read list items up to ``limit``; returns (items, stopped_early)"""
+    items = []
+    stream.expect('[')
+    while stream.peek() != ']':
+        if limit is not None and len(items) >= limit:
+            if stop:
+                return items, True
+            stream.read_value(capture=False)
+        else:
+            item = stream.read_value()
+            if keep and isinstance(item, dict):
+                item = {k: item[k] for k in keep if k in item}
+            items.append(item)
+        if stream.peek() == ',':
+            stream.pos += 1
+    stream.expect(']')
+    return items, False
@@ -0,0 +1,61 @@
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+from typing import Iterable, Optional
+
+DEFAULT_KEY_PATH = os.path.join(os.path.expanduser("~"), ".cache", "market_research", "snapshot.key")
+
+_key = {}
+_key_lock = threading.Lock()
+
+
+def signing_key() -> Optional[bytes]:
+    """Secret for snapshot HMACs: SNAPSHOT_KEY, else a private per-user key file created on first use.
+
+    Returns None when the key file is readable or writable by other users;
+    snapshots are then neither trusted nor written.
+    """
+    secret = os.getenv('SNAPSHOT_KEY')
+    if secret:
+        return secret.encode('utf-8')
+    path = os.getenv('SNAPSHOT_KEY_PATH') or DEFAULT_KEY_PATH
+    with _key_lock:
+        if path not in _key:
+            _key[path] = _read_or_create_key(path)
+        return _key[path]
+
+
+def _read_or_create_key(path: str) -> Optional[bytes]:
+    try:
+        os.makedirs(os.path.dirname(path) or ".", mode=0o700, exist_ok=True)
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            pass
+        else:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(secrets.token_bytes(32))
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            if stat.st_mode & 0o077 or (hasattr(os, "getuid") and stat.st_uid != os.getuid()):
+                print(f"[WARN] Snapshot key {path} is accessible to other users; snapshots disabled")
+                return None
+            key = f.read()
+    except OSError as e:
+        print(f"[WARN] Snapshot key unavailable ({e}); snapshots disabled")
+        return None
+    return key or None
+
+
+def sign(key: bytes, parts: Iterable[bytes]) -> str:
+    """HMAC-SHA256 over the concatenated parts"""
+    mac = hmac.new(key, digestmod=hashlib.sha256)
+    for part in parts:
+        mac.update(part)
+    return mac.hexdigest()
+
+
+def verify(key: bytes, parts: Iterable[bytes], signature: str) -> bool:
+    return isinstance(signature, str) and hmac.compare_digest(sign(key, parts), signature)
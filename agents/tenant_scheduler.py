@@ -0,0 +1,286 @@
+import heapq
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict
+
+from agents.resource_providers import ResourceProvider, TokenBucket
+
+PRIORITIES = ("interactive", "batch")
+
+
+class AdmissionRejected(Exception):
+    """Raised when a job is refused; ``retry_after`` suggests when to try again (seconds)"""
+
+    def __init__(self, message: str, retry_after: float = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def parse_weights(spec: str) -> Dict[str, float]:
+    """Parse TENANT_WEIGHTS, e.g. 'ui=4,acme=1,beta=0.5'"""
+    weights = {}
+    for item in (spec or "").split(","):
+        if "=" in item:
+            tenant, weight = item.split("=", 1)
+            weights[tenant.strip()] = float(weight)
+    return weights
+
+
+class TenantQuota:
+    """A tenant's share of every resource provider's rate limit.
+
+    Each provider gets a token bucket at ``share`` times the provider's
+    declared rate, checked before the provider's global bucket, so one
+    tenant cannot drain a shared quota. The scheduler resizes the share as
+    tenants become active or idle.
+    """
+
+    def __init__(self, share: float):
+        self.share = share
+        self._buckets = {}
+        self._limits = {}
+        self._lock = threading.Lock()
+
+    def resize(self, share: float):
+        with self._lock:
+            if share == self.share:
+                return
+            self.share = share
+            for name, bucket in self._buckets.items():
+                bucket.set_rate(*self._scaled(*self._limits[name]))
+
+    def try_acquire(self, provider: ResourceProvider) -> float:
+        """0 if a token was taken, else seconds until one is available (see TokenBucket.try_acquire)"""
+        return self._bucket(provider).try_acquire()
+
+    def refund(self, provider: ResourceProvider):
+        self._bucket(provider).refund()
+
+    def _bucket(self, provider: ResourceProvider) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(provider.name)
+            if bucket is None:
+                self._limits[provider.name] = (provider.rate_limit, provider.burst)
+                bucket = self._buckets[provider.name] = TokenBucket(
+                    *self._scaled(provider.rate_limit, provider.burst))
+            return bucket
+
+    def _scaled(self, rate_limit: float, burst: int):
+        return rate_limit * self.share, max(1, int(burst * self.share))
+
+
+class _Job:
+    __slots__ = ("tenant", "priority", "query", "kwargs", "future", "submitted")
+
+    def __init__(self, tenant: str, priority: str, query: str, kwargs: Dict):
+        self.tenant = tenant
+        self.priority = priority
+        self.query = query
+        self.kwargs = kwargs
+        self.future = Future()
+        self.submitted = time.monotonic()
+
+
+class _FairQueue:
+    """Start-time fair queuing: tenants are served in proportion to their weights"""
+
+    def __init__(self):
+        self._heap = []
+        self._finish = {}
+        self._virtual = 0.0
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __iter__(self):
+        return (job for _, _, job in self._heap)
+
+    def push(self, job: _Job, weight: float):
+        start = max(self._virtual, self._finish.get(job.tenant, 0.0))
+        self._finish[job.tenant] = start + 1.0 / weight
+        heapq.heappush(self._heap, (start, next(self._seq), job))
+
+    def pop(self) -> _Job:
+        start, _, job = heapq.heappop(self._heap)
+        self._virtual = start
+        return job
+
+
+class TenantScheduler:
+    """Runs research jobs for many tenants on a shared system.
+
+    - Priority classes: ``interactive`` jobs always go first, and batch jobs
+      may occupy at most ``workers - reserved_interactive`` workers, so an
+      interactive request never waits behind a full house of batch jobs.
+    - Within a class, tenants share workers by weighted fair queuing
+      (``TENANT_WEIGHTS``; unknown tenants weigh 1).
+    - Each tenant's provider calls draw on its share of every provider's
+      rate limit: its weight over the total weight of tenants with queued or
+      running jobs (so a lone tenant gets the whole limit), unless
+      ``quota_shares`` fixes it.
+    - Admission control: a tenant with ``max_pending`` queued jobs is
+      refused, and interactive jobs are refused when the estimated wait
+      exceeds ``interactive_max_wait`` seconds.
+    """
+
+    def __init__(self, system, workers: int = None, reserved_interactive: int = None,
+                 weights: Dict[str, float] = None, quota_shares: Dict[str, float] = None,
+                 max_pending: int = None, interactive_max_wait: float = None):
+        self.system = system
+        self.workers = workers or int(os.getenv('SCHEDULER_WORKERS', '4'))
+        if reserved_interactive is None:
+            reserved_interactive = int(os.getenv('SCHEDULER_RESERVED_INTERACTIVE', '1'))
+        self.reserved_interactive = min(reserved_interactive, self.workers - 1)
+        self.weights = weights if weights is not None else parse_weights(os.getenv('TENANT_WEIGHTS'))
+        self.quota_shares = quota_shares or {}
+        self.max_pending = max_pending or int(os.getenv('TENANT_MAX_PENDING', '1000'))
+        if interactive_max_wait is None:
+            interactive_max_wait = float(os.getenv('INTERACTIVE_MAX_WAIT', '30'))
+        self.interactive_max_wait = interactive_max_wait
+
+        self._queues = {priority: _FairQueue() for priority in PRIORITIES}
+        self._running = {priority: 0 for priority in PRIORITIES}
+        self._pending = {}
+        self._quotas = {}
+        # Smoothed run time of a job, used to estimate queueing delay
+        self._service_seconds = 5.0
+        self._cond = threading.Condition()
+        self._closed = False
+        self.stats = {}
+        self._threads = [threading.Thread(target=self._work, name=f"tenant-worker-{i}", daemon=True)
+                         for i in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def weight(self, tenant: str) -> float:
+        return self.weights.get(tenant, 1.0)
+
+    def quota_for(self, tenant: str) -> TenantQuota:
+        with self._cond:
+            quota = self._quotas.get(tenant)
+            if quota is None:
+                quota = self._quotas[tenant] = TenantQuota(self._share(tenant))
+            return quota
+
+    def submit(self, query: str, tenant: str = "default", priority: str = "batch", **kwargs) -> Future:
+        """Queue run_research(query, **kwargs) for a tenant; raises AdmissionRejected when refused"""
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority}")
+        job = _Job(tenant, priority, query, kwargs)
+        with self._cond:
+            if self._closed:
+                raise AdmissionRejected("scheduler is shut down")
+            stats = self._tenant_stats(tenant)
+            if self._pending.get(tenant, 0) >= self.max_pending:
+                stats["rejected"] += 1
+                raise AdmissionRejected(f"tenant {tenant} has {self.max_pending} jobs pending",
+                                        retry_after=self._service_seconds)
+            if priority == "interactive":
+                wait = self._estimated_wait()
+                if wait > self.interactive_max_wait:
+                    stats["rejected"] += 1
+                    raise AdmissionRejected(f"estimated wait {wait:.1f}s exceeds {self.interactive_max_wait:.1f}s",
+                                            retry_after=max(wait - self.interactive_max_wait,
+                                                            self._service_seconds / self.workers))
+            self._pending[tenant] = self._pending.get(tenant, 0) + 1
+            if self._pending[tenant] == 1:
+                self._rebalance()
+            stats["submitted"] += 1
+            self._queues[priority].push(job, self.weight(tenant))
+            self._cond.notify()
+        return job.future
+
+    def run(self, query: str, tenant: str = "default", priority: str = "interactive", **kwargs) -> Dict:
+        """Submit and wait for the result"""
+        return self.submit(query, tenant, priority, **kwargs).result()
+
+    def snapshot(self) -> Dict:
+        with self._cond:
+            return {
+                "queued": {priority: len(queue) for priority, queue in self._queues.items()},
+                "running": dict(self._running),
+                "service_seconds": round(self._service_seconds, 2),
+                "tenants": {tenant: dict(stats) for tenant, stats in self.stats.items()},
+            }
+
+    def shutdown(self, wait: bool = True, cancel_pending: bool = False):
+        """Stop accepting jobs; queued jobs still run unless ``cancel_pending`` cancels them"""
+        with self._cond:
+            self._closed = True
+            if cancel_pending:
+                for queue in self._queues.values():
+                    for job in queue:
+                        job.future.cancel()
+            self._cond.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def _estimated_wait(self) -> float:
+        """Queueing delay for a new interactive job (caller holds the lock)"""
+        ahead = len(self._queues["interactive"])
+        free = self.workers - sum(self._running.values())
+        if ahead < free:
+            return 0.0
+        return (ahead - free + 1) * self._service_seconds / self.workers
+
+    def _share(self, tenant: str) -> float:
+        """Quota share: weight over the weight of all active tenants, this one included (caller holds the lock)"""
+        share = self.quota_shares.get(tenant)
+        if share is not None:
+            return share
+        active = {t for t, pending in self._pending.items() if pending} | {tenant}
+        return self.weight(tenant) / sum(self.weight(t) for t in active)
+
+    def _rebalance(self):
+        """Resize every quota after a tenant became active or idle (caller holds the lock)"""
+        for tenant, quota in self._quotas.items():
+            quota.resize(self._share(tenant))
+
+    def _tenant_stats(self, tenant: str) -> Dict:
+        if tenant not in self.stats:
+            self.stats[tenant] = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0, "wait_seconds": 0.0}
+        return self.stats[tenant]
+
+    def _next_job(self) -> _Job:
+        """Highest-priority runnable job, or None (caller holds the lock)"""
+        if len(self._queues["interactive"]):
+            return self._queues["interactive"].pop()
+        if len(self._queues["batch"]) and self._running["batch"] < self.workers - self.reserved_interactive:
+            return self._queues["batch"].pop()
+        return None
+
+    def _work(self):
+        while True:
+            with self._cond:
+                job = self._next_job()
+                while job is None:
+                    if self._closed and not any(len(queue) for queue in self._queues.values()):
+                        return
+                    self._cond.wait()
+                    job = self._next_job()
+                self._running[job.priority] += 1
+                self._tenant_stats(job.tenant)["wait_seconds"] += time.monotonic() - job.submitted
+
+            started = time.monotonic()
+            error = None
+            if job.future.set_running_or_notify_cancel():
+                try:
+                    job.future.set_result(self.system.run_research(
+                        job.query, quota=self.quota_for(job.tenant), **job.kwargs))
+                except Exception as e:
+                    error = e
+                    job.future.set_exception(e)
+
+            with self._cond:
+                self._running[job.priority] -= 1
+                self._pending[job.tenant] -= 1
+                if not self._pending[job.tenant]:
+                    self._rebalance()
+                self._tenant_stats(job.tenant)["failed" if error else "completed"] += 1
+                self._service_seconds = 0.8 * self._service_seconds + 0.2 * (time.monotonic() - started)
+                self._cond.notify_all()
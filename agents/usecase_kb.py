@@ -0,0 +1,179 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from agents.cache import LRUCache
+
+DEFAULT_KB_PATH = os.path.join(os.path.dirname(__file__), "data", "use_cases.json")
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9-]*")
+# Free-text industries, focus areas and trends resolved per knowledge base
+MEMO_ENTRIES = 4096
+_MISSING = object()
+
+
+def industry_tokens(industry: str) -> List[str]:
+    """Tokens used to match free-text industries against catalog keywords"""
+    return _TOKEN.findall(industry.lower())
+
+
+class UseCaseKnowledgeBase:
+    """Use-case catalog compiled into hash-indexed lookup tables.
+
+    Tables are keyed by industry key (``None`` for the generic catalog) and
+    by focus-area / trend key, so selection is a dict lookup regardless of
+    how many industries and use cases the data file defines.
+    """
+
+    def __init__(self, data: Dict):
+        self.version = str(data.get("version", "0"))
+        # Identifies the catalog's content, whether or not ``version`` was bumped
+        self.source_hash = hashlib.sha256(json.dumps(data, sort_keys=True).encode('utf-8')).hexdigest()
+        self.industry_index = {}
+        self.base = {}
+        self.focus = {}
+        self.trend = {}
+        self.genai = {}
+        self.search = {}
+        self.focus_rules = self._compile_rules(data.get("focus_rules", []))
+        self.trend_rules = self._compile_rules(data.get("trend_rules", []))
+        # Search snippets propose a case only when they mention one of the gate terms
+        self.search_gate = tuple(term.lower() for term in data.get("search_gate", []))
+        self.search_rules = self._compile_rules(data.get("search_rules", []))
+        self._init_memos()
+
+        for key, spec in data.get("industries", {}).items():
+            for keyword in spec.get("keywords", [key]):
+                self.industry_index.setdefault(keyword.lower(), key)
+            self._compile_catalog(key, spec)
+        self._compile_catalog(None, data.get("generic", {}))
+
+    def _init_memos(self):
+        self._focus_keys = LRUCache(max_entries=MEMO_ENTRIES)
+        self._trend_keys = LRUCache(max_entries=MEMO_ENTRIES)
+        self._industry_keys = LRUCache(max_entries=MEMO_ENTRIES)
+
+    def __getstate__(self) -> Dict:
+        # Memos are per process (and hold locks); snapshots carry only the compiled tables
+        state = dict(self.__dict__)
+        for name in ("_focus_keys", "_trend_keys", "_industry_keys"):
+            state.pop(name)
+        return state
+
+    def __setstate__(self, state: Dict):
+        self.__dict__.update(state)
+        self._init_memos()
+
+    @classmethod
+    def from_file(cls, path: str) -> "UseCaseKnowledgeBase":
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def _compile_catalog(self, key: Optional[str], spec: Dict):
+        self.base[key] = tuple(UseCaseTemplate(case) for case in spec.get("base", []))
+        self.genai[key] = tuple(UseCaseTemplate(case) for case in spec.get("genai", []))
+        for focus_key, case in spec.get("focus", {}).items():
+            self.focus[(key, focus_key)] = UseCaseTemplate(case)
+        for trend_key, case in spec.get("trend", {}).items():
+            self.trend[(key, trend_key)] = UseCaseTemplate(case)
+        for search_key, case in spec.get("search", {}).items():
+            self.search[(key, search_key)] = UseCaseTemplate(case)
+
+    @staticmethod
+    def _compile_rules(rules: List[Dict]) -> Tuple:
+        return tuple((rule["key"], tuple(m.lower() for m in rule["match"])) for rule in rules)
+
+    def industry_key(self, industry: str) -> Optional[str]:
+        """Resolve free-text industry (e.g. 'Financial Services & Banking') to a catalog key"""
+        key = self._industry_keys.get(industry, _MISSING)
+        if key is _MISSING:
+            key = next((self.industry_index[t] for t in industry_tokens(industry) if t in self.industry_index), None)
+            self._industry_keys.set(industry, key)
+        return key
+
+    def focus_keys(self, focus_area: str) -> Tuple[str, ...]:
+        """Every focus rule the text matches, in rule order"""
+        return self._rule_keys(focus_area, self.focus_rules, self._focus_keys)
+
+    def trend_keys(self, trend: str) -> Tuple[str, ...]:
+        return self._rule_keys(trend, self.trend_rules, self._trend_keys)
+
+    @staticmethod
+    def _rule_keys(text: str, rules: Tuple, memo: LRUCache) -> Tuple[str, ...]:
+        keys = memo.get(text)
+        if keys is None:
+            lowered = text.lower()
+            keys = tuple(key for key, matches in rules if any(m in lowered for m in matches))
+            memo.set(text, keys)
+        return keys
+
+    def base_cases(self, industry: str) -> List[Dict]:
+        key = self.industry_key(industry)
+        return [t.render(industry) for t in self.base.get(key) or self.base.get(None, ())]
+
+    def genai_cases(self, industry: str) -> List[Dict]:
+        key = self.industry_key(industry)
+        return [t.render(industry) for t in self.genai.get(key) or self.genai.get(None, ())]
+
+    def focus_case(self, focus_area: str, industry: str) -> Optional[Dict]:
+        return self._lookup(self.focus, self.focus_keys(focus_area), industry)
+
+    def trend_case(self, trend: str, industry: str) -> Optional[Dict]:
+        return self._lookup(self.trend, self.trend_keys(trend), industry)
+
+    def search_case(self, snippet: str, industry: str) -> Optional[Dict]:
+        """Case suggested by a search-result snippet (first matching search rule only)"""
+        lowered = snippet.lower()
+        if not any(term in lowered for term in self.search_gate):
+            return None
+        rule_key = next((key for key, matches in self.search_rules if any(m in lowered for m in matches)), None)
+        return self._lookup(self.search, (rule_key,) if rule_key else (), industry)
+
+    def _lookup(self, table: Dict, rule_keys: Tuple[str, ...], industry: str) -> Optional[Dict]:
+        """The industry's case for the first matching rule it defines, else the generic case for the first one"""
+        if not rule_keys:
+            return None
+        industry_key = self.industry_key(industry)
+        for catalog in ((industry_key, None) if industry_key is not None else (None,)):
+            for rule_key in rule_keys:
+                template = table.get((catalog, rule_key))
+                if template:
+                    return template.render(industry)
+        return None
+
+
+class UseCaseTemplate:
+    """A use case whose fields may reference {industry}"""
+
+    __slots__ = ("name", "fields", "static")
+
+    def __init__(self, case: Dict):
+        self.name = case.get("name", "")
+        self.fields = tuple(case.items())
+        self.static = not any("{industry}" in value for _, value in self.fields)
+
+    def render(self, industry: str) -> Dict:
+        if self.static:
+            return dict(self.fields)
+        return {name: value.replace("{industry}", industry) for name, value in self.fields}
+
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def load_knowledge_base(path: str = None) -> UseCaseKnowledgeBase:
+    """Load and compile the knowledge base once per process (recompiled if the file changes)"""
+    path = path or os.getenv('USECASE_KB_PATH') or DEFAULT_KB_PATH
+    mtime = os.path.getmtime(path)
+    with _cache_lock:
+        cached = _cache.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        kb = UseCaseKnowledgeBase.from_file(path)
+        _cache[path] = (mtime, kb)
+        print(f"[DEBUG] Loaded use-case knowledge base v{kb.version} ({len(kb.industry_index)} industry keywords)")
+        return kb
@@ -0,0 +1,205 @@
+import heapq
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from agents.usecase_kb import UseCaseKnowledgeBase, UseCaseTemplate
+
+_WORD = re.compile(r"[a-z0-9]+")
+STOPWORDS = {
+    "a", "an", "and", "the", "for", "of", "to", "in", "on", "with", "by", "ai", "powered", "based",
+    "driven", "real", "time", "system", "platform", "solutions", "solution", "reduce", "improve",
+    "increase", "industry", "services", "across", "more", "into", "your",
+}
+
+# Prior weight per candidate source before relevance features are added
+SOURCE_PRIORS = {"base": 1.0, "genai": 0.6, "search": 0.3, "focus": 0.0, "trend": 0.0}
+DEFAULT_WEIGHTS = {"focus": 1.0, "trend": 0.8, "offering": 0.6, "stage_match": 0.9}
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _WORD.findall(text.lower()) if t not in STOPWORDS and len(t) > 2]
+
+
+class CandidatePool:
+    """Candidate use cases for one industry, with token ids stored in CSR form"""
+
+    def __init__(self, templates: List[UseCaseTemplate], sources: List[str],
+                 token_ids: np.ndarray, offsets: np.ndarray, lengths: np.ndarray):
+        self.templates = templates
+        self.sources = sources
+        self.name_index = {t.name: i for i, t in enumerate(templates)}
+        self.templated = [(i, t.name) for i, t in enumerate(templates) if "{industry}" in t.name]
+        self.token_ids = token_ids
+        self.offsets = offsets
+        self.lengths = lengths
+        self.prior = np.array([SOURCE_PRIORS.get(s, 0.0) for s in sources], dtype=np.float32)
+        self.norm = 1.0 / np.sqrt(np.maximum(lengths.astype(np.float32), 1.0))
+
+    @classmethod
+    def build(cls, templates: List[UseCaseTemplate], sources: List[str], vocab: Dict[str, int]) -> "CandidatePool":
+        ids, offsets, lengths = [], [], []
+        for template in templates:
+            text = " ".join(value for name, value in template.fields if name in ("name", "description"))
+            row = sorted({vocab[t] for t in tokenize(text.replace("{industry}", " ")) if t in vocab})
+            offsets.append(len(ids))
+            lengths.append(len(row))
+            ids.extend(row)
+        return cls(templates, sources, np.array(ids, dtype=np.int32),
+                   np.array(offsets, dtype=np.int64), np.array(lengths, dtype=np.int64))
+
+    def extend(self, other: "CandidatePool") -> "CandidatePool":
+        return CandidatePool(
+            self.templates + other.templates,
+            self.sources + other.sources,
+            np.concatenate([self.token_ids, other.token_ids]),
+            np.concatenate([self.offsets, other.offsets + len(self.token_ids)]),
+            np.concatenate([self.lengths, other.lengths]),
+        )
+
+    def __len__(self) -> int:
+        return len(self.templates)
+
+    def lookup(self, industry: str) -> Dict[str, int]:
+        """Rendered use-case name -> pool position for an industry"""
+        if not self.templated:
+            return self.name_index
+        lookup = dict(self.name_index)
+        for i, name in self.templated:
+            lookup[name.replace("{industry}", industry)] = i
+        return lookup
+
+    def overlap(self, query: np.ndarray) -> np.ndarray:
+        """Per-candidate sum of query weights over the candidate's tokens, length-normalized"""
+        if len(self) == 0:
+            return np.zeros(0, dtype=np.float32)
+        # Trailing zero keeps every offset a valid index, even for empty last rows
+        weights = np.append(query[self.token_ids], np.float32(0.0))
+        sums = np.add.reduceat(weights, self.offsets)
+        sums[self.lengths == 0] = 0.0
+        return sums * self.norm
+
+
+class UseCaseScorer:
+    """Scores every candidate use case against research data and keeps the top k"""
+
+    def __init__(self, kb: UseCaseKnowledgeBase, weights: Dict[str, float] = None, top_k: int = None,
+                 vocab: Dict[str, int] = None, pools: Dict[Optional[str], CandidatePool] = None):
+        self.kb = kb
+        self.weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+        self.top_k = top_k or int(os.getenv('USECASE_TOP_K', '8'))
+        # vocab and pools may come precompiled (e.g. from a warm-start snapshot)
+        self.vocab = vocab if vocab is not None else self._build_vocab(kb)
+        self._pools = dict(pools or {})
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _build_vocab(kb: UseCaseKnowledgeBase) -> Dict[str, int]:
+        vocab = {}
+        tables = list(kb.base.values()) + list(kb.genai.values()) + [kb.focus.values(), kb.trend.values()]
+        for templates in tables:
+            for template in templates:
+                for _, value in template.fields:
+                    for token in tokenize(value.replace("{industry}", " ")):
+                        vocab.setdefault(token, len(vocab))
+        return vocab
+
+    def pool_for(self, industry_key: Optional[str]) -> CandidatePool:
+        """Precompiled candidate pool for an industry (built once, then shared)"""
+        with self._lock:
+            if industry_key not in self._pools:
+                self._pools[industry_key] = self._build_pool(industry_key)
+            return self._pools[industry_key]
+
+    def compile_pools(self) -> Dict[Optional[str], CandidatePool]:
+        """Build the pool of every catalog industry (and the generic one) up front"""
+        for industry_key in set(self.kb.base) | set(self.kb.genai) | {None}:
+            self.pool_for(industry_key)
+        with self._lock:
+            return dict(self._pools)
+
+    def _build_pool(self, industry_key: Optional[str]) -> CandidatePool:
+        kb = self.kb
+        templates, sources = [], []
+        names = set()
+
+        def add(template, source):
+            if template.name not in names:
+                names.add(template.name)
+                templates.append(template)
+                sources.append(source)
+
+        for template in kb.base.get(industry_key) or kb.base.get(None, ()):
+            add(template, "base")
+        for kind, table in (("focus", kb.focus), ("trend", kb.trend)):
+            # Industry-specific entries win; generic ones fill the remaining keys
+            for (key, rule_key), template in table.items():
+                if key == industry_key:
+                    add(template, kind)
+            for (key, rule_key), template in table.items():
+                if key is None and (industry_key, rule_key) not in table:
+                    add(template, kind)
+        for template in kb.genai.get(industry_key) or kb.genai.get(None, ()):
+            add(template, "genai")
+        return CandidatePool.build(templates, sources, self.vocab)
+
+    def query_vector(self, phrases: Sequence[str]) -> np.ndarray:
+        vector = np.zeros(len(self.vocab), dtype=np.float32)
+        for phrase in phrases:
+            for token in tokenize(phrase):
+                index = self.vocab.get(token)
+                if index is not None:
+                    vector[index] = 1.0
+        return vector
+
+    def score(self, pool: CandidatePool, research_data: Dict, proposed: Sequence[str] = ()) -> np.ndarray:
+        """Vectorized relevance score for every candidate in the pool.
+
+        ``proposed`` names come from the generation stages (focus areas,
+        trends, search results) and receive the ``stage_match`` bonus.
+        """
+        w = self.weights
+        lookup = pool.lookup(research_data.get("industry", ""))
+        stage_match = np.zeros(len(pool), dtype=np.float32)
+        stage_match[[lookup[name] for name in proposed if name in lookup]] = 1.0
+        return (pool.prior
+                + w["focus"] * pool.overlap(self.query_vector(research_data.get("focus_areas", [])))
+                + w["trend"] * pool.overlap(self.query_vector(research_data.get("market_trends", [])))
+                + w["offering"] * pool.overlap(self.query_vector(research_data.get("company_offerings", [])))
+                + w["stage_match"] * stage_match)
+
+    def rank(self, pool: CandidatePool, research_data: Dict, k: int = None,
+             proposed: Sequence[str] = ()) -> List[Tuple[float, int]]:
+        """(score, index) of the k best candidates with a positive score"""
+        scores = self.score(pool, research_data, proposed)
+        k = k or self.top_k
+        if len(scores) > 4 * k:
+            # Shortlist with argpartition, then order the shortlist with a heap
+            shortlist = np.argpartition(-scores, 4 * k)[:4 * k]
+        else:
+            shortlist = np.arange(len(scores))
+        best = heapq.nlargest(k, ((float(scores[i]), -int(i)) for i in shortlist if scores[i] > 0))
+        return [(score, -neg_index) for score, neg_index in best]
+
+    def select(self, research_data: Dict, k: int = None, proposed: List[Dict] = None) -> List[Dict]:
+        """Top-k use cases for the research data, highest score first.
+
+        Proposed cases that are not in the catalog (e.g. derived from search
+        results) are scored alongside the catalog candidates.
+        """
+        industry = research_data.get("industry", "")
+        pool = self.pool_for(self.kb.industry_key(industry))
+        proposed = proposed or []
+        lookup = pool.lookup(industry)
+        new = list({case["name"]: case for case in proposed if case["name"] not in lookup}.values())
+        if new:
+            pool = pool.extend(CandidatePool.build(
+                [UseCaseTemplate({k: v for k, v in case.items() if k != "source"}) for case in new],
+                [case.get("source", "search") for case in new],
+                self.vocab,
+            ))
+        names = [case["name"] for case in proposed]
+        return [pool.templates[i].render(industry) for _, i in self.rank(pool, research_data, k, names)]
@@ -0,0 +1,181 @@
+import hashlib
+import json
+import mmap
+import os
+import pickle
+import struct
+import sys
+import threading
+import time
+from typing import Dict, Optional
+
+from agents import bonus_templates, keyword_index, usecase_kb, usecase_scoring
+from agents.bonus_templates import DEFAULT_TEMPLATES_PATH, load_bonus_engine
+from agents.keyword_index import KeywordIndex, corpus_documents
+from agents.snapshot_signing import sign, signing_key, verify
+from agents.usecase_kb import DEFAULT_KB_PATH, UseCaseKnowledgeBase
+from agents.usecase_scoring import UseCaseScorer
+
+DEFAULT_SNAPSHOT_PATH = os.path.join("reports", "cache", "warm_start.snap")
+SNAPSHOT_FORMAT = 2
+MAGIC = b"WARMSNAP"
+FOOTER = struct.Struct("<Q8s")  # header length, magic
+ALIGN = 64
+# Modules whose code builds (or defines the classes of) the snapshot's objects
+SNAPSHOT_MODULES = (usecase_kb, usecase_scoring, keyword_index, bonus_templates, sys.modules[__name__])
+
+
+def source_fingerprint(kb_path: str = None, bonus_path: str = None) -> Dict[str, str]:
+    """Hashes of everything a snapshot is compiled from; any change forces a rebuild"""
+    kb_path = kb_path or os.getenv('USECASE_KB_PATH') or DEFAULT_KB_PATH
+    bonus_path = bonus_path or os.getenv('BONUS_TEMPLATES_PATH') or DEFAULT_TEMPLATES_PATH
+    sources = {}
+    for name, path in (("use_cases", kb_path), ("bonus_templates", bonus_path)):
+        with open(path, 'rb') as f:
+            sources[name] = hashlib.sha256(f.read()).hexdigest()
+    # Compiled structures also depend on the code that builds them (tokenizers, scoring constants, classes)
+    code = hashlib.sha256(str(SNAPSHOT_FORMAT).encode('utf-8'))
+    for module in SNAPSHOT_MODULES:
+        with open(module.__file__, 'rb') as f:
+            code.update(f.read())
+    sources["code"] = code.hexdigest()
+    return sources
+
+
+def build_state(sources: Dict[str, str], kb_path: str = None, bonus_path: str = None) -> Dict:
+    """Parse and compile every table from source"""
+    kb_path = kb_path or os.getenv('USECASE_KB_PATH') or DEFAULT_KB_PATH
+    bonus_path = bonus_path or os.getenv('BONUS_TEMPLATES_PATH') or DEFAULT_TEMPLATES_PATH
+    kb = UseCaseKnowledgeBase.from_file(kb_path)
+    documents = corpus_documents(kb)
+    corpus_hash = hashlib.sha256("\n".join(documents).encode('utf-8')).hexdigest()
+    scorer = UseCaseScorer(kb)
+    # The bonus engine is only ever snapshotted here, as part of the warm-start state
+    bonus = load_bonus_engine(bonus_path)
+    return {
+        "kb": kb,
+        "scorer_vocab": scorer.vocab,
+        "scorer_pools": scorer.compile_pools(),
+        "keyword_index": KeywordIndex.build(documents, corpus_hash),
+        "bonus_engine": bonus,
+    }
+
+
+def save_snapshot(path: str, state: Dict, sources: Dict[str, str]) -> int:
+    """Write state as one file: pickle payload plus its NumPy buffers, each 64-byte aligned.
+
+    Layout: sections, then a JSON header with their offsets and an HMAC of
+    their bytes, then the header length and magic. Returns the file size.
+    """
+    key = signing_key()
+    if key is None:
+        raise PermissionError("no private snapshot signing key")
+    buffers = []
+    payload = pickle.dumps(state, protocol=5, buffer_callback=buffers.append)
+    data_sections = [payload] + [buffer.raw() for buffer in buffers]
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    sections = []
+    with open(tmp_path, 'wb') as f:
+        for data in data_sections:
+            f.write(b"\0" * (-f.tell() % ALIGN))
+            sections.append([f.tell(), len(data)])
+            f.write(data)
+        header = json.dumps({
+            "format": SNAPSHOT_FORMAT,
+            "sources": sources,
+            "created": time.time(),
+            "payload": sections[0],
+            "buffers": sections[1:],
+            "signature": sign(key, data_sections),
+        }).encode('utf-8')
+        f.write(header)
+        f.write(FOOTER.pack(len(header), MAGIC))
+        size = f.tell()
+    os.replace(tmp_path, path)
+    return size
+
+
+def read_snapshot(path: str, sources: Dict[str, str]) -> Optional[Dict]:
+    """Memory-map a snapshot; None if missing, corrupt, unsigned or compiled from other sources.
+
+    Arrays are rebuilt directly over the mapped pages (read-only, shared by
+    every process that maps the same file); only the object graph is unpickled,
+    and only after its HMAC checks out, since the cache directory may be
+    writable by others.
+    """
+    key = signing_key()
+    if key is None:
+        return None
+    try:
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    try:
+        header_length, magic = FOOTER.unpack_from(mapped, len(mapped) - FOOTER.size)
+        if magic != MAGIC:
+            return None
+        end = len(mapped) - FOOTER.size
+        header = json.loads(mapped[end - header_length:end])
+        if header.get("format") != SNAPSHOT_FORMAT or header.get("sources") != sources:
+            return None
+        view = memoryview(mapped)
+        offset, length = header["payload"]
+        payload = view[offset:offset + length]
+        buffers = [view[start:start + size] for start, size in header["buffers"]]
+        if not verify(key, [payload] + buffers, header.get("signature")):
+            print(f"[WARN] Warm-start snapshot {path} has a bad signature; rebuilding")
+            return None
+        return pickle.loads(payload, buffers=buffers)
+    except (struct.error, ValueError, KeyError, TypeError, EOFError, AttributeError, ImportError,
+            pickle.UnpicklingError):
+        return None
+
+
+class WarmStart:
+    """Compiled tables for every agent, shared by all systems in the process"""
+
+    def __init__(self, state: Dict, sources: Dict[str, str], loaded: bool, seconds: float):
+        self.kb = state["kb"]
+        self.keyword_index = state["keyword_index"]
+        self.bonus_engine = state["bonus_engine"]
+        self.scorer_vocab = state["scorer_vocab"]
+        self.scorer_pools = state["scorer_pools"]
+        self.sources = sources
+        # True when mapped from the snapshot, False when compiled from source
+        self.loaded = loaded
+        self.seconds = seconds
+
+    def usecase_scorer(self, top_k: int = None) -> UseCaseScorer:
+        return UseCaseScorer(self.kb, top_k=top_k, vocab=self.scorer_vocab, pools=self.scorer_pools)
+
+
+_warm = {}
+_warm_lock = threading.Lock()
+
+
+def load_warm_start(path: str = None, rebuild: bool = False) -> WarmStart:
+    """Map the warm-start snapshot, rebuilding it first when the source tables changed"""
+    path = path or os.getenv('WARM_START_PATH') or DEFAULT_SNAPSHOT_PATH
+    sources = source_fingerprint()
+
+    with _warm_lock:
+        warm = _warm.get(path)
+        if warm and warm.sources == sources and not rebuild:
+            return warm
+
+        started = time.perf_counter()
+        state = None if rebuild else read_snapshot(path, sources)
+        loaded = state is not None
+        if state is None:
+            state = build_state(sources)
+            try:
+                size = save_snapshot(path, state, sources)
+                # Map the new file so arrays live in shared pages rather than this heap
+                state = read_snapshot(path, sources) or state
+                print(f"[DEBUG] Built warm-start snapshot {path} ({size / 1024:.0f} KiB)")
+            except OSError as e:
+                print(f"[WARN] Could not write warm-start snapshot: {e}")
+        warm = _warm[path] = WarmStart(state, sources, loaded, time.perf_counter() - started)
+        return warm
@@ -0,0 +1,469 @@
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from agents.query_normalizer import QueryNormalizer
+
+
+def task_id_for(query: str, batch: str, normalizer: QueryNormalizer = None) -> str:
+    """Deterministic task id so resubmitting a query is idempotent within a batch"""
+    canonical = (normalizer or QueryNormalizer()).normalize(query)
+    return f"{batch}-{hashlib.sha1(canonical.encode('utf-8')).hexdigest()[:16]}"
+
+
+class SQLiteWorkQueue:
+    """Lease-based task queue in a SQLite file (single host or tests)"""
+
+    def __init__(self, path: str = None):
+        self.path = path or os.path.join("reports", "queue.db")
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS tasks (
+                    id TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    lease_owner TEXT,
+                    lease_expires REAL,
+                    error TEXT,
+                    created REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, lease_expires)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            yield conn
+        finally:
+            conn.close()
+
+    def put(self, task_id: str, payload: Dict) -> bool:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO tasks (id, payload, created) VALUES (?, ?, ?)",
+                (task_id, json.dumps(payload), time.time()),
+            )
+            return cursor.rowcount == 1
+
+    def lease(self, worker_id: str, lease_seconds: float, max_attempts: int = None) -> Optional[Dict]:
+        """Lease the oldest runnable task.
+
+        An expired lease means the worker died mid-task; once such a task has
+        used ``max_attempts`` it is failed instead of handed out again.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if max_attempts is not None:
+                conn.execute(
+                    "UPDATE tasks SET status = 'failed', lease_owner = NULL, lease_expires = NULL, "
+                    "error = 'lease expired after ' || attempts || ' attempts' "
+                    "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                    (now, max_attempts),
+                )
+            row = conn.execute(
+                "SELECT id, payload, attempts FROM tasks "
+                "WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?) "
+                "ORDER BY created LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE tasks SET status = 'leased', lease_owner = ?, lease_expires = ?, attempts = attempts + 1 "
+                "WHERE id = ?",
+                (worker_id, now + lease_seconds, row[0]),
+            )
+            conn.execute("COMMIT")
+            return {"id": row[0], "payload": json.loads(row[1]), "attempts": row[2] + 1}
+
+    def heartbeat(self, task_id: str, worker_id: str, lease_seconds: float) -> bool:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET lease_expires = ? WHERE id = ? AND lease_owner = ? AND status = 'leased'",
+                (time.time() + lease_seconds, task_id, worker_id),
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, task_id: str, worker_id: str) -> bool:
+        """Acknowledge a task; False if the lease now belongs to another worker"""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET status = 'done', lease_owner = NULL, lease_expires = NULL "
+                "WHERE id = ? AND lease_owner = ? AND status = 'leased'",
+                (task_id, worker_id),
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, task_id: str, worker_id: str, error: str, max_attempts: int) -> bool:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "lease_owner = NULL, lease_expires = NULL, error = ? "
+                "WHERE id = ? AND lease_owner = ? AND status = 'leased'",
+                (max_attempts, error, task_id, worker_id),
+            )
+            return cursor.rowcount == 1
+
+    def stats(self) -> Dict:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+
+# Moving a task to processing and registering its lease happen in one script, so a worker
+# dying in between cannot leave a task in processing that no lease will ever expire
+_LEASE_SCRIPT = """
+local task_id = redis.call('RPOPLPUSH', KEYS[1], KEYS[2])
+if not task_id then return nil end
+redis.call('ZADD', KEYS[3], ARGV[2], task_id)
+redis.call('HSET', KEYS[4], task_id, ARGV[1])
+local attempts = redis.call('HINCRBY', KEYS[5], task_id, 1)
+return {task_id, attempts, redis.call('HGET', KEYS[6], task_id)}
+"""
+
+# Only the current lease owner may acknowledge a task
+_COMPLETE_SCRIPT = """
+if redis.call('HGET', KEYS[3], ARGV[1]) ~= ARGV[2] then return 0 end
+redis.call('LREM', KEYS[1], 0, ARGV[1])
+redis.call('ZREM', KEYS[2], ARGV[1])
+redis.call('HDEL', KEYS[3], ARGV[1])
+redis.call('SADD', KEYS[4], ARGV[1])
+return 1
+"""
+
+_FAIL_SCRIPT = """
+if redis.call('HGET', KEYS[3], ARGV[1]) ~= ARGV[2] then return 0 end
+redis.call('LREM', KEYS[1], 0, ARGV[1])
+redis.call('ZREM', KEYS[2], ARGV[1])
+redis.call('HDEL', KEYS[3], ARGV[1])
+redis.call('HSET', KEYS[4], ARGV[1], ARGV[3])
+if tonumber(redis.call('HGET', KEYS[5], ARGV[1]) or '0') >= tonumber(ARGV[4]) then
+    redis.call('SADD', KEYS[6], ARGV[1])
+else
+    redis.call('LPUSH', KEYS[7], ARGV[1])
+end
+return 1
+"""
+
+# Extends a lease only while the caller still owns it; checking and extending in one
+# script keeps a stale worker from extending (or reviving) a requeued task's lease
+_HEARTBEAT_SCRIPT = """
+if redis.call('HGET', KEYS[2], ARGV[1]) ~= ARGV[2] then return 0 end
+if not redis.call('ZSCORE', KEYS[1], ARGV[1]) then return 0 end
+redis.call('ZADD', KEYS[1], ARGV[3], ARGV[1])
+return 1
+"""
+
+# Expired leases go back to pending; so do processing entries without any lease
+# (left behind by workers from before leases were registered atomically). Tasks that
+# already used max_attempts (ARGV[2], 0 = unlimited) are failed instead.
+_REQUEUE_SCRIPT = """
+local max_attempts = tonumber(ARGV[2])
+local requeued = 0
+local function release(task_id)
+    redis.call('LREM', KEYS[2], 0, task_id)
+    redis.call('HDEL', KEYS[3], task_id)
+    local attempts = tonumber(redis.call('HGET', KEYS[5], task_id) or '0')
+    if max_attempts > 0 and attempts >= max_attempts then
+        redis.call('HSET', KEYS[7], task_id, 'lease expired after ' .. attempts .. ' attempts')
+        redis.call('SADD', KEYS[6], task_id)
+    else
+        redis.call('RPUSH', KEYS[4], task_id)
+        requeued = requeued + 1
+    end
+end
+for _, task_id in ipairs(redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])) do
+    redis.call('ZREM', KEYS[1], task_id)
+    release(task_id)
+end
+for _, task_id in ipairs(redis.call('LRANGE', KEYS[2], 0, -1)) do
+    if not redis.call('ZSCORE', KEYS[1], task_id) then
+        release(task_id)
+    end
+end
+return requeued
+"""
+
+
+class RedisWorkQueue:
+    """Lease-based task queue on any Redis-compatible server (multi-node)"""
+
+    def __init__(self, url: str, prefix: str = "research"):
+        try:
+            import redis
+        except ImportError:
+            raise ImportError("RedisWorkQueue requires the redis package")
+        self.redis = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self._lease = self.redis.register_script(_LEASE_SCRIPT)
+        self._complete = self.redis.register_script(_COMPLETE_SCRIPT)
+        self._fail = self.redis.register_script(_FAIL_SCRIPT)
+        self._heartbeat = self.redis.register_script(_HEARTBEAT_SCRIPT)
+        self._requeue = self.redis.register_script(_REQUEUE_SCRIPT)
+
+    def _key(self, name: str) -> str:
+        return f"{self.prefix}:{name}"
+
+    def put(self, task_id: str, payload: Dict) -> bool:
+        added = self.redis.hsetnx(self._key("payloads"), task_id, json.dumps(payload))
+        if added:
+            self.redis.lpush(self._key("pending"), task_id)
+        return bool(added)
+
+    def lease(self, worker_id: str, lease_seconds: float, max_attempts: int = None) -> Optional[Dict]:
+        self._requeue_expired(max_attempts)
+        leased = self._lease(
+            keys=[self._key(name) for name in ("pending", "processing", "leases", "owners", "attempts", "payloads")],
+            args=[worker_id, time.time() + lease_seconds],
+        )
+        if leased is None:
+            return None
+        task_id, attempts, payload = leased
+        return {"id": task_id.decode(), "payload": json.loads(payload), "attempts": int(attempts)}
+
+    def heartbeat(self, task_id: str, worker_id: str, lease_seconds: float) -> bool:
+        return bool(self._heartbeat(
+            keys=[self._key(name) for name in ("leases", "owners")],
+            args=[task_id, worker_id, time.time() + lease_seconds],
+        ))
+
+    def complete(self, task_id: str, worker_id: str) -> bool:
+        """Acknowledge a task; False if the lease now belongs to another worker"""
+        return bool(self._complete(
+            keys=[self._key(name) for name in ("processing", "leases", "owners", "done")],
+            args=[task_id, worker_id],
+        ))
+
+    def fail(self, task_id: str, worker_id: str, error: str, max_attempts: int) -> bool:
+        return bool(self._fail(
+            keys=[self._key(name) for name in ("processing", "leases", "owners", "errors", "attempts", "failed",
+                                               "pending")],
+            args=[task_id, worker_id, error, max_attempts],
+        ))
+
+    def stats(self) -> Dict:
+        return {
+            "pending": self.redis.llen(self._key("pending")),
+            "leased": self.redis.llen(self._key("processing")),
+            "done": self.redis.scard(self._key("done")),
+            "failed": self.redis.scard(self._key("failed")),
+        }
+
+    def _requeue_expired(self, max_attempts: int = None):
+        self._requeue(keys=[self._key(name) for name in ("leases", "processing", "owners", "pending", "attempts",
+                                                         "failed", "errors")],
+                      args=[time.time(), max_attempts or 0])
+
+
+class FileResultStore:
+    """Result storage on a shared filesystem; writes are atomic and idempotent"""
+
+    def __init__(self, root: str = None):
+        self.root = root or os.path.join("reports", "results")
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, task_id: str) -> str:
+        return os.path.join(self.root, f"{task_id}.json")
+
+    def exists(self, task_id: str) -> bool:
+        return os.path.exists(self._path(task_id))
+
+    def write(self, task_id: str, result: Dict):
+        path = self._path(task_id)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(result, f)
+        os.replace(tmp_path, path)
+
+    def read(self, task_id: str) -> Optional[Dict]:
+        if not self.exists(task_id):
+            return None
+        with open(self._path(task_id), encoding='utf-8') as f:
+            return json.load(f)
+
+
+def open_queue(url: str = None):
+    """Open a queue from a URL: sqlite:///path/to/queue.db or redis://host:6379/0"""
+    url = url or os.getenv('WORK_QUEUE_URL') or "sqlite:///" + os.path.join("reports", "queue.db")
+    if url.startswith("sqlite:///"):
+        return SQLiteWorkQueue(url[len("sqlite:///"):])
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisWorkQueue(url)
+    raise ValueError(f"Unsupported work queue URL: {url}")
+
+
+class Coordinator:
+    """Splits a list of queries into idempotent tasks on the queue"""
+
+    def __init__(self, queue, results: FileResultStore):
+        self.queue = queue
+        self.results = results
+        self.normalizer = QueryNormalizer()
+
+    def submit(self, queries: List[str], batch: str = None, tenant: str = None) -> List[str]:
+        """Enqueue queries; ``tenant`` is who the work is billed to in the worker's scheduler"""
+        batch = batch or time.strftime('%Y%m%d')
+        task_ids = []
+        for query in queries:
+            query = query.strip()
+            if not query:
+                continue
+            task_id = task_id_for(query, batch, self.normalizer)
+            if task_id not in task_ids:
+                payload = {"query": query, "batch": batch}
+                if tenant:
+                    payload["tenant"] = tenant
+                self.queue.put(task_id, payload)
+                task_ids.append(task_id)
+        print(f"[INFO] Submitted {len(task_ids)} tasks for batch {batch}")
+        return task_ids
+
+    def collect(self, task_ids: List[str]) -> Dict[str, Optional[Dict]]:
+        return {task_id: self.results.read(task_id) for task_id in task_ids}
+
+
+class Worker:
+    """Stateless worker: lease a task, run research, heartbeat, store result.
+
+    Research runs as ``batch`` work on a TenantScheduler (the one shared with
+    interactive users when ``scheduler`` is given), billed to the task's
+    tenant or ``tenant``, so batch jobs share workers and provider quotas
+    with everything else on the node instead of bypassing them.
+    """
+
+    def __init__(self, queue, results: FileResultStore, system=None, lease_seconds: float = 120,
+                 max_attempts: int = 3, worker_id: str = None, render_pool=None, incremental: bool = False,
+                 scheduler=None, tenant: str = None):
+        self.queue = queue
+        self.results = results
+        self.system = system if system is not None or scheduler is None else scheduler.system
+        self.scheduler = scheduler
+        self.tenant = tenant or os.getenv('BATCH_TENANT', 'batch')
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        # With a render pool, reports render on other processes while this thread fetches the next task
+        self.render_pool = render_pool
+        # Refresh from each query's stored run instead of recomputing everything
+        self.incremental = incremental
+        self._rendering = 0
+        self._rendering_done = threading.Condition()
+
+    def run(self, drain: bool = True, poll_interval: float = 2.0, max_tasks: int = None) -> int:
+        """Process tasks until the queue is empty (drain) or forever"""
+        if self.system is None:
+            from main import MultiAgentResearchSystem
+            self.system = MultiAgentResearchSystem()
+        if self.scheduler is None:
+            from agents.tenant_scheduler import TenantScheduler
+            self.scheduler = TenantScheduler(self.system)
+
+        processed = 0
+        while max_tasks is None or processed < max_tasks:
+            task = self.queue.lease(self.worker_id, self.lease_seconds, self.max_attempts)
+            if task is None:
+                if drain:
+                    break
+                time.sleep(poll_interval)
+                continue
+            self._process(task)
+            processed += 1
+
+        with self._rendering_done:
+            self._rendering_done.wait_for(lambda: self._rendering == 0)
+        print(f"[INFO] Worker {self.worker_id} processed {processed} tasks")
+        return processed
+
+    def _process(self, task: Dict):
+        task_id = task['id']
+        # At-least-once delivery: a task whose result is already stored is just acknowledged
+        if self.results.exists(task_id):
+            self._complete(task_id)
+            return
+
+        stop = threading.Event()
+        beat = threading.Thread(target=self._heartbeat, args=(task_id, stop), daemon=True)
+        beat.start()
+        handed_off = False
+        try:
+            query = task['payload']['query']
+            if self.render_pool is None:
+                result = self._research(task, query)
+                self.results.write(task_id, {"task_id": task_id, "worker": self.worker_id, **result})
+                self._complete(task_id)
+            else:
+                result = self._research(task, query, render=False)
+                meta = {"task_id": task_id, "worker": self.worker_id, "freshness": result["freshness"],
+                        "completeness": result["completeness"], "delta": result["delta"]}
+                self._submit_render(task, query, result, meta, stop, beat)
+                handed_off = True
+        except Exception as e:
+            print(f"[ERROR] Task {task_id} failed (attempt {task['attempts']}): {e}")
+            self._fail(task_id, str(e))
+        finally:
+            if not handed_off:
+                stop.set()
+                beat.join()
+
+    def _research(self, task: Dict, query: str, **kwargs) -> Dict:
+        tenant = task['payload'].get('tenant') or self.tenant
+        return self.scheduler.run(query, tenant=tenant, priority="batch", incremental=self.incremental, **kwargs)
+
+    def _submit_render(self, task: Dict, query: str, result: Dict, meta: Dict,
+                       stop: threading.Event, beat: threading.Thread):
+        with self._rendering_done:
+            self._rendering += 1
+        try:
+            # Blocks while the render pool is saturated (backpressure)
+            future = self.render_pool.submit(query, result, meta)
+        except Exception:
+            self._render_finished()
+            raise
+        # The lease stays alive until the renderer has written the result
+        future.add_done_callback(lambda f: self._rendered(task, f, stop, beat))
+
+    def _rendered(self, task: Dict, future, stop: threading.Event, beat: threading.Thread):
+        task_id = task['id']
+        try:
+            if future.exception() is None:
+                self._complete(task_id)
+            else:
+                print(f"[ERROR] Rendering {task_id} failed (attempt {task['attempts']}): {future.exception()}")
+                self._fail(task_id, str(future.exception()))
+        finally:
+            stop.set()
+            beat.join()
+            self._render_finished()
+
+    def _complete(self, task_id: str):
+        if not self.queue.complete(task_id, self.worker_id):
+            # The lease expired and another worker owns the task now; its run will acknowledge it
+            print(f"[WARN] Lease on {task_id} was lost before completion")
+
+    def _fail(self, task_id: str, error: str):
+        if not self.queue.fail(task_id, self.worker_id, error, self.max_attempts):
+            print(f"[WARN] Lease on {task_id} was lost; leaving the failure to its current owner")
+
+    def _render_finished(self):
+        with self._rendering_done:
+            self._rendering -= 1
+            self._rendering_done.notify_all()
+
+    def _heartbeat(self, task_id: str, stop: threading.Event):
+        while not stop.wait(self.lease_seconds / 3):
+            if not self.queue.heartbeat(task_id, self.worker_id, self.lease_seconds):
+                print(f"[WARN] Lost lease on {task_id}")
+                return
@@ -0,0 +1,89 @@
+import argparse
+import os
+import sys
+import time
+from agents.report_archive import ReportArchive, compact
+from agents.report_store import ReportStore
+
+
+def _when(timestamp: float) -> str:
+    return time.strftime('%Y-%m-%d %H:%M', time.localtime(timestamp))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact historical reports into compressed archives and query them")
+    parser.add_argument("--archive", help="Archive directory (default REPORT_ARCHIVE_DIR or reports/archive)")
+    parser.add_argument("--store", help="Report store directory (default reports/store)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    pack = sub.add_parser("compact", help="Move old stored reports and loose report files into the archive")
+    pack.add_argument("--older-than", type=float, default=30, help="Archive reports older than this many days")
+    pack.add_argument("--loose-dir", default="reports", help="Directory with loose *.md/*.pdf reports ('' to skip)")
+    pack.add_argument("--dry-run", action="store_true", help="Only report what would be archived")
+
+    listing = sub.add_parser("list", help="List archived reports")
+    listing.add_argument("--query", help="Case-insensitive substring of the query")
+    listing.add_argument("--format", choices=["md", "pdf"])
+    listing.add_argument("--since", type=float, help="Only reports from the last N days")
+
+    show = sub.add_parser("show", help="Print or extract one archived report")
+    show.add_argument("digest", nargs="?", help="Digest or unique digest prefix")
+    show.add_argument("--query", help="Latest report for this query (store first, then archive) instead of a digest")
+    show.add_argument("--format", choices=["md", "pdf"], default="md")
+    show.add_argument("-o", "--output", help="Write to this file instead of stdout")
+
+    sub.add_parser("stats", help="Archive size and compression ratio")
+    sub.add_parser("verify", help="Decompress every archived report and check its size")
+
+    args = parser.parse_args()
+    archive = ReportArchive(args.archive)
+
+    if args.command == "compact":
+        summary = compact(ReportStore(args.store), archive, older_than_days=args.older_than,
+                          loose_dir=args.loose_dir or None, dry_run=args.dry_run)
+        print(f"[INFO] {summary}")
+        if not args.dry_run:
+            print(f"[INFO] Archive: {archive.stats()}")
+    elif args.command == "list":
+        since = time.time() - args.since * 86400 if args.since is not None else None
+        for entry in archive.find(args.query, args.format, since):
+            print(f"{_when(entry['created'])}  {entry['format']:<3}  {entry['digest'][:12]}  "
+                  f"{entry['size']:>9,} B  {entry['query']}")
+    elif args.command == "show":
+        data = None
+        if args.query:
+            # Reports still in the live store are newer than anything archived from it
+            stored = ReportStore(args.store).latest(args.query, args.format)
+            if stored and os.path.exists(stored['path']):
+                with open(stored['path'], 'rb') as f:
+                    data = f.read()
+            entry = None if data is not None else archive.latest(args.query, args.format)
+        elif args.digest:
+            entry = archive.lookup(args.digest, args.format)
+        else:
+            parser.error("show needs a digest or --query")
+        if data is None and entry is None:
+            print("[ERROR] No single archived report matches", file=sys.stderr)
+            sys.exit(1)
+        if data is None:
+            data = archive.read(entry)
+        if args.output:
+            with open(args.output, 'wb') as f:
+                f.write(data)
+            print(f"[INFO] Wrote {len(data):,} bytes to {args.output}")
+        elif args.format == "pdf":
+            parser.error("use -o to extract a PDF")
+        else:
+            sys.stdout.write(data.decode('utf-8'))
+    elif args.command == "stats":
+        print(f"[STATS] {archive.stats()}")
+    elif args.command == "verify":
+        errors = archive.verify()
+        for error in errors:
+            print(f"[ERROR] {error}")
+        print(f"[INFO] {len(errors)} unreadable artifacts")
+        sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import argparse
+import os
+import time
+from dotenv import load_dotenv
+from agents.cpu_profiler import add_profile_arguments, format_summary, profiler_from_args
+from agents.work_queue import Coordinator, FileResultStore, Worker, open_queue, task_id_for
+
+
+def read_queries(path: str) -> list:
+    with open(path, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+
+def render_pool_for(args, results: FileResultStore):
+    """Process pool for report rendering; None renders inline on the worker thread"""
+    processes = args.render_processes
+    if processes is None:
+        processes = int(os.getenv('RENDER_PROCESSES', str(os.cpu_count() or 1)))
+    if processes <= 0:
+        return None
+    from agents.render_pool import RenderPool
+    return RenderPool(processes=processes, max_pending=args.render_queue, results_root=results.root)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch and distributed research runner")
+    parser.add_argument("--queue", help="Queue URL (sqlite:///path or redis://host:port/db); defaults to WORK_QUEUE_URL")
+    parser.add_argument("--results", help="Shared results directory (default reports/results)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    submit = sub.add_parser("submit", help="Enqueue queries from a file (one per line)")
+    submit.add_argument("file")
+    submit.add_argument("--batch", help="Batch id (default: today's date)")
+    submit.add_argument("--tenant", help="Tenant the queries run as (default BATCH_TENANT or 'batch')")
+
+    work = sub.add_parser("work", help="Run a worker that leases and processes tasks")
+    work.add_argument("--forever", action="store_true", help="Keep polling instead of exiting when the queue drains")
+    work.add_argument("--max-tasks", type=int)
+    work.add_argument("--lease", type=float, default=120, help="Lease duration in seconds")
+
+    run = sub.add_parser("run", help="Submit a file and process it with an in-process worker")
+    run.add_argument("file")
+    run.add_argument("--batch")
+    run.add_argument("--tenant", help="Tenant the queries run as (default BATCH_TENANT or 'batch')")
+
+    for command in (work, run):
+        command.add_argument("--render-processes", type=int,
+                             help="Report rendering processes (default RENDER_PROCESSES or CPU count; 0 renders inline)")
+        command.add_argument("--render-queue", type=int,
+                             help="Max reports waiting for a renderer before workers block (default 2x processes)")
+        command.add_argument("--incremental", action="store_true",
+                             help="Diff against each query's stored run and recompute only what changed")
+        add_profile_arguments(command)
+
+    sub.add_parser("status", help="Show queue counts")
+
+    collect = sub.add_parser("collect", help="Summarize stored results for a query file")
+    collect.add_argument("file")
+    collect.add_argument("--batch")
+
+    args = parser.parse_args()
+    load_dotenv()
+
+    queue = open_queue(args.queue)
+    results = FileResultStore(args.results)
+
+    if args.command == "submit":
+        Coordinator(queue, results).submit(read_queries(args.file), args.batch, args.tenant)
+    elif args.command in ("work", "run"):
+        started = time.time()
+        if args.command == "run":
+            Coordinator(queue, results).submit(read_queries(args.file), args.batch, args.tenant)
+        profiler = profiler_from_args(args)
+        system = None
+        if profiler:
+            from main import MultiAgentResearchSystem
+            system = MultiAgentResearchSystem()
+            profiler.attach(system, keep_cache=args.incremental)
+            # Render pool processes are out of the profiler's reach
+            args.render_processes = 0
+            print("[INFO] Profiling: reports render inline so report/export stages are profiled")
+        render_pool = render_pool_for(args, results)
+        lease = args.lease if args.command == "work" else 120
+        try:
+            worker = Worker(queue, results, system=system, lease_seconds=lease, render_pool=render_pool,
+                            incremental=args.incremental)
+            if args.command == "work":
+                processed = worker.run(drain=not args.forever, max_tasks=args.max_tasks)
+            else:
+                processed = worker.run(drain=True)
+        finally:
+            if render_pool:
+                render_pool.close()
+                print(f"[INFO] Render pool: {render_pool.stats}")
+            if profiler:
+                profiler.detach(system)
+                print(f"[PROFILE]\n{format_summary(profiler.write())}")
+        if args.command == "run":
+            print(f"[INFO] Batch finished: {processed} tasks in {time.time() - started:.1f}s")
+    elif args.command == "status":
+        print(f"[STATUS] {queue.stats()}")
+    elif args.command == "collect":
+        batch = args.batch or time.strftime('%Y%m%d')
+        for query in read_queries(args.file):
+            result = results.read(task_id_for(query, batch))
+            if result:
+                print(f"- {query}: {result['research_data']['industry']}, {len(result['use_cases'])} use cases")
+            else:
+                print(f"- {query}: pending")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import argparse
+import json
+import sys
+from dotenv import load_dotenv
+
+DEFAULT_QUERIES = ["Tesla Motors", "Retail Industry", "Healthcare Technology"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Runtime diagnostics for the research pipeline")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    memory = sub.add_parser("memory", help="Track allocations per stage and retained memory across repeated runs")
+    memory.add_argument("--runs", type=int, default=10, help="Measured runs after one warm-up run")
+    memory.add_argument("--query", action="append", dest="queries", help="Query to run (repeatable)")
+    memory.add_argument("--top", type=int, default=10, help="Allocation sites to show per stage")
+    memory.add_argument("--frames", type=int, default=1, help="Traceback depth recorded per allocation")
+    memory.add_argument("--threshold-kb", type=float, default=64, help="Average growth per run that counts as a leak")
+    memory.add_argument("--stage-sites", action="store_true",
+                        help="Also report top allocation sites per stage (snapshots every stage; slow)")
+    memory.add_argument("--online", action="store_true", help="Use live APIs instead of offline fallbacks")
+    memory.add_argument("--cache", action="store_true", help="Keep the pipeline result cache enabled")
+    memory.add_argument("--json", help="Also write the full report as JSON to this path")
+
+    warm = sub.add_parser("warm-start", help="Build (if stale) and time the warm-start snapshot")
+    warm.add_argument("--rebuild", action="store_true", help="Rebuild even if the snapshot is current")
+    warm.add_argument("--path", help="Snapshot file (default WARM_START_PATH or reports/cache/warm_start.snap)")
+
+    args = parser.parse_args()
+    load_dotenv()
+
+    if args.command == "memory":
+        from agents.memory_diagnostics import MemoryDiagnostics, format_report, offline_system
+        if args.online:
+            from main import MultiAgentResearchSystem
+            system = MultiAgentResearchSystem()
+            if not args.cache:
+                system.result_cache = None
+        else:
+            system = offline_system(use_cache=args.cache)
+
+        diagnostics = MemoryDiagnostics(system, top=args.top, frames=args.frames,
+                                        growth_threshold=int(args.threshold_kb * 1024),
+                                        stage_sites=args.stage_sites)
+        report = diagnostics.run(args.queries or DEFAULT_QUERIES, runs=args.runs)
+        print(format_report(report))
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            print(f"Report written to {args.json}")
+        sys.exit(1 if report["leak_suspected"] else 0)
+
+    if args.command == "warm-start":
+        import os
+        import time
+        from agents.warm_start import DEFAULT_SNAPSHOT_PATH, build_state, load_warm_start, read_snapshot
+        warm = load_warm_start(args.path, rebuild=args.rebuild)
+        path = args.path or os.getenv('WARM_START_PATH') or DEFAULT_SNAPSHOT_PATH
+        started = time.perf_counter()
+        mapped = read_snapshot(path, warm.sources)
+        load_ms = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        build_state(warm.sources)
+        build_ms = (time.perf_counter() - started) * 1000
+        print(f"Snapshot: {path} ({os.path.getsize(path) / 1024:.0f} KiB, "
+              f"{'current' if warm.loaded else 'rebuilt'})")
+        print(f"Tables: {len(warm.kb.industry_index)} industry keywords, {len(warm.scorer_pools)} candidate pools, "
+              f"{len(warm.keyword_index.vocab)} keyword terms, {len(warm.bonus_engine.bundles)} bonus bundles")
+        print(f"Load from snapshot: {load_ms:.1f} ms | compile from source: {build_ms:.1f} ms")
+        sys.exit(0 if mapped is not None else 1)
+
+
+if __name__ == "__main__":
+    main()
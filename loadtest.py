@@ -0,0 +1,87 @@
+import argparse
+import contextlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+from dotenv import load_dotenv
+
+
+def _rates(value: str):
+    return [float(rate) for rate in value.split(",") if rate.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate concurrent Streamlit and API users against one node")
+    parser.add_argument("--rates", type=_rates, default=[0.5, 1, 2, 4, 8],
+                        help="Comma-separated session arrival rates (per second), one load step each")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds of arrivals per step")
+    parser.add_argument("--drain", type=float, default=30, help="Seconds a step may run past its arrivals")
+    parser.add_argument("--think", type=float, default=5, help="Mean think time between a user's requests")
+    parser.add_argument("--requests-per-session", type=float, default=3, help="Mean requests per user session")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Zipf exponent of query popularity")
+    parser.add_argument("--query", action="append", dest="queries",
+                        help="Query in popularity order (repeatable; default: 30 companies and industries)")
+    parser.add_argument("--ui-share", type=float, default=0.5, help="Fraction of sessions that are UI users")
+    parser.add_argument("--workers", type=int, help="Scheduler workers (default SCHEDULER_WORKERS)")
+    parser.add_argument("--reserved-interactive", type=int, help="Workers reserved for UI requests")
+    parser.add_argument("--provider-latency", type=float, default=0.2,
+                        help="Simulated latency (seconds) of each offline resource-provider call")
+    parser.add_argument("--research-latency", type=float, default=1.0,
+                        help="Simulated latency (seconds) of each uncached offline research (search) call")
+    parser.add_argument("--slo", type=float, default=10, help="p95 latency (seconds) above which a step is saturated")
+    parser.add_argument("--cache", action="store_true", help="Enable the pipeline result cache (in a temp directory)")
+    parser.add_argument("--render", action="store_true", help="Save a Markdown report per request (PDFs stay lazy)")
+    parser.add_argument("--keep-going", action="store_true", help="Run every step even after saturation")
+    parser.add_argument("--online", action="store_true", help="Use live APIs instead of offline stand-ins")
+    parser.add_argument("--seed", type=int, help="Random seed for arrivals, query choice and simulated latencies")
+    parser.add_argument("--verbose", action="store_true", help="Keep the pipeline's own log output")
+    parser.add_argument("--json", help="Also write the full report as JSON to this path")
+    args = parser.parse_args()
+    load_dotenv()
+
+    from agents.load_test import LoadGenerator, format_report
+    from agents.memory_diagnostics import offline_system
+    from agents.result_cache import PipelineResultCache
+    from agents.tenant_scheduler import TenantScheduler
+
+    # Store, pipeline cache and blobs only live for this run
+    workdir = tempfile.mkdtemp(prefix="loadtest-")
+    try:
+        if args.online:
+            from main import MultiAgentResearchSystem
+            system = MultiAgentResearchSystem(lazy_pdf=True)
+            system.result_cache = None
+        else:
+            system = offline_system(os.path.join(workdir, "store"), provider_latency=args.provider_latency,
+                                    research_latency=args.research_latency, seed=args.seed)
+            system.lazy_pdf = True
+        if args.cache:
+            system.result_cache = PipelineResultCache(root=os.path.join(workdir, "pipeline"))
+
+        # Every user class gets the same weight; UI traffic is separated by priority
+        scheduler = TenantScheduler(system, workers=args.workers, reserved_interactive=args.reserved_interactive,
+                                    weights={"ui": 1, "api": 1})
+        generator = LoadGenerator(scheduler, args.queries, zipf_s=args.zipf, ui_share=args.ui_share,
+                                  requests_per_session=args.requests_per_session, think_seconds=args.think,
+                                  render=args.render, seed=args.seed)
+        with open(os.devnull, 'w') as devnull:
+            quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(devnull)
+            with quiet:
+                report = generator.ramp(args.rates, args.duration, args.drain, args.slo, keep_going=args.keep_going)
+        # Only jobs already running are waited for, so nothing writes to workdir once it is removed
+        scheduler.shutdown(wait=True, cancel_pending=True)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(format_report(report))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.json}")
+    sys.exit(0 if report["summary"]["max_sustainable_rate"] is not None else 1)
+
+
+if __name__ == "__main__":
+    main()
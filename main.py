@@ -1,67 +1,267 @@
+import argparse
+import contextlib
 import os
+import time
 from dotenv import load_dotenv
 from agents.research_agent import ResearchAgent
 from agents.usecase_agent import UseCaseAgent  
 from agents.resource_agent import ResourceAgent
 from agents.report_agent import ReportAgent
 from agents.bonus_agent import BonusAgent
+from agents.http_client import LatencyBudget
+from agents.result_cache import PipelineResultCache, fingerprint
+from agents.roi_model import MODEL_VERSION as ROI_MODEL_VERSION
+from agents.incremental import build_delta, format_delta, reusable_resources
+from agents.cpu_profiler import add_profile_arguments, format_summary, profiler_from_args
+from agents.warm_start import load_warm_start
 
 class MultiAgentResearchSystem:
-    def __init__(self):
+    def __init__(self, result_cache: PipelineResultCache = None, lazy_pdf: bool = False,
+                 research_agent: ResearchAgent = None, providers=None, report_agent: ReportAgent = None):
+        """``research_agent``, ``providers`` and ``report_agent`` replace the defaults (e.g. offline stand-ins)"""
         load_dotenv()
-        self.research_agent = ResearchAgent()
-        self.usecase_agent = UseCaseAgent()
-        self.resource_agent = ResourceAgent()
-        self.bonus_agent = BonusAgent()
-        self.report_agent = ReportAgent()
+        # Catalogs, keyword index and bonus bundles come precompiled from one
+        # memory-mapped snapshot (WARM_START=0 compiles them per agent instead)
+        warm = load_warm_start() if os.getenv('WARM_START', '1') != '0' else None
+        self.research_agent = research_agent or ResearchAgent()
+        self.usecase_agent = UseCaseAgent(scorer=warm.usecase_scorer() if warm else None)
+        self.resource_agent = ResourceAgent(keyword_index=warm.keyword_index if warm else None, providers=providers)
+        self.bonus_agent = BonusAgent(engine=warm.bonus_engine if warm else None)
+        self.report_agent = report_agent or ReportAgent()
+        # Cross-run result cache; PIPELINE_CACHE=0 disables it
+        if result_cache is None and os.getenv('PIPELINE_CACHE', '1') != '0':
+            result_cache = PipelineResultCache()
+        self.result_cache = result_cache
+        # With lazy_pdf the PDF is only rendered when report_agent.pdf_bytes() is called
+        self.lazy_pdf = lazy_pdf
+        # Callables taking a stage name and returning a context manager wrapped around that
+        # stage (e.g. memory or CPU profilers)
+        self.stage_observers = []
     
-    def run_research(self, query: str) -> dict:
-        """Execute the complete research workflow"""
+    def _observe(self, name: str):
+        stack = contextlib.ExitStack()
+        for observer in self.stage_observers:
+            stack.enter_context(observer(name))
+        return stack
+    
+    def _cache_key(self, query: str) -> str:
+        """Normalized query plus everything else that shapes the output (rule contents, models, sources)"""
+        bonus = self.bonus_agent
+        serper_key = self.research_agent.serper_key
+        return PipelineResultCache.key_for(self.research_agent.normalizer.normalize(query), [
+            ("usecase_kb", self.usecase_agent.kb.source_hash[:16]),
+            ("bonus", f"{bonus.engine.version}:{bonus.engine.source_hash[:12]}"),
+            ("top_k", str(self.usecase_agent.scorer.top_k)),
+            ("roi", fingerprint([ROI_MODEL_VERSION, list(bonus.roi_assumptions),
+                                 bonus.roi_samples, bonus.roi_seed])[:12]),
+            ("providers", ",".join(p.name for p in self.resource_agent.providers)),
+            # Without a key, research falls back to canned data that must not be served once one is set
+            ("serper", "1" if serper_key and serper_key.strip() else "0"),
+        ])
+    
+    def run_research(self, query: str, refresh: bool = False, latency_budget: float = None,
+                     deadline: float = None, render: bool = True, incremental: bool = False,
+                     quota=None) -> dict:
+        """Execute the complete research workflow.
+        
+        ``latency_budget`` (seconds) or ``deadline`` (a time.time() timestamp)
+        bounds the run. Stages that run out of time return degraded output
+        (stale cache, fallbacks, fewer resources) instead of failing, and
+        ``completeness`` in the result says which stages were cut short.
+        Degraded stages are cached only briefly (``PIPELINE_DEGRADED_FRESHNESS``).
+        With ``render=False`` the report is left to the caller (e.g. a render pool).
+        
+        ``incremental`` re-fetches search results and diffs them against the
+        stored run: unchanged results skip the extractors, use cases are only
+        regenerated when the research fields they read change, unchanged use
+        cases keep their resources while those are fresh, and ``delta`` in the
+        result says what changed. Report sections are rebuilt only when their
+        own inputs changed.
+        Without a stored run (or with the result cache off) it is a full run.
+        
+        ``quota`` (e.g. a tenant's TenantQuota) is asked for a token before each provider call.
+        """
         print(f"[INFO] Starting research for: {query}")
+        if deadline is not None:
+            remaining = deadline - time.time()
+            latency_budget = remaining if latency_budget is None else min(latency_budget, remaining)
+        budget = LatencyBudget(latency_budget) if latency_budget is not None else None
+        started = time.monotonic()
         
         try:
+            cache = self.result_cache
+            key = self._cache_key(query) if cache else None
+            entry = cache.load(key) if cache else {"stages": {}}
+            completeness = {}
+            incremental = incremental and "research" in entry["stages"] and not refresh
+            previous = {name: cache.peek(entry, name) for name in entry["stages"]} if incremental else {}
+            previous_at = entry["stages"]["research"]["created_at"] if incremental else None
+            # Stored resources are only carried over while they are within the resources freshness window
+            resources_at = entry["stages"]["resources"]["created_at"] if "resources" in previous else None
+            resources_degraded = entry["stages"]["resources"].get("degraded") if "resources" in previous else None
+            if resources_at is not None and not cache.policy.is_fresh("resources", resources_at,
+                                                                      degraded=bool(resources_degraded)):
+                print("   [INCREMENTAL] Stored resources are stale; searching every use case again")
+                previous.pop("resources")
+                resources_at = None
+            reused_resources = 0
+            source_diff = None
+            provider_calls = 0
+            
+            def stage(name, inputs, compute, force=False):
+                """Run one stage; ``compute`` returns (output, why it is degraded or None)"""
+                if budget is not None and budget.expired() and cache is not None:
+                    # Out of time: any cached output, however old, beats recomputing
+                    stale = cache.peek(entry, name)
+                    if stale is not None:
+                        print(f"   [DEADLINE] Serving stale cached {name}")
+                        completeness[name] = {"status": "stale_cache", "detail": "latency budget exhausted"}
+                        return stale
+                
+                with self._observe(name):
+                    if cache is None:
+                        (output, degraded), reused = compute(), False
+                    else:
+                        output, reused, degraded = cache.stage(entry, name, inputs, compute,
+                                                               refresh=refresh or force)
+                if degraded:
+                    print(f"   [DEADLINE] Degraded {name}{' (cached)' if reused else ''}: {degraded}")
+                    completeness[name] = {"status": "degraded", "detail": degraded + (" (cached)" if reused else "")}
+                elif reused:
+                    print(f"   [CACHE] Reusing cached {name}")
+                    completeness[name] = {"status": "cached"}
+                else:
+                    completeness[name] = {"status": "complete"}
+                return output
+            
+            def research():
+                nonlocal source_diff
+                if incremental:
+                    data, source_diff = self.research_agent.refresh_research(query, previous["research"], budget)
+                else:
+                    data = self.research_agent.research_company_industry(query, budget)
+                return data, data.pop("degraded", None)
+            
+            def find_resources():
+                nonlocal provider_calls, reused_resources
+                report = {}
+                reuse = reusable_resources(previous.get("use_cases"), previous.get("resources"), use_cases)
+                reused_resources = len(reuse)
+                found = self.resource_agent.find_resources(
+                    use_cases, deadline=budget.deadline if budget else None, report=report, reuse=reuse,
+                    quota=quota)
+                provider_calls = report.get("calls", 0)
+                cut_short = report.get("cut_short", 0)
+                return found, f"{cut_short} of {report['calls']} provider calls cut short" if cut_short else None
+            
+            rebuilt_sections = None
+            
+            def build_report():
+                """Report whose sections are rebuilt only when their own inputs changed"""
+                nonlocal rebuilt_sections
+                stored = entry.setdefault("sections", {})
+                texts, rebuilt_sections = [], []
+                for name, inputs, render in self.report_agent.sections(research_data, use_cases, resources,
+                                                                       bonus_solutions):
+                    input_hash = fingerprint(inputs)
+                    cached = stored.get(name)
+                    if refresh or cache is None or not cached or cached["inputs"] != input_hash:
+                        cached = stored[name] = {"inputs": input_hash, "output": render()}
+                        rebuilt_sections.append(name)
+                    texts.append(cached["output"])
+                return self.report_agent.assemble(query, texts)
+            
             # Step 1: Industry/Company Research
             print("[STEP 1] Agent 1: Conducting industry research...")
-            research_data = self.research_agent.research_company_industry(query)
+            # Incremental runs always re-fetch search results to find out what changed
+            research_data = stage("research", [], research, force=incremental)
+            if incremental and research_data == previous["research"] and completeness["research"]["status"] == "complete":
+                print("   [INCREMENTAL] Search results unchanged")
+                completeness["research"] = {"status": "cached", "detail": "search results unchanged"}
             print(f"   [OK] Found industry: {research_data['industry']}")
             
             # Step 2: Generate Use Cases
             print("[STEP 2] Agent 2: Generating AI/GenAI use cases...")
-            use_cases = self.usecase_agent.generate_use_cases(research_data)
+            # Keyed on the research fields use-case generation reads, so source changes that
+            # leave them alone keep the stored use cases (and everything downstream of them)
+            use_cases = stage("use_cases", self.usecase_agent.inputs(research_data),
+                              lambda: (self.usecase_agent.generate_use_cases(research_data), None))
             print(f"   [OK] Generated {len(use_cases)} use cases")
             
             # Step 3: Find Resources
             print("[STEP 3] Agent 3: Finding datasets and resources...")
-            resources = self.resource_agent.find_resources(use_cases)
+            resources = stage("resources", use_cases, find_resources)
+            if reused_resources:
+                # Carried-over resources are as old as the run that found them
+                entry["stages"]["resources"]["created_at"] = resources_at
+                if resources_degraded:
+                    entry["stages"]["resources"].setdefault("degraded", resources_degraded)
+                if completeness["resources"]["status"] == "complete":
+                    if reused_resources == len(use_cases):
+                        completeness["resources"] = {"status": "cached", "detail": "use cases unchanged"}
+                    else:
+                        completeness["resources"]["detail"] = (
+                            f"stored resources kept for {reused_resources} of {len(use_cases)} use cases")
             total_resources = sum(len(r) for r in resources.values())
             print(f"   [OK] Found {total_resources} resources")
             
             # Step 4: Generate Bonus Solutions
             print("[STEP 4] Agent 4: Generating bonus GenAI solutions...")
-            bonus_solutions = self.bonus_agent.generate_bonus_solutions(research_data['industry'], use_cases)
+            bonus_solutions = stage("bonus", [research_data['industry'], use_cases],
+                                    lambda: (self.bonus_agent.generate_bonus_solutions(research_data['industry'], use_cases), None))
             bonus_count = len(bonus_solutions.get('internal_solutions', [])) + len(bonus_solutions.get('customer_solutions', []))
             print(f"   [OK] Generated {bonus_count} bonus solutions")
             
-            # Step 5: Generate Report
-            print("[STEP 5] Report Agent: Generating final report...")
-            report = self.report_agent.generate_report(query, research_data, use_cases, resources, bonus_solutions)
+            report = None
+            if render:
+                # Step 5: Generate Report
+                print("[STEP 5] Report Agent: Generating final report...")
+                report = stage("report", [query, research_data, use_cases, resources, bonus_solutions],
+                               lambda: (build_report(), None))
+                if rebuilt_sections is not None and completeness["report"]["status"] == "complete":
+                    completeness["report"]["detail"] = f"rebuilt sections: {', '.join(rebuilt_sections) or 'none'}"
+            
+            delta = None
+            if incremental:
+                delta = build_delta(query, previous, {"research": research_data, "use_cases": use_cases,
+                                                      "resources": resources, "bonus": bonus_solutions},
+                                    source_diff, completeness, provider_calls, previous_at)
+            
+            complete = all(s["status"] in ("complete", "cached") for s in completeness.values())
+            # Degraded stages are stored too; the freshness policy expires them quickly
+            if cache:
+                try:
+                    cache.save(key, entry)
+                except OSError as e:
+                    print(f"   [WARN] Result cache save error: {e}")
             
             # Save outputs
-            try:
-                md_file = self.report_agent.save_report(report)
-                print(f"   [OK] Saved markdown: {md_file}")
-            except Exception as e:
-                print(f"   [WARN] Markdown save error: {e}")
-                md_file = "report_save_failed.md"
-            
-            try:
-                pdf_file = self.report_agent.export_pdf(report)
-                print(f"   [OK] Saved PDF: {pdf_file}")
-            except Exception as e:
-                print(f"   [WARN] PDF export error: {e}")
-                pdf_file = None
-            
-            print(f"[SUCCESS] Research complete!")
+            with self._observe("export"):
+                md_file = pdf_file = None
+                if not render:
+                    print("   [OK] Report rendering left to the caller")
+                else:
+                    try:
+                        md_file = self.report_agent.save_report(report, query=query)
+                        print(f"   [OK] Saved markdown: {md_file}")
+                    except Exception as e:
+                        print(f"   [WARN] Markdown save error: {e}")
+                        md_file = "report_save_failed.md"
+                
+                    if self.lazy_pdf:
+                        print("   [OK] PDF deferred until requested")
+                    elif budget is not None and budget.expired():
+                        print("   [DEADLINE] PDF export skipped")
+                        completeness["pdf"] = {"status": "skipped", "detail": "latency budget exhausted"}
+                        complete = False
+                    else:
+                        try:
+                            pdf_file = self.report_agent.export_pdf(report, query=query)
+                            print(f"   [OK] Saved PDF: {pdf_file}")
+                        except Exception as e:
+                            print(f"   [WARN] PDF export error: {e}")
+            
+            print(f"[SUCCESS] Research complete!" if complete else "[SUCCESS] Research complete (partial results)")
             
             return {
                 "research_data": research_data,
@@ -69,7 +269,15 @@ class MultiAgentResearchSystem:
                 "resources": resources,
                 "bonus_solutions": bonus_solutions,
                 "report": report,
-                "files": {"markdown": md_file, "pdf": pdf_file}
+                "files": {"markdown": md_file, "pdf": pdf_file},
+                "freshness": cache.freshness(entry) if cache else {},
+                "delta": delta,
+                "completeness": {
+                    "complete": complete,
+                    "elapsed_seconds": round(time.monotonic() - started, 3),
+                    "budget_seconds": round(latency_budget, 3) if latency_budget is not None else None,
+                    "stages": completeness
+                }
             }
             
         except Exception as e:
@@ -77,6 +285,13 @@ class MultiAgentResearchSystem:
             raise e
 
 def main():
+    parser = argparse.ArgumentParser(description="Multi-agent market research")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Refresh a stored run: diff fresh search results and recompute only what changed")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    
+    profiler = None
     try:
         system = MultiAgentResearchSystem()
         
@@ -85,13 +300,21 @@ def main():
         if not query:
             query = "Tesla Motors"  # Default example
         
-        results = system.run_research(query)
+        profiler = profiler_from_args(args)
+        if profiler:
+            # Incremental runs need the stored run they refresh
+            profiler.attach(system, keep_cache=args.incremental)
+        results = system.run_research(query, incremental=args.incremental)
     except KeyboardInterrupt:
         print("\n[INFO] Research cancelled by user")
         return
     except Exception as e:
         print(f"\n[ERROR] System error: {str(e)}")
         return
+    finally:
+        if profiler:
+            profiler.detach(system)
+            print(f"\n[PROFILE]\n{format_summary(profiler.write())}")
     
     # Display summary
     print(f"\n[SUMMARY]")
@@ -101,6 +324,12 @@ def main():
     bonus_count = len(results['bonus_solutions'].get('internal_solutions', [])) + len(results['bonus_solutions'].get('customer_solutions', []))
     print(f"- Bonus solutions: {bonus_count}")
     print(f"- Report files: {results['files']}")
+    if results['delta']:
+        print(f"\n{format_delta(results['delta'])}")
+    if not results['completeness']['complete']:
+        cut = [f"{name} ({s['status']})" for name, s in results['completeness']['stages'].items()
+               if s['status'] not in ("complete", "cached")]
+        print(f"- Partial results: {', '.join(cut)}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,8 +1,12 @@
 import streamlit as st
 import os
 import json
+import threading
+import time
+import uuid
 from dotenv import load_dotenv
 from main import MultiAgentResearchSystem
+from agents.tenant_scheduler import AdmissionRejected, TenantScheduler
 
 # Load environment variables at startup
 load_dotenv()
@@ -14,7 +18,103 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+RESULTS_TTL = int(os.getenv('UI_RESULTS_TTL', '3600'))
+POLL_SECONDS = float(os.getenv('UI_POLL_SECONDS', '1'))
+UI_TENANT = os.getenv('UI_TENANT', 'ui')
+
+
+class ResearchJobs:
+    """Background research jobs shared by all sessions, one in flight per normalized query.
+
+    Jobs go to the process-wide TenantScheduler as interactive work for the
+    UI tenant, so they jump ahead of batch jobs sharing the same system.
+    Every submission that starts a run gets a new job id, so a resubmitted
+    query is never answered with an earlier run's results.
+    """
+    
+    def __init__(self, scheduler: TenantScheduler, tenant: str = UI_TENANT):
+        self.scheduler = scheduler
+        self.system = scheduler.system
+        self.tenant = tenant
+        # job id -> (future, submitted at); normalized query -> job id of its latest run
+        self.futures = {}
+        self.latest = {}
+        self.lock = threading.Lock()
+    
+    def submit(self, query: str) -> str:
+        """Start (or join the running) job for a query; raises AdmissionRejected when the scheduler is overloaded"""
+        key = self.system.research_agent.normalizer.normalize(query)
+        with self.lock:
+            self._prune()
+            job_id = self.latest.get(key)
+            job = self.futures.get(job_id)
+            if job is None or job[0].done():
+                future = self.scheduler.submit(query, tenant=self.tenant, priority="interactive")
+                job_id = self.latest[key] = uuid.uuid4().hex
+                self.futures[job_id] = (future, time.time())
+        return job_id
+    
+    def state(self, job_id: str) -> str:
+        job = self.futures.get(job_id)
+        return "running" if job is not None and not job[0].done() else "ready"
+    
+    def collect(self, job_id: str, query: str) -> dict:
+        """Result of a finished job; reruns synchronously if it was already collected"""
+        with self.lock:
+            job = self.futures.pop(job_id, None)
+        if job is None:
+            return self.scheduler.run(query, tenant=self.tenant, priority="interactive")
+        return job[0].result()
+    
+    def _prune(self):
+        """Forget finished jobs nobody collected (e.g. the session went away) once their results would expire"""
+        cutoff = time.time() - RESULTS_TTL
+        for job_id, (future, submitted) in list(self.futures.items()):
+            if future.done() and submitted < cutoff:
+                del self.futures[job_id]
+        for key, job_id in list(self.latest.items()):
+            if job_id not in self.futures:
+                del self.latest[key]
+
+
+@st.cache_resource
+def get_system() -> MultiAgentResearchSystem:
+    """One research system (agents, HTTP pools, caches) per server process"""
+    # PDFs are rendered only when a user asks for the download
+    return MultiAgentResearchSystem(lazy_pdf=True)
+
+
+@st.cache_resource
+def get_scheduler() -> TenantScheduler:
+    """Shared workers for every tenant of this process (UI_RESEARCH_WORKERS sizes the pool)"""
+    return TenantScheduler(get_system(), workers=int(os.getenv('UI_RESEARCH_WORKERS', '4')))
+
+
+@st.cache_resource
+def get_jobs() -> ResearchJobs:
+    return ResearchJobs(get_scheduler())
+
+
+@st.cache_resource
+def get_batch_worker():
+    """With UI_BATCH_WORKER=1, drain the batch queue (WORK_QUEUE_URL) on this process's scheduler,
+    so batch tasks queue behind interactive requests instead of competing with them from another pool"""
+    if os.getenv('UI_BATCH_WORKER', '0') != '1':
+        return None
+    from agents.work_queue import FileResultStore, Worker, open_queue
+    worker = Worker(open_queue(), FileResultStore(), scheduler=get_scheduler())
+    threading.Thread(target=worker.run, kwargs={"drain": False}, name="ui-batch-worker", daemon=True).start()
+    return worker
+
+
+@st.cache_data(ttl=RESULTS_TTL, max_entries=256, show_spinner=False)
+def research_results(job_id: str, _query: str) -> dict:
+    """Finished results per job, shared by every session that joined it"""
+    return get_jobs().collect(job_id, _query)
+
+
 def main():
+    get_batch_worker()
     # Clean CSS
     st.markdown("""
     <style>
@@ -134,192 +234,206 @@ def main():
         placeholder="e.g., Tesla Motors, Healthcare Industry, Financial Services"
     )
     
+    # Index lookup in the report store, so this stays cheap on every rerun
+    shown = (st.session_state.get('job') or {}).get('query')
+    previous = get_system().report_agent.store.latest(query) if query and query != shown else None
+    if previous and os.path.exists(previous['path']):
+        with open(previous['path'], 'rb') as f:
+            st.download_button(
+                f"📁 Last stored report ({time.strftime('%Y-%m-%d %H:%M', time.localtime(previous['created']))})",
+                data=f.read(),
+                file_name=f"{query.replace(' ', '_')}_research.md",
+                mime="text/markdown",
+            )
+    
     if st.button("🚀 Start AI Research", use_container_width=True):
         if query:
-            # Load environment variables
-            from dotenv import load_dotenv
-            load_dotenv()
-            
-            # Progress tracking
-            progress_bar = st.progress(0)
-            status_text = st.empty()
-            
+            # Jobs run on the shared scheduler; reruns only poll for completion
             try:
-                system = MultiAgentResearchSystem()
-                
-                # Agent 1
-                status_text.text("📊 Agent 1: Conducting industry research...")
-                progress_bar.progress(25)
-                
-                # Agent 2
-                status_text.text("💡 Agent 2: Generating AI/GenAI use cases...")
-                progress_bar.progress(50)
-                
-                # Agent 3
-                status_text.text("📚 Agent 3: Finding datasets and resources...")
-                progress_bar.progress(75)
-                
-                # Agent 4
-                status_text.text("✨ Agent 4: Generating bonus GenAI solutions...")
-                progress_bar.progress(100)
-                
-                results = system.run_research(query)
-                st.session_state.results = results
-                
-                progress_bar.empty()
-                status_text.empty()
-                
-            except Exception as e:
-                st.error(f"Error: {str(e)}")
-                st.stop()
-            
-            results = st.session_state.get('results')
-            if results:
-                st.success("🎉 Research Complete!")
-                
-                # Metrics
-                col1, col2, col3, col4 = st.columns(4)
-                with col1:
-                    st.metric("🏢 Industry", results['research_data']['industry'])
-                with col2:
-                    st.metric("💡 Use Cases", len(results['use_cases']))
-                with col3:
-                    st.metric("📚 Resources", sum(len(r) for r in results['resources'].values()))
-                with col4:
-                    bonus_count = 0
-                    if 'bonus_solutions' in results:
-                        bonus_count = len(results['bonus_solutions'].get('internal_solutions', [])) + len(results['bonus_solutions'].get('customer_solutions', []))
-                    st.metric("✨ Bonus", bonus_count)
-                
-                st.markdown("---")
-                
-                # Tabs
-                tab1, tab2, tab3, tab4, tab5 = st.tabs([
-                    "📊 Research", 
-                    "💡 Use Cases", 
-                    "📚 Resources", 
-                    "✨ Bonus", 
-                    "📥 Downloads"
-                ])
-                
-                with tab1:
-                    research = results['research_data']
-                    
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        st.markdown("**🎯 Offerings:**")
-                        for offering in research.get('company_offerings', []):
-                            st.write(f"• {offering}")
-                        
-                        st.markdown("**🔍 Focus Areas:**")
-                        for area in research.get('focus_areas', []):
-                            st.write(f"• {area}")
-                    
-                    with col2:
-                        st.markdown("**🏆 Competitors:**")
-                        for comp in research.get('competitors', []):
-                            st.write(f"• {comp}")
-                        
-                        st.markdown("**📈 Trends:**")
-                        for trend in research.get('market_trends', []):
-                            st.write(f"• {trend}")
-                    
-                    st.info(research.get('market_size', 'Market analysis available'))
-                
-                with tab2:
-                    for i, use_case in enumerate(results['use_cases'], 1):
-                        with st.expander(f"🚀 {use_case['name']}", expanded=i<=2):
-                            st.write(f"**Description:** {use_case['description']}")
-                            st.write(f"**Business Value:** {use_case['value']}")
-                            resource_count = len(results['resources'].get(use_case['name'], []))
-                            st.caption(f"Resources available: {resource_count}")
-                
-                with tab3:
-                    for use_case_name, resources in results['resources'].items():
-                        if resources:
-                            with st.expander(f"📦 {use_case_name}"):
-                                for resource in resources:
-                                    st.markdown(f"**[{resource['name']}]({resource['url']})** - {resource['type']}")
-                                    st.caption(resource.get('description', 'No description'))
-                
-                with tab4:
-                    if 'bonus_solutions' in results and results['bonus_solutions']:
-                        bonus = results['bonus_solutions']
-                        
-                        st.markdown("**🏢 Internal Solutions:**")
-                        for solution in bonus.get('internal_solutions', []):
-                            with st.expander(f"🔧 {solution['name']}"):
-                                st.write(solution['description'])
-                                st.write(f"**Value:** {solution['value']}")
-                        
-                        st.markdown("**👥 Customer Solutions:**")
-                        for solution in bonus.get('customer_solutions', []):
-                            with st.expander(f"🎯 {solution['name']}"):
-                                st.write(solution['description'])
-                                st.write(f"**Value:** {solution['value']}")
-                        
-                        if 'roi_estimates' in bonus:
-                            st.markdown("**💰 ROI Estimates:**")
-                            roi = bonus['roi_estimates']
-                            st.write(f"• Cost Savings: {roi.get('cost_savings', 'TBD')}")
-                            st.write(f"• Revenue Impact: {roi.get('revenue_impact', 'TBD')}")
-                            st.write(f"• Efficiency Gains: {roi.get('efficiency_gains', 'TBD')}")
-                            st.write(f"• Payback Period: {roi.get('payback_period', 'TBD')}")
-                    else:
-                        st.info("Bonus solutions not available")
-                
-                with tab5:
-                    st.markdown("**📥 Download Reports:**")
-                    
-                    col1, col2, col3 = st.columns(3)
-                    with col1:
-                        st.download_button(
-                            "📄 Markdown",
-                            data=results['report'],
-                            file_name=f"{query.replace(' ', '_')}_research.md",
-                            mime="text/markdown",
-                            use_container_width=True
-                        )
-                    
-                    with col2:
-                        try:
-                            if results['files']['pdf'] and os.path.exists(results['files']['pdf']):
-                                with open(results['files']['pdf'], 'rb') as f:
-                                    st.download_button(
-                                        "📄 PDF", 
-                                        data=f.read(),
-                                        file_name=f"{query.replace(' ', '_')}_research.pdf",
-                                        mime="application/pdf",
-                                        use_container_width=True
-                                    )
-                            else:
-                                st.info("PDF unavailable")
-                        except:
-                            st.warning("PDF unavailable")
-                    
-                    with col3:
-                        summary_data = {
-                            "query": query,
-                            "industry": results['research_data']['industry'],
-                            "use_cases_count": len(results['use_cases']),
-                            "resources_count": sum(len(r) for r in results['resources'].values()),
-                            "bonus_solutions_count": bonus_count
-                        }
+                job_id = get_jobs().submit(query)
+            except AdmissionRejected as e:
+                retry = f" Try again in about {e.retry_after:.0f}s." if e.retry_after else ""
+                st.warning(f"⏳ The research service is busy ({e}).{retry}")
+            else:
+                st.session_state.job = {"id": job_id, "query": query, "started": time.time()}
+                st.session_state.pop('results', None)
+        else:
+            st.error("Please enter a company name or industry")
+    
+    job = st.session_state.get('job')
+    if job and 'results' not in st.session_state:
+        jobs = get_jobs()
+        state = jobs.state(job["id"])
+        if state == "running":
+            with st.spinner(f"🔄 Running 4-agent research for '{job['query']}' ({time.time() - job['started']:.0f}s)..."):
+                time.sleep(POLL_SECONDS)
+            st.rerun()
+        try:
+            st.session_state.results = research_results(job["id"], job["query"])
+        except Exception as e:
+            st.session_state.pop('job', None)
+            st.error(f"Error: {str(e)}")
+            st.stop()
+    
+    if job and 'results' in st.session_state:
+        render_results(st.session_state.results, job["query"])
+
+def render_results(results: dict, query: str):
+    """Render a finished research bundle (runs on every rerun, so it must stay cheap)"""
+    if results:
+        completeness = results.get('completeness', {})
+        if completeness and not completeness.get('complete', True):
+            cut = [f"{name}: {s.get('detail', s['status'])}" for name, s in completeness['stages'].items()
+                   if s['status'] not in ("complete", "cached")]
+            st.warning("⏱️ Research finished with partial results - " + "; ".join(cut))
+        else:
+            st.success("🎉 Research Complete!")
+
+        # Metrics
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("🏢 Industry", results['research_data']['industry'])
+        with col2:
+            st.metric("💡 Use Cases", len(results['use_cases']))
+        with col3:
+            st.metric("📚 Resources", sum(len(r) for r in results['resources'].values()))
+        with col4:
+            bonus_count = 0
+            if 'bonus_solutions' in results:
+                bonus_count = len(results['bonus_solutions'].get('internal_solutions', [])) + len(results['bonus_solutions'].get('customer_solutions', []))
+            st.metric("✨ Bonus", bonus_count)
+
+        st.markdown("---")
+
+        # Tabs
+        tab1, tab2, tab3, tab4, tab5 = st.tabs([
+            "📊 Research", 
+            "💡 Use Cases", 
+            "📚 Resources", 
+            "✨ Bonus", 
+            "📥 Downloads"
+        ])
+
+        with tab1:
+            research = results['research_data']
+
+            col1, col2 = st.columns(2)
+            with col1:
+                st.markdown("**🎯 Offerings:**")
+                for offering in research.get('company_offerings', []):
+                    st.write(f"• {offering}")
+
+                st.markdown("**🔍 Focus Areas:**")
+                for area in research.get('focus_areas', []):
+                    st.write(f"• {area}")
+
+            with col2:
+                st.markdown("**🏆 Competitors:**")
+                for comp in research.get('competitors', []):
+                    st.write(f"• {comp}")
+
+                st.markdown("**📈 Trends:**")
+                for trend in research.get('market_trends', []):
+                    st.write(f"• {trend}")
+
+            st.info(research.get('market_size', 'Market analysis available'))
+
+        with tab2:
+            for i, use_case in enumerate(results['use_cases'], 1):
+                with st.expander(f"🚀 {use_case['name']}", expanded=i<=2):
+                    st.write(f"**Description:** {use_case['description']}")
+                    st.write(f"**Business Value:** {use_case['value']}")
+                    resource_count = len(results['resources'].get(use_case['name'], []))
+                    st.caption(f"Resources available: {resource_count}")
+
+        with tab3:
+            for use_case_name, resources in results['resources'].items():
+                if resources:
+                    with st.expander(f"📦 {use_case_name}"):
+                        for resource in resources:
+                            st.markdown(f"**[{resource['name']}]({resource['url']})** - {resource['type']}")
+                            st.caption(resource.get('description', 'No description'))
+
+        with tab4:
+            if 'bonus_solutions' in results and results['bonus_solutions']:
+                bonus = results['bonus_solutions']
+
+                st.markdown("**🏢 Internal Solutions:**")
+                for solution in bonus.get('internal_solutions', []):
+                    with st.expander(f"🔧 {solution['name']}"):
+                        st.write(solution['description'])
+                        st.write(f"**Value:** {solution['value']}")
+
+                st.markdown("**👥 Customer Solutions:**")
+                for solution in bonus.get('customer_solutions', []):
+                    with st.expander(f"🎯 {solution['name']}"):
+                        st.write(solution['description'])
+                        st.write(f"**Value:** {solution['value']}")
+
+                if 'roi_estimates' in bonus:
+                    st.markdown("**💰 ROI Estimates:**")
+                    roi = bonus['roi_estimates']
+                    st.write(f"• Cost Savings: {roi.get('cost_savings', 'TBD')}")
+                    st.write(f"• Revenue Impact: {roi.get('revenue_impact', 'TBD')}")
+                    st.write(f"• Efficiency Gains: {roi.get('efficiency_gains', 'TBD')}")
+                    st.write(f"• Payback Period: {roi.get('payback_period', 'TBD')}")
+            else:
+                st.info("Bonus solutions not available")
+
+        with tab5:
+            st.markdown("**📥 Download Reports:**")
+
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.download_button(
+                    "📄 Markdown",
+                    data=results['report'],
+                    file_name=f"{query.replace(' ', '_')}_research.md",
+                    mime="text/markdown",
+                    use_container_width=True
+                )
+
+            with col2:
+                # Rendered on demand and kept in the report agent's in-memory artifact cache
+                if st.session_state.get('pdf_requested') == results['report']:
+                    try:
                         st.download_button(
-                            "📊 JSON",
-                            data=json.dumps(summary_data, indent=2),
-                            file_name=f"{query.replace(' ', '_')}_summary.json",
-                            mime="application/json",
+                            "📄 PDF", 
+                            data=get_system().report_agent.pdf_bytes(results['report']),
+                            file_name=f"{query.replace(' ', '_')}_research.pdf",
+                            mime="application/pdf",
                             use_container_width=True
                         )
-                    
-                    st.markdown("---")
-                    st.success("✅ Analysis Complete - All 4 agents executed successfully")
-                    st.info("📊 Research Agent → 💡 Use Case Agent → 📚 Resource Agent → ✨ Bonus Agent")
+                    except Exception:
+                        st.warning("PDF unavailable")
+                elif st.button("📄 Prepare PDF", use_container_width=True):
+                    st.session_state.pdf_requested = results['report']
+                    st.rerun()
+
+            with col3:
+                summary_data = {
+                    "query": query,
+                    "industry": results['research_data']['industry'],
+                    "use_cases_count": len(results['use_cases']),
+                    "resources_count": sum(len(r) for r in results['resources'].values()),
+                    "bonus_solutions_count": bonus_count
+                }
+                st.download_button(
+                    "📊 JSON",
+                    data=json.dumps(summary_data, indent=2),
+                    file_name=f"{query.replace(' ', '_')}_summary.json",
+                    mime="application/json",
+                    use_container_width=True
+                )
+
+            st.markdown("---")
+            if completeness and not completeness.get('complete', True):
+                st.warning("⚠️ Analysis finished - some agents returned partial results (see above)")
             else:
-                st.error("No results available")
-        else:
-            st.error("Please enter a company name or industry")
+                st.success("✅ Analysis Complete - All 4 agents executed successfully")
+            st.info("📊 Research Agent → 💡 Use Case Agent → 📚 Resource Agent → ✨ Bonus Agent")
+    else:
+        st.error("No results available")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,37 @@
+import json
+import os
+
+from agents import warm_start
+from agents.bonus_templates import DEFAULT_TEMPLATES_PATH, load_bonus_engine
+
+
+def test_engine_is_compiled_once_per_template_version(tmp_path):
+    path = str(tmp_path / "templates.json")
+    with open(DEFAULT_TEMPLATES_PATH, encoding='utf-8') as f:
+        templates = json.load(f)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(templates, f)
+
+    engine = load_bonus_engine(path)
+    assert load_bonus_engine(path) is engine
+
+    templates["version"] = "edited"
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(templates, f)
+    recompiled = load_bonus_engine(path)
+    assert recompiled is not engine and recompiled.version == "edited"
+
+
+def test_bonus_engine_is_shared_through_the_warm_start_snapshot(tmp_path, monkeypatch):
+    monkeypatch.setenv("SNAPSHOT_KEY", "test-key")
+    monkeypatch.setattr(warm_start, "_warm", {})
+    path = str(tmp_path / "warm.snap")
+
+    built = warm_start.load_warm_start(path)
+    assert not built.loaded and os.listdir(tmp_path) == ["warm.snap"]
+
+    monkeypatch.setattr(warm_start, "_warm", {})
+    mapped = warm_start.load_warm_start(path)
+    assert mapped.loaded
+    assert mapped.bonus_engine.source_hash == built.bonus_engine.source_hash
+    assert mapped.bonus_engine.internal_solutions("Retail") == built.bonus_engine.internal_solutions("Retail")
@@ -0,0 +1,71 @@
+import threading
+import time
+
+from agents.cache import LRUCache
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    cache = LRUCache(ttl=10)
+    cache.set("tesla", "report")
+
+    now[0] += 9
+    assert cache.get("tesla") == "report"
+    now[0] += 2
+    assert cache.get("tesla") is None
+    assert len(cache) == 0
+
+
+def test_max_bytes_evicts_least_recently_used_first():
+    cache = LRUCache(max_bytes=10, sizeof=len)
+    cache.set("a", "xxxx")
+    cache.set("b", "xxxx")
+    cache.get("a")
+    cache.set("c", "xxxx")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "xxxx" and cache.get("c") == "xxxx"
+    assert cache.stats()["bytes"] == 8
+
+
+def test_get_or_compute_runs_once_for_concurrent_callers():
+    cache = LRUCache()
+    calls = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "report"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("tesla", compute)))
+               for _ in range(8)]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert results == ["report"] * 8
+    assert cache.stats()["misses"] == 1
+
+
+def test_failed_compute_lets_the_next_caller_retry():
+    cache = LRUCache()
+
+    def fail():
+        raise RuntimeError("search down")
+
+    try:
+        cache.get_or_compute("tesla", fail)
+    except RuntimeError:
+        pass
+    assert cache.get_or_compute("tesla", lambda: "report") == "report"
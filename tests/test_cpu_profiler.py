@@ -0,0 +1,32 @@
+from agents.cpu_profiler import StageProfiler
+
+
+class System:
+    def __init__(self):
+        self.stage_observers = []
+        self.result_cache = object()
+
+
+def test_attach_turns_the_result_cache_off_until_detach(tmp_path):
+    system = System()
+    cache = system.result_cache
+    profiler = StageProfiler(output_dir=str(tmp_path), interval=0)
+
+    profiler.attach(system)
+    assert system.result_cache is None
+    assert profiler.observe in system.stage_observers
+
+    profiler.detach(system)
+    assert system.result_cache is cache
+    assert system.stage_observers == []
+
+
+def test_attach_can_keep_the_cache_for_incremental_runs(tmp_path):
+    system = System()
+    cache = system.result_cache
+    profiler = StageProfiler(output_dir=str(tmp_path), interval=0)
+
+    profiler.attach(system, keep_cache=True)
+    assert system.result_cache is cache
+    profiler.detach(system)
+    assert system.result_cache is cache
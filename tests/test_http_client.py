@@ -0,0 +1,54 @@
+import http.server
+import socketserver
+import threading
+import time
+
+import pytest
+import requests
+
+from agents.http_client import HTTPClient
+
+
+class SlowBody(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "30")
+        self.end_headers()
+        for _ in range(3):
+            self.wfile.write(b"x" * 10)
+            self.wfile.flush()
+            time.sleep(0.4 if self.path == "/slow" else 0.05)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    srv = socketserver.ThreadingTCPServer(("127.0.0.1", 0), SlowBody)
+    srv.daemon_threads = True
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{srv.server_address[1]}"
+    srv.shutdown()
+    srv.server_close()
+
+
+def test_streamed_latency_covers_the_body(server):
+    client = HTTPClient()
+    with client.request("p", "GET", f"{server}/fast", timeout=5, stream=True) as response:
+        assert b"".join(response.iter_content(10)) == b"x" * 30
+
+    assert client.histogram("p").count == 1
+    assert client.histogram("p").percentile(50) >= 0.1
+
+
+def test_streamed_body_read_stops_at_the_timeout(server):
+    client = HTTPClient()
+    started = time.monotonic()
+    with pytest.raises(requests.Timeout):
+        with client.request("p", "GET", f"{server}/slow", timeout=0.6, stream=True) as response:
+            b"".join(response.iter_content(10))
+
+    assert time.monotonic() - started < 0.75
+    assert client.snapshot()["p"]["timeouts"] == 1
+    assert client.histogram("p").count == 1
@@ -0,0 +1,53 @@
+from agents.report_agent import ReportAgent
+from agents.report_store import ReportStore
+from agents.research_agent import ResearchAgent
+from agents.resource_providers import OfflineProvider, discover_providers
+from agents.result_cache import PipelineResultCache
+from main import MultiAgentResearchSystem
+
+
+def search_results(last_title: str):
+    results = [
+        {"title": "AI adoption in automotive", "snippet": "Machine learning and automation trends for 2025",
+         "link": "https://example.com/ai"},
+        {"title": "EV market size", "snippet": "The market size will reach 800 billion",
+         "link": "https://example.com/size"},
+        {"title": "Customer experience", "snippet": "Digital customer journeys", "link": "https://example.com/cx"},
+    ]
+    results += [{"title": f"Company history {i}", "snippet": "Founded long ago", "link": f"https://example.com/h{i}"}
+                for i in range(6)]
+    results.append({"title": last_title, "snippet": "Background reading", "link": "https://example.com/last"})
+    return {"organic": results}
+
+
+def test_changed_source_only_recomputes_the_stages_that_read_it(tmp_path, monkeypatch):
+    monkeypatch.setenv("WARM_START", "0")
+    research_agent = ResearchAgent()
+    research_agent.serper_key = "test-key"
+    system = MultiAgentResearchSystem(
+        result_cache=PipelineResultCache(root=str(tmp_path / "cache")), lazy_pdf=True,
+        research_agent=research_agent,
+        providers=[OfflineProvider(p) for p in discover_providers()],
+        report_agent=ReportAgent(store=ReportStore(root=str(tmp_path / "store"))),
+    )
+    fetched = {"data": search_results("Company timeline")}
+    monkeypatch.setattr(system.research_agent, "_fetch_search", lambda query, budget=None: (fetched["data"], 0, 1))
+
+    first = system.run_research("Tesla")
+    assert first["completeness"]["complete"]
+
+    # Same search results: nothing is recomputed
+    unchanged = system.run_research("Tesla", incremental=True)["completeness"]["stages"]
+    assert {name: s["status"] for name, s in unchanged.items()} == {
+        "research": "cached", "use_cases": "cached", "resources": "cached", "bonus": "cached", "report": "cached"}
+
+    # A new competitor comparison only reaches the research fields and report section that show competitors
+    fetched["data"] = search_results("Tesla vs Rivian comparison")
+    result = system.run_research("Tesla", incremental=True)
+    stages = result["completeness"]["stages"]
+    assert result["research_data"]["competitors"] != first["research_data"]["competitors"]
+    assert stages["research"]["status"] == "complete"
+    assert [stages[name]["status"] for name in ("use_cases", "resources", "bonus")] == ["cached"] * 3
+    assert stages["report"] == {"status": "complete", "detail": "rebuilt sections: research"}
+    assert result["delta"]["recomputed"] == ["research", "report"]
+    assert "Tesla vs Rivian comparison" in result["report"]
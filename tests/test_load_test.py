@@ -0,0 +1,29 @@
+from agents.load_test import LoadGenerator, format_report
+from agents.memory_diagnostics import offline_system
+from agents.tenant_scheduler import TenantScheduler
+
+
+def test_ramp_reports_sustainable_rate_and_saturation(tmp_path, monkeypatch):
+    monkeypatch.setenv("WARM_START", "0")
+    system = offline_system(str(tmp_path / "store"), seed=0)
+    system.lazy_pdf = True
+    scheduler = TenantScheduler(system, workers=2, reserved_interactive=1)
+    generator = LoadGenerator(scheduler, ["Tesla", "Retail Industry"], requests_per_session=1, think_seconds=0,
+                              seed=0)
+    try:
+        report = generator.ramp([4], duration=1.0, drain=5.0, slo=30.0)
+        step = report["steps"][0]
+        assert step["requests"] > 0 and step["outcomes"]["completed"] == step["requests"]
+        assert step["latency"]["all"]["p95"] >= step["latency"]["all"]["p50"] > 0
+        assert not step["saturated"]
+        assert report["summary"]["max_sustainable_rate"] == 4
+        assert report["summary"]["saturation_rate"] is None
+
+        # The same load against an impossible SLO saturates on p95
+        strict = generator.ramp([4], duration=1.0, drain=5.0, slo=0.0)
+        assert strict["summary"]["max_sustainable_rate"] is None
+        assert strict["summary"]["saturation_rate"] == 4
+        assert any("p95 latency" in reason for reason in strict["summary"]["saturation_reasons"])
+        assert "SATURATED" in format_report(strict)
+    finally:
+        scheduler.shutdown(cancel_pending=True)
@@ -0,0 +1,26 @@
+from agents.query_normalizer import QueryNormalizer
+
+
+def test_legal_and_descriptor_suffixes_are_stripped():
+    normalizer = QueryNormalizer()
+    assert normalizer.normalize("Tesla, Inc.") == "tesla"
+    assert normalizer.normalize("  ACME Holdings Ltd ") == "acme"
+    assert normalizer.normalize("Retail industry") == "retail"
+    # A lone suffix word is still a query, not an empty key
+    assert normalizer.normalize("Group") == "group"
+
+
+def test_aliases_map_to_the_canonical_company():
+    normalizer = QueryNormalizer(aliases={"Facebook": "Meta"})
+    assert normalizer.normalize("Tesla Motors") == "tesla"
+    assert normalizer.normalize("Alphabet Inc") == "google"
+    assert normalizer.normalize("AWS") == "amazon"
+    assert normalizer.normalize("Facebook, Inc.") == "meta"
+    assert normalizer.industry_for("Alphabet") == "Technology/Internet Services"
+
+
+def test_registered_company_aliases_share_its_industry():
+    normalizer = QueryNormalizer()
+    normalizer.register_company("Procter & Gamble", "Consumer Goods", aliases=["P&G"])
+    assert normalizer.normalize("P&G") == normalizer.normalize("Procter and Gamble Co.")
+    assert normalizer.industry_for("P&G") == "Consumer Goods"
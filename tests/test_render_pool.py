@@ -0,0 +1,19 @@
+from agents import render_pool
+from agents.work_queue import FileResultStore
+
+
+def test_pdf_failure_is_recorded_and_the_task_still_completes(tmp_path, monkeypatch):
+    render_pool._init_renderer(str(tmp_path / "store"), True, str(tmp_path / "results"))
+
+    def broken_pdf(report, query=None):
+        raise RuntimeError("no fonts")
+
+    monkeypatch.setattr(render_pool._renderer["agent"], "export_pdf", broken_pdf)
+    result = {"research_data": {}, "use_cases": [], "resources": {}, "bonus_solutions": []}
+    blob = render_pool.encode_record("Tesla", result, {"task_id": "t1"})
+
+    files = render_pool.render_record(blob)["files"]
+
+    assert files["pdf"] is None and files["pdf_error"] == "no fonts"
+    assert files["markdown"]
+    assert FileResultStore(str(tmp_path / "results")).read("t1")["files"] == files
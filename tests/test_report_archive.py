@@ -0,0 +1,45 @@
+import time
+
+from agents.report_archive import ReportArchive, compact
+from agents.report_store import ReportStore
+
+
+def test_torn_final_index_line_is_ignored_and_replaced(tmp_path):
+    archive = ReportArchive(root=str(tmp_path))
+    first = archive.add(b"first report", "md", query="Tesla")
+    with open(archive.index_path, 'a', encoding='utf-8') as f:
+        f.write('{"chunk": 1, "offs')
+
+    reopened = ReportArchive(root=str(tmp_path))
+    assert [e['digest'] for e in reopened.entries()] == [first['digest']]
+
+    second = reopened.add(b"second report", "md", query="Retail")
+    again = ReportArchive(root=str(tmp_path))
+    assert [e['digest'] for e in again.entries()] == [first['digest'], second['digest']]
+    assert again.get(second['digest']) == b"second report"
+
+
+def test_compact_keeps_reports_written_by_another_store(tmp_path):
+    root = str(tmp_path / "store")
+    compactor_view = ReportStore(root=root)
+    compactor_view.put("**Query:** Tesla\n\nold report\n")
+    old = compactor_view.entries()
+    # Written by a worker after the compactor read the index
+    ReportStore(root=root).put("**Query:** Retail\n\nnew report\n")
+
+    archive = ReportArchive(root=str(tmp_path / "archive"))
+    summary = compact(compactor_view, archive, older_than_days=0, now=time.time() + 1)
+
+    assert summary["archived_entries"] == 2
+    assert {e['query'] for e in archive.entries()} == {"Tesla", "Retail"}
+    assert archive.get(old[0]['digest']) == b"**Query:** Tesla\n\nold report\n"
+    assert ReportStore(root=root).entries() == []
+
+
+def test_latest_is_the_newest_by_creation_time(tmp_path):
+    archive = ReportArchive(root=str(tmp_path))
+    newer = archive.add(b"newer", "md", query="Tesla", created=200.0)
+    archive.add(b"older", "md", query="Tesla", created=100.0)
+
+    assert ReportArchive(root=str(tmp_path)).latest("tesla")['digest'] == newer['digest']
+    assert archive.latest("Tesla", "pdf") is None
@@ -0,0 +1,122 @@
+import os
+import threading
+import time
+
+import pytest
+
+from agents.report_store import BLOB_GRACE_SECONDS, ReportStore
+
+
+def report(query: str, body: str) -> str:
+    return f"# Report\n\n**Query:** {query}\n**Generated:** now\n\n{body}\n"
+
+
+def age(path: str, seconds: float):
+    old = time.time() - seconds
+    os.utime(path, (old, old))
+
+
+def test_gc_keeps_entries_appended_by_another_instance(tmp_path):
+    first = ReportStore(root=str(tmp_path))
+    second = ReportStore(root=str(tmp_path))
+    first.put(report("Tesla", "one"))
+    assert len(first.entries()) == 1
+
+    # Appended after `first` cached the index
+    path = second.put(report("Retail", "two"))
+    first.gc()
+
+    assert {e['query'] for e in ReportStore(root=str(tmp_path)).entries()} == {"Tesla", "Retail"}
+    assert os.path.exists(path)
+
+
+def test_evict_only_drops_the_given_entries(tmp_path):
+    first = ReportStore(root=str(tmp_path))
+    second = ReportStore(root=str(tmp_path))
+    old_path = first.put(report("Tesla", "old"))
+    old = first.entries()
+    new_path = second.put(report("Retail", "new"))
+    age(old_path, BLOB_GRACE_SECONDS + 60)
+
+    removed = first.evict(old)
+
+    assert removed == {"removed_entries": 1, "removed_blobs": 1}
+    assert [e['query'] for e in second.entries()] == ["Retail"]
+    assert not os.path.exists(old_path)
+    assert os.path.exists(new_path)
+
+
+def test_sweep_skips_tmp_files_and_recent_blobs(tmp_path):
+    store = ReportStore(root=str(tmp_path))
+    kept = store.put(report("Tesla", "kept"))
+    shard = os.path.dirname(kept)
+    in_flight = os.path.join(shard, "ab" * 32 + ".pdf.1234.tmp")
+    unindexed = os.path.join(shard, "cd" * 32 + ".md")
+    stale = os.path.join(shard, "ef" * 32 + ".md")
+    for path in (in_flight, unindexed, stale):
+        with open(path, 'wb') as f:
+            f.write(b"x")
+    age(in_flight, BLOB_GRACE_SECONDS + 60)
+    age(stale, BLOB_GRACE_SECONDS + 60)
+
+    removed = store.gc()
+
+    assert removed["removed_blobs"] == 1
+    assert os.path.exists(in_flight)
+    assert os.path.exists(unindexed)
+    assert not os.path.exists(stale)
+    assert os.path.exists(kept)
+
+
+def test_concurrent_puts_survive_repeated_rewrites(tmp_path):
+    writer = ReportStore(root=str(tmp_path))
+    collector = ReportStore(root=str(tmp_path))
+    stop = threading.Event()
+
+    def collect():
+        while not stop.is_set():
+            collector.evict([])
+
+    thread = threading.Thread(target=collect)
+    thread.start()
+    try:
+        for i in range(200):
+            writer.put(report(f"Query {i}", f"body {i}"))
+    finally:
+        stop.set()
+        thread.join()
+
+    entries = ReportStore(root=str(tmp_path)).entries()
+    assert len(entries) == 200
+    assert all(os.path.exists(e['path']) for e in entries)
+
+
+def test_eager_pdf_export_bypasses_the_artifact_cache(tmp_path):
+    pytest.importorskip("reportlab")
+    from agents.report_agent import ReportAgent
+
+    agent = ReportAgent(store=ReportStore(root=str(tmp_path)))
+    path = agent.export_pdf(report("Tesla", "body"), query="Tesla")
+
+    assert os.path.exists(path)
+    assert len(agent.artifacts) == 0
+
+
+def test_latest_follows_puts_removals_and_other_writers(tmp_path):
+    store = ReportStore(root=str(tmp_path))
+    store.put(report("Tesla", "first"))
+    store.put(report("Retail", "other"))
+    newest = store.put(report("Tesla", "second"))
+    assert store.latest(" tesla ")['path'] == newest
+    assert store.latest("Tesla", "pdf") is None
+
+    removed = [e for e in store.entries() if e['path'] == newest]
+    store.evict(removed)
+    assert store.latest("Tesla")['digest'] == ReportStore.digest(report("Tesla", "first"))
+
+    store.put(report("Tesla", "third"))
+    store.gc()
+    assert store.latest("Tesla")['digest'] == ReportStore.digest(report("Tesla", "third"))
+
+    other = ReportStore(root=str(tmp_path)).put(report("Tesla", "fourth"))
+    assert store.latest("Tesla")['path'] == other
@@ -0,0 +1,35 @@
+from agents.research_agent import ResearchAgent
+
+
+def test_fused_results_interleave_subqueries_and_drop_duplicate_urls():
+    responses = {
+        "company": {"organic": [
+            {"link": "https://www.tesla.com/ai/"},
+            {"link": "https://news.example.com/tesla-robotaxi"},
+            {"link": "https://tesla.com/impact"},
+        ]},
+        "industry": {"organic": [
+            {"link": "http://tesla.com/ai#autopilot"},
+            {"link": "https://example.org/ev-market?year=2024"},
+        ]},
+        "trends": {"organic": [
+            {"link": "https://News.Example.com/tesla-robotaxi/"},
+            {"link": "https://example.org/ev-market?year=2025"},
+        ]},
+    }
+
+    fused = ResearchAgent(subqueries={"company": "{query}"})._fuse_results(responses)["organic"]
+
+    assert [(r["link"], r["subquery"]) for r in fused] == [
+        ("https://www.tesla.com/ai/", "company"),
+        ("https://News.Example.com/tesla-robotaxi/", "trends"),
+        ("https://example.org/ev-market?year=2024", "industry"),
+        ("https://example.org/ev-market?year=2025", "trends"),
+        ("https://tesla.com/impact", "company"),
+    ]
+
+
+def test_url_key_ignores_scheme_www_trailing_slash_and_fragment():
+    key = ResearchAgent._url_key
+    assert key("https://www.Tesla.com/ai/") == key("http://tesla.com/ai#autopilot") == "tesla.com/ai"
+    assert key("https://tesla.com/ai?page=2") != key("https://tesla.com/ai")
@@ -0,0 +1,70 @@
+import time
+
+from agents.resource_providers import ProviderScheduler, ResourceProvider, TokenBucket
+
+
+class Recording(ResourceProvider):
+    resource_type = "Dataset"
+    timeout = 5.0
+
+    def __init__(self, name, rate_limit=100.0, burst=10, delay=0.0):
+        self.name = name
+        self.rate_limit = rate_limit
+        self.burst = burst
+        self.delay = delay
+        self.searched = []
+
+    def search(self, query, session, timeout):
+        time.sleep(self.delay)
+        self.searched.append(query)
+        return [{"name": f"{self.name} {query}", "url": f"https://example.com/{self.name}/{query}"}]
+
+    def fallback(self, query):
+        return [{"name": f"{self.name} fallback", "url": f"https://example.com/{self.name}"}]
+
+
+def test_try_acquire_does_not_take_a_token_when_empty():
+    bucket = TokenBucket(rate=1.0, burst=1)
+    assert bucket.try_acquire() == 0
+    wait_for = bucket.try_acquire()
+    assert 0 < wait_for <= 1.0
+    bucket.refund()
+    assert bucket.try_acquire() == 0
+
+
+def test_rate_limited_provider_does_not_hold_pool_threads():
+    limited = Recording("limited", rate_limit=0.01, burst=1)
+    fast = Recording("fast", delay=0.05)
+    scheduler = ProviderScheduler([limited, fast], max_workers=1)
+    queries = {str(i): f"q{i}" for i in range(4)}
+    report = {}
+
+    started = time.monotonic()
+    merged = scheduler.run(queries, deadline=started + 2.0, report=report)
+
+    assert time.monotonic() - started < 1.0
+    assert sorted(fast.searched) == sorted(queries.values())
+    assert len(limited.searched) == 1
+    assert report["cut_short"] == 3
+    assert all(len(results) == 2 for results in merged.values())
+
+
+def test_no_token_is_spent_after_the_deadline():
+    provider = Recording("limited", rate_limit=1.0, burst=1)
+    scheduler = ProviderScheduler([provider], max_workers=1)
+
+    merged = scheduler.run({"a": "q"}, deadline=time.monotonic() - 1)
+
+    assert provider.searched == []
+    assert merged["a"][0]["name"] == "limited fallback"
+    assert scheduler.buckets["limited"].try_acquire() == 0
+
+
+def test_queued_calls_are_cancelled_at_the_deadline():
+    slow = Recording("slow", delay=0.3)
+    scheduler = ProviderScheduler([slow], max_workers=1)
+
+    scheduler.run({str(i): f"q{i}" for i in range(3)}, deadline=time.monotonic() + 0.1)
+    time.sleep(0.8)
+
+    assert len(slow.searched) == 1
@@ -0,0 +1,43 @@
+import time
+
+from agents.result_cache import FreshnessPolicy, PipelineResultCache
+
+
+def test_degraded_stage_is_cached_only_for_the_short_degraded_window(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    cache = PipelineResultCache(root=str(tmp_path), policy=FreshnessPolicy(degraded_max_age=600))
+    calls = []
+
+    def find_resources():
+        calls.append(1)
+        if len(calls) == 1:
+            return {"Chatbot": []}, "3 of 8 provider calls cut short"
+        return {"Chatbot": ["dataset"]}, None
+
+    entry = cache.load("tesla")
+    assert cache.stage(entry, "resources", ["Chatbot"], find_resources) == (
+        {"Chatbot": []}, False, "3 of 8 provider calls cut short")
+    cache.save("tesla", entry)
+
+    # A repeat run soon after reuses the degraded output and still reports it as degraded
+    now[0] += 300
+    entry = PipelineResultCache(root=str(tmp_path), policy=cache.policy).load("tesla")
+    assert cache.stage(entry, "resources", ["Chatbot"], find_resources) == (
+        {"Chatbot": []}, True, "3 of 8 provider calls cut short")
+    assert len(calls) == 1
+
+    # Past the degraded window the stage is computed again, and the full result keeps the normal freshness
+    now[0] += 301
+    assert cache.stage(entry, "resources", ["Chatbot"], find_resources) == ({"Chatbot": ["dataset"]}, False, None)
+    now[0] += 3600
+    assert cache.stage(entry, "resources", ["Chatbot"], find_resources)[1] is True
+    assert len(calls) == 2
+
+
+def test_degraded_freshness_is_read_from_the_environment(monkeypatch):
+    monkeypatch.setenv("PIPELINE_DEGRADED_FRESHNESS", "60")
+    policy = FreshnessPolicy.from_env()
+    assert policy.is_fresh("resources", 0, now=59, degraded=True)
+    assert not policy.is_fresh("resources", 0, now=61, degraded=True)
+    assert policy.is_fresh("resources", 0, now=61)
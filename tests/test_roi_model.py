@@ -0,0 +1,62 @@
+import numpy as np
+
+from agents.roi_model import (MAX_PAYBACK_MONTHS, PERCENTILES, ROIAssumptions, estimate_batch, parse_value,
+                              summarize_company)
+
+
+def test_fold_claims_are_normalized_to_the_effort_they_remove():
+    assert parse_value("Scale content creation by 10x, improve SEO").efficiency == 0.9
+    assert parse_value("Accelerate drafting by 1000x").efficiency < 1.0
+    assert parse_value("Reduce fraud losses by 85%").cost == 0.85
+
+
+def cases(*values):
+    return [{"value": value} for value in values]
+
+
+def test_estimate_batch_shapes_and_empty_companies():
+    companies = [cases("Reduce fraud losses by 85%", "Increase sales by 20%"), [], cases("Cut costs by 40%")]
+    result = estimate_batch(companies, samples=500, seed=1)
+
+    assert result.use_case_savings.shape == (3, len(PERCENTILES))
+    assert result.company_savings.shape == (3, len(PERCENTILES))
+    assert result.claims.shape == (3, 3)
+    assert list(result.company_index) == [0, 0, 2]
+    # reduceat returns the next segment's first element for an empty segment; it must be zeroed
+    assert np.all(result.company_savings[1] == 0)
+    assert np.all(result.company_payback_months[1] == MAX_PAYBACK_MONTHS)
+
+
+def test_company_totals_sum_only_their_own_use_cases():
+    companies = [cases("Reduce fraud losses by 85%", "Cut waste by 20%"), [], cases("Cut costs by 40%")]
+    # Near-deterministic realization, so percentiles of sums equal sums of percentiles
+    fixed = ROIAssumptions(realization=(1.0, 1.0, 1.0 + 1e-12))
+    result = estimate_batch(companies, samples=50, assumptions=fixed)
+
+    savings = result.use_case_savings[:, 1]
+    assert np.allclose(result.company_savings[:, 1], [savings[0] + savings[1], 0.0, savings[2]])
+
+
+def test_payback_is_capped_when_nothing_pays_back():
+    result = estimate_batch([cases("Nothing measurable here")], samples=200)
+    assert np.all(result.company_payback_months == MAX_PAYBACK_MONTHS)
+    assert summarize_company(result)["payback_months"] == [None, None, None]
+
+
+def test_same_seed_gives_identical_percentiles():
+    companies = [cases("Reduce downtime by 30%", "Improve conversion by 15%")]
+    first = estimate_batch(companies, samples=300, seed=7)
+    again = estimate_batch(companies, samples=300, seed=7)
+    other = estimate_batch(companies, samples=300, seed=8)
+
+    assert np.array_equal(first.company_savings, again.company_savings)
+    assert np.array_equal(first.company_payback_months, again.company_payback_months)
+    assert not np.array_equal(first.company_savings, other.company_savings)
+
+
+def test_default_assumptions_give_a_realistic_range():
+    strong = cases(*["Reduce operating costs by 90%"] * 8)
+    summary = summarize_company(estimate_batch([strong], samples=1000))
+
+    assert 1.0 < summary["cost_savings_pct"][1] < 10.0
+    assert 6.0 < summary["payback_months"][1] < 36.0
@@ -0,0 +1,19 @@
+import json
+
+from agents.serper_stream import parse_serper_stream
+
+
+def test_stops_after_organic_and_reports_bytes_separately():
+    body = json.dumps({
+        "searchParameters": {"q": "Tesla"},
+        "organic": [{"title": f"t{i}", "snippet": "s", "link": f"https://x/{i}", "position": i} for i in range(20)],
+        "news": [{"title": "n"}],
+    }).encode('utf-8')
+    chunks = [body[i:i + 64] for i in range(0, len(body), 64)]
+
+    data, bytes_read = parse_serper_stream(chunks, {"organic": 3})
+
+    assert list(data) == ["organic"]
+    assert [r["link"] for r in data["organic"]] == ["https://x/0", "https://x/1", "https://x/2"]
+    assert "position" not in data["organic"][0]
+    assert 0 < bytes_read < len(body)
@@ -0,0 +1,51 @@
+import threading
+
+from agents.resource_providers import ResourceProvider
+from agents.tenant_scheduler import TenantScheduler
+
+
+class BlockingSystem:
+    def __init__(self):
+        self.release = threading.Event()
+
+    def run_research(self, query, quota=None, **kwargs):
+        self.release.wait(5)
+        return {"query": query}
+
+
+def test_quota_share_follows_the_active_tenants():
+    system = BlockingSystem()
+    scheduler = TenantScheduler(system, workers=4, reserved_interactive=0, weights={})
+    provider = ResourceProvider()
+    try:
+        assert scheduler.quota_for("acme").share == 1.0
+
+        first = scheduler.submit("Tesla", tenant="acme")
+        second = scheduler.submit("Retail", tenant="beta")
+        acme = scheduler.quota_for("acme")
+        assert acme.share == 0.5
+        assert scheduler.quota_for("beta").share == 0.5
+        assert acme.try_acquire(provider) == 0
+        assert acme._buckets[provider.name].rate == provider.rate_limit * 0.5
+
+        system.release.set()
+        first.result(5)
+        second.result(5)
+        scheduler.shutdown()
+        assert acme.share == 1.0
+        assert acme._buckets[provider.name].rate == provider.rate_limit
+    finally:
+        system.release.set()
+        scheduler.shutdown()
+
+
+def test_explicit_quota_shares_are_not_rebalanced():
+    system = BlockingSystem()
+    scheduler = TenantScheduler(system, workers=2, reserved_interactive=0, weights={},
+                                quota_shares={"acme": 0.25})
+    try:
+        scheduler.submit("Tesla", tenant="beta")
+        assert scheduler.quota_for("acme").share == 0.25
+    finally:
+        system.release.set()
+        scheduler.shutdown()
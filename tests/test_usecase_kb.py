@@ -0,0 +1,34 @@
+import pickle
+
+from agents.usecase_kb import MEMO_ENTRIES, load_knowledge_base
+
+
+def test_industry_rules_take_precedence_over_earlier_generic_ones():
+    kb = load_knowledge_base()
+    case = kb.focus_case("Customer data and personalization", "Retail")
+    assert case["name"] == "Personalized Shopping Experience"
+
+
+def test_generic_rule_is_used_when_the_industry_has_none():
+    kb = load_knowledge_base()
+    assert kb.focus_case("Data platforms", "Retail")["name"] == "Data Intelligence Platform"
+    assert kb.focus_case("Nothing relevant", "Retail") is None
+
+
+def test_memos_are_bounded_and_not_pickled():
+    kb = load_knowledge_base()
+    for i in range(MEMO_ENTRIES + 10):
+        kb.focus_keys(f"data area {i}")
+    assert len(kb._focus_keys) <= MEMO_ENTRIES
+
+    restored = pickle.loads(pickle.dumps(kb))
+    assert len(restored._focus_keys) == 0
+    assert restored.focus_keys("Customer data") == kb.focus_keys("Customer data")
+
+
+def test_search_snippets_propose_the_first_matching_case():
+    kb = load_knowledge_base()
+    case = kb.search_case("AI-driven predictive maintenance and route optimization", "Logistics")
+    assert case["name"] == "Predictive Analytics for Logistics"
+    assert kb.search_case("Predictive models without the buzzwords", "Logistics") is None
+    assert kb.search_case("Machine learning in general", "Logistics") is None
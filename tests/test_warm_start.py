@@ -0,0 +1,54 @@
+import os
+
+from agents import snapshot_signing
+from agents.warm_start import read_snapshot, save_snapshot, source_fingerprint
+
+
+class Marker:
+    pass
+
+
+def test_snapshot_round_trips_and_rejects_tampering(tmp_path, monkeypatch):
+    monkeypatch.setenv("SNAPSHOT_KEY", "test-key")
+    path = str(tmp_path / "warm.snap")
+    sources = {"code": "abc"}
+    save_snapshot(path, {"value": [1, 2, 3]}, sources)
+    assert read_snapshot(path, sources) == {"value": [1, 2, 3]}
+
+    with open(path, 'r+b') as f:
+        # The pickle payload is the first section
+        f.seek(20)
+        byte = f.read(1)
+        f.seek(20)
+        f.write(bytes([byte[0] ^ 1]))
+    assert read_snapshot(path, sources) is None
+
+
+def test_snapshot_signed_with_another_key_is_not_unpickled(tmp_path, monkeypatch):
+    path = str(tmp_path / "warm.snap")
+    monkeypatch.setenv("SNAPSHOT_KEY", "attacker")
+    save_snapshot(path, {"value": Marker()}, {"code": "abc"})
+
+    monkeypatch.setenv("SNAPSHOT_KEY", "owner")
+    assert read_snapshot(path, {"code": "abc"}) is None
+
+
+def test_key_file_is_private_and_rejected_when_shared(tmp_path, monkeypatch):
+    monkeypatch.delenv("SNAPSHOT_KEY", raising=False)
+    monkeypatch.setattr(snapshot_signing, "_key", {})
+    path = str(tmp_path / "keys" / "snapshot.key")
+    monkeypatch.setenv("SNAPSHOT_KEY_PATH", path)
+
+    key = snapshot_signing.signing_key()
+    assert key and len(key) == 32
+    assert os.stat(path).st_mode & 0o777 == 0o600
+
+    os.chmod(path, 0o644)
+    monkeypatch.setattr(snapshot_signing, "_key", {})
+    assert snapshot_signing.signing_key() is None
+
+
+def test_fingerprint_covers_the_builder_code():
+    sources = source_fingerprint()
+    assert set(sources) == {"use_cases", "bonus_templates", "code"}
+    assert source_fingerprint() == sources
@@ -0,0 +1,54 @@
+import time
+
+from agents.work_queue import Coordinator, FileResultStore, SQLiteWorkQueue, Worker
+
+
+def test_stale_worker_cannot_complete_or_fail_a_re_leased_task(tmp_path):
+    queue = SQLiteWorkQueue(str(tmp_path / "queue.db"))
+    queue.put("t1", {"query": "Tesla"})
+    assert queue.lease("stale", lease_seconds=0.01)["id"] == "t1"
+    time.sleep(0.02)
+    assert queue.lease("current", lease_seconds=60)["attempts"] == 2
+
+    assert not queue.fail("t1", "stale", "boom", max_attempts=3)
+    assert not queue.complete("t1", "stale")
+    assert queue.stats() == {"leased": 1}
+
+    assert queue.complete("t1", "current")
+    assert queue.stats() == {"done": 1}
+
+
+def test_task_whose_lease_keeps_expiring_is_failed_at_max_attempts(tmp_path):
+    queue = SQLiteWorkQueue(str(tmp_path / "queue.db"))
+    queue.put("crash", {"query": "Tesla"})
+    for attempt in (1, 2):
+        assert queue.lease(f"worker-{attempt}", lease_seconds=0.01, max_attempts=2)["attempts"] == attempt
+        time.sleep(0.02)
+
+    assert queue.lease("worker-3", lease_seconds=60, max_attempts=2) is None
+    assert queue.stats() == {"failed": 1}
+
+
+class RecordingScheduler:
+    def __init__(self):
+        self.system = object()
+        self.calls = []
+
+    def run(self, query, tenant="default", priority="interactive", **kwargs):
+        self.calls.append((query, tenant, priority))
+        return {"query": query}
+
+
+def test_worker_runs_tasks_as_batch_work_for_their_tenant(tmp_path):
+    queue = SQLiteWorkQueue(str(tmp_path / "queue.db"))
+    results = FileResultStore(str(tmp_path / "results"))
+    coordinator = Coordinator(queue, results)
+    coordinator.submit(["Tesla"], batch="b1", tenant="acme")
+    coordinator.submit(["Retail"], batch="b1")
+    scheduler = RecordingScheduler()
+
+    processed = Worker(queue, results, scheduler=scheduler, tenant="nightly").run(drain=True)
+
+    assert processed == 2
+    assert sorted(scheduler.calls) == [("Retail", "nightly", "batch"), ("Tesla", "acme", "batch")]
+    assert queue.stats() == {"done": 2}